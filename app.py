@@ -3,21 +3,32 @@ import asyncio
 import tempfile
 import time
 import json
-from flask import Flask, request, render_template, redirect, url_for, send_file, jsonify, session
+from flask import Flask, request, render_template, redirect, url_for, send_file, jsonify, session, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import send_file
 
-import google.generativeai as genai
 from flask import request, jsonify
 from dotenv import load_dotenv
 
 # Import from our modules
-from tts import generate_simple_tts
+from tts import generate_tts_from_text, generate_tts_from_stream
+from script_prompts import build_video_script_prompt, build_shorts_script_prompt, build_marketing_script_prompt
+from script_generator import ScriptGenerator, StubModel, create_gemini_model
+from job_queue import WorkerPool, QueueFullError
+from job_store import create_job_store
+from zip_stream import stream_zip
+from tts_cache import TTSCache, SentenceCache, cache_key
+from subtitles import write_subtitles
+from live_audio import LiveAudioRegistry
+from voice_catalog import VoiceCatalog, DEFAULT_CATALOG_PATH, CATALOG_TTL
 
 # Import the downloader modules at the top of your app.py file
-from media_downloaders import download_mp3, download_pinterest_video, check_yt_dlp_installed
+from media_downloaders import DownloadCache, download_name, expand_playlist, check_yt_dlp_installed
+from ytdlp_engine import create_engine
+from janitor import Janitor, RetentionRule
 import uuid
 
 # Initialize Flask app
@@ -26,10 +37,23 @@ app.secret_key = "simple_tts_generator"  # for session management
 
 load_dotenv()
 
-def setup_gemini_api(api_key):
-    genai.configure(api_key=api_key)
 # Add this to your app initialization
 app.config['GEMINI_API_KEY'] = os.getenv("GEMINI_API_KEY")
+app.config['GEMINI_USE_STUB'] = os.getenv("GEMINI_USE_STUB") == '1'  # offline stub for development
+app.config['SCRIPT_CACHE_TTL'] = int(os.getenv('SCRIPT_CACHE_TTL', 3600))
+app.config['SCRIPT_CACHE_MAX_ENTRIES'] = int(os.getenv('SCRIPT_CACHE_MAX_ENTRIES', 256))
+
+def create_script_model():
+    if app.config['GEMINI_USE_STUB']:
+        return StubModel()
+    return create_gemini_model(app.config['GEMINI_API_KEY'])
+
+# One Gemini client for the whole process, created on first use
+script_client = ScriptGenerator(
+    create_script_model,
+    ttl=app.config['SCRIPT_CACHE_TTL'],
+    max_entries=app.config['SCRIPT_CACHE_MAX_ENTRIES']
+)
 # Configure upload folder
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 OUTPUT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'outputs')
@@ -41,82 +65,259 @@ os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['OUTPUT_FOLDER'] = OUTPUT_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max upload size
+app.config['BATCH_MAX_ITEMS'] = int(os.getenv('BATCH_MAX_ITEMS', 100))
+
+# Shared worker pool for synthesis jobs
+app.config['TTS_MAX_CONCURRENT_JOBS'] = int(os.getenv('TTS_MAX_CONCURRENT_JOBS', 4))
+app.config['TTS_MAX_QUEUED_JOBS'] = int(os.getenv('TTS_MAX_QUEUED_JOBS', 100))
+
+worker_pool = WorkerPool(
+    max_concurrent=app.config['TTS_MAX_CONCURRENT_JOBS'],
+    max_queued=app.config['TTS_MAX_QUEUED_JOBS']
+)
+
+# Job state lives in a shared store so every worker process sees the same jobs
+app.config['JOB_STORE_BACKEND'] = os.getenv('JOB_STORE_BACKEND', 'sqlite')
+app.config['JOB_STORE_PATH'] = os.getenv(
+    'JOB_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+)
+
+app.config['JOB_HEARTBEAT_INTERVAL'] = int(os.getenv('JOB_HEARTBEAT_INTERVAL', 30))
+
+job_store = create_job_store(app.config['JOB_STORE_BACKEND'], app.config['JOB_STORE_PATH'])
+# Jobs left pending or processing by a previous (or crashed) process are failed
+job_store.start_heartbeat(app.config['JOB_HEARTBEAT_INTERVAL'])
+
+# Running jobs write to the store from one thread: a write (SQLite may wait up
+# to 30 s for its lock) never blocks the worker pools' event loops, and a job's
+# updates land in the order they were made
+store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-store-writer')
+
+def store_write_nowait(function, *args, **kwargs):
+    """Queue a job store write on the writer thread without waiting for it"""
+    def write():
+        try:
+            function(*args, **kwargs)
+        except Exception as e:
+            print(f"Job store write failed: {e}")
+    store_writer.submit(write)
+
+async def store_write(function, *args, **kwargs):
+    """Run a job store write on the writer thread and wait for it"""
+    return await asyncio.wrap_future(store_writer.submit(function, *args, **kwargs))
+
+# Media downloads run as background jobs; each worker drives one yt-dlp process
+DOWNLOADS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
+app.config['MEDIA_MAX_CONCURRENT_DOWNLOADS'] = int(os.getenv('MEDIA_MAX_CONCURRENT_DOWNLOADS', 2))
+app.config['MEDIA_MAX_QUEUED_DOWNLOADS'] = int(os.getenv('MEDIA_MAX_QUEUED_DOWNLOADS', 20))
+
+download_pool = WorkerPool(
+    max_concurrent=app.config['MEDIA_MAX_CONCURRENT_DOWNLOADS'],
+    max_queued=app.config['MEDIA_MAX_QUEUED_DOWNLOADS'],
+    name='media-download-pool'
+)
+
+# 'inprocess' drives yt_dlp from long-lived worker processes instead of starting yt-dlp per download
+app.config['MEDIA_DOWNLOAD_ENGINE'] = os.getenv('MEDIA_DOWNLOAD_ENGINE', 'subprocess')
+media_engine = create_engine(app.config['MEDIA_DOWNLOAD_ENGINE'], app.config['MEDIA_MAX_CONCURRENT_DOWNLOADS'])
+
+# Each video or pin is downloaded once; repeats are served from downloads/
+app.config['MEDIA_CACHE_MAX_BYTES'] = int(os.getenv('MEDIA_CACHE_MAX_BYTES', 5 * 1024 * 1024 * 1024))
+download_cache = DownloadCache(DOWNLOADS_FOLDER, app.config['MEDIA_CACHE_MAX_BYTES'], media_engine)
+app.config['MEDIA_BATCH_MAX_ITEMS'] = int(os.getenv('MEDIA_BATCH_MAX_ITEMS', 200))
+
+# Content-addressed cache of finished renders, shared by identical submissions
+app.config['TTS_CACHE_MAX_BYTES'] = int(os.getenv('TTS_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+
+tts_cache = TTSCache(os.path.join(OUTPUT_FOLDER, 'cache'), app.config['TTS_CACHE_MAX_BYTES'])
+
+# Audio for single sentences, so an edited script only re-synthesizes what changed
+app.config['SENTENCE_CACHE_MAX_BYTES'] = int(os.getenv('SENTENCE_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+sentence_cache = SentenceCache(os.path.join(OUTPUT_FOLDER, 'cache', 'sentences'),
+                               app.config['SENTENCE_CACHE_MAX_BYTES'])
+
+# Voice list from Edge TTS, cached on disk; pages never wait for the network
+app.config['VOICE_CATALOG_PATH'] = os.getenv('VOICE_CATALOG_PATH', DEFAULT_CATALOG_PATH)
+app.config['VOICE_CATALOG_TTL'] = int(os.getenv('VOICE_CATALOG_TTL', CATALOG_TTL))
+
+voice_catalog = VoiceCatalog(app.config['VOICE_CATALOG_PATH'], app.config['VOICE_CATALOG_TTL'])
+voice_catalog.refresh_in_background()
+
+# Nothing else deletes files: the janitor keeps each directory within its quotas
+DAY = 24 * 3600
+app.config['JANITOR_INTERVAL'] = int(os.getenv('JANITOR_INTERVAL', 600))
+app.config['JOB_RETENTION'] = int(os.getenv('JOB_RETENTION', 7 * DAY))  # Finished jobs are forgotten after this
+app.config['UPLOADS_MAX_AGE'] = int(os.getenv('UPLOADS_MAX_AGE', DAY))
+app.config['UPLOADS_MAX_BYTES'] = int(os.getenv('UPLOADS_MAX_BYTES', 200 * 1024 * 1024))
+app.config['OUTPUTS_MAX_AGE'] = int(os.getenv('OUTPUTS_MAX_AGE', 7 * DAY))
+app.config['OUTPUTS_MAX_BYTES'] = int(os.getenv('OUTPUTS_MAX_BYTES', 5 * 1024 * 1024 * 1024))
+app.config['DOWNLOADS_MAX_AGE'] = int(os.getenv('DOWNLOADS_MAX_AGE', 7 * DAY))
+app.config['TTS_TEMP_MAX_AGE'] = int(os.getenv('TTS_TEMP_MAX_AGE', DAY))
+app.config['TTS_TEMP_MAX_BYTES'] = int(os.getenv('TTS_TEMP_MAX_BYTES', 1024 * 1024 * 1024))
+
+janitor = Janitor(
+    [
+        RetentionRule('uploads', UPLOAD_FOLDER, app.config['UPLOADS_MAX_BYTES'], app.config['UPLOADS_MAX_AGE']),
+        # outputs/cache enforces its own size (TTS_CACHE_MAX_BYTES)
+        RetentionRule('outputs', OUTPUT_FOLDER, app.config['OUTPUTS_MAX_BYTES'], app.config['OUTPUTS_MAX_AGE'],
+                      skip=('cache',)),
+        # The download cache evicts by size itself; the janitor adds the age limit.
+        # downloads/.staging holds files yt-dlp is still writing, the cache removes those
+        RetentionRule('downloads', DOWNLOADS_FOLDER, app.config['MEDIA_CACHE_MAX_BYTES'],
+                      app.config['DOWNLOADS_MAX_AGE'], skip=('.staging',)),
+        # Intermediates are only touched while a job runs; give long jobs an hour
+        RetentionRule('tts_temp', os.path.join(tempfile.gettempdir(), 'tts_generator'),
+                      app.config['TTS_TEMP_MAX_BYTES'], app.config['TTS_TEMP_MAX_AGE'], min_age=3600),
+    ],
+    job_store,
+    interval=app.config['JANITOR_INTERVAL'],
+    job_retention=app.config['JOB_RETENTION']
+)
+janitor.start()
 
-# Dictionary to store job statuses
-jobs = {}
-
-# Define available voices with language grouping
-AVAILABLE_VOICES = [
-    # English voices
-    {"id": "en-US-GuyNeural", "name": "Guy (Male, US)", "language": "English"},
-    {"id": "en-US-ChristopherNeural", "name": "Christopher (Male, US)", "language": "English"},
-    {"id": "en-US-EricNeural", "name": "Eric (Male, US)", "language": "English"},
-    {"id": "en-GB-RyanNeural", "name": "Ryan (Male, UK)", "language": "English"},
-    {"id": "en-GB-ThomasNeural", "name": "Thomas (Male, UK)", "language": "English"},
-    {"id": "en-AU-WilliamNeural", "name": "William (Male, Australian)", "language": "English"},
-    {"id": "en-CA-LiamNeural", "name": "Liam (Male, Canadian)", "language": "English"},
-    {"id": "en-US-JennyNeural", "name": "Jenny (Female, US)", "language": "English"},
-    {"id": "en-GB-SoniaNeural", "name": "Sonia (Female, UK)", "language": "English"},
-    {"id": "en-AU-NatashaNeural", "name": "Natasha (Female, Australian)", "language": "English"},
-    
-    # Arabic voices
-    {"id": "ar-MA-JamalNeural", "name": "Jamal (Male, Moroccan)", "language": "Arabic"},
-    {"id": "ar-EG-ShakirNeural", "name": "Shakir (Male, Egyptian)", "language": "Arabic"},
-    {"id": "ar-SA-FahdNeural", "name": "Fahd (Male, Saudi)", "language": "Arabic"},
-    
-    # French voices
-    {"id": "fr-FR-HenriNeural", "name": "Henri (Male)", "language": "French"},
-    {"id": "fr-FR-DeniseNeural", "name": "Denise (Female)", "language": "French"},
-    
-    # German voices
-    {"id": "de-DE-ConradNeural", "name": "Conrad (Male)", "language": "German"},
-    {"id": "de-DE-KatjaNeural", "name": "Katja (Female)", "language": "German"},
-    
-    # Spanish voices
-    {"id": "es-ES-AlvaroNeural", "name": "Álvaro (Male)", "language": "Spanish"},
-    {"id": "es-ES-ElviraNeural", "name": "Elvira (Female)", "language": "Spanish"},
-    
-    # Italian voices
-    {"id": "it-IT-DiegoNeural", "name": "Diego (Male)", "language": "Italian"},
-    {"id": "it-IT-ElsaNeural", "name": "Elsa (Female)", "language": "Italian"},
-    
-    # Portuguese voices
-    {"id": "pt-BR-AntonioNeural", "name": "Antonio (Male, Brazilian)", "language": "Portuguese"},
-    {"id": "pt-BR-FranciscaNeural", "name": "Francisca (Female, Brazilian)", "language": "Portuguese"}
-]
-
-# Define languages from available voices
-AVAILABLE_LANGUAGES = sorted(list(set([voice["language"] for voice in AVAILABLE_VOICES])))
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def generate_unique_id():
     return f"{int(time.time())}_{os.urandom(4).hex()}"
 
-# Custom function to run async tasks in the background
-def run_async_task(coroutine, job_id):
-    async def wrapper():
+def output_filename_for(title, job_id):
+    """Build the output MP3 name, based on the title when one is given"""
+    if title:
+        # Create a safe filename from the title
+        safe_title = secure_filename(title)
+        if safe_title:
+            return f"{safe_title}_{job_id}.mp3"
+    return f"tts_{job_id}.mp3"
+
+def tts_job(job_id, title, input_type, voice_id, speed, depth, **fields):
+    """Build the job record for a TTS request; the script itself stays in memory"""
+    output_filename = output_filename_for(title, job_id)
+    job = {
+        'status': 'pending',
+        'output_file': os.path.join(app.config['OUTPUT_FOLDER'], output_filename),
+        'start_time': time.time(),
+        'input_type': input_type,
+        'voice_id': voice_id,
+        'speed': speed,
+        'depth': depth,
+        'title': title,
+        'filename': output_filename
+    }
+    job.update(fields)
+    return job
+
+# Run a job's coroutine on the shared worker pool and record its outcome
+async def run_async_task(coroutine_factory, job_id):
+    try:
+        await store_write(job_store.update, job_id, status='processing')
+        await store_write(job_store.append_event, job_id, 'status', {'status': 'processing'})
+        result = await coroutine_factory()
+        await store_write(job_store.update, job_id, status='completed', result=result)
+        await store_write(job_store.append_event, job_id, 'complete', {'status': 'completed'})
+    except Exception as e:
+        print(f"Error in job {job_id}: {str(e)}")
         try:
-            jobs[job_id]['status'] = 'processing'
-            result = await coroutine
-            jobs[job_id]['status'] = 'completed'
-            jobs[job_id]['result'] = result
-        except Exception as e:
-            jobs[job_id]['status'] = 'failed'
-            jobs[job_id]['error'] = str(e)
-            print(f"Error in job {job_id}: {str(e)}")
-    
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(wrapper())
-    loop.close()
+            await store_write(job_store.update, job_id, status='failed', error=str(e))
+            await store_write(job_store.append_event, job_id, 'failed', {'status': 'failed', 'error': str(e)})
+        except Exception as store_error:
+            print(f"Could not record the failure of job {job_id}: {store_error}")
+
+def submit_job(job_id, coroutine_factory):
+    """Queue a job on the worker pool, raising QueueFullError when busy"""
+    worker_pool.submit(lambda: run_async_task(coroutine_factory, job_id))
+
+# Raw audio of the jobs queued or running in this process, kept in memory for /stream-audio
+live_streams = LiveAudioRegistry()
+
+def progress_reporter(job_id):
+    """Build a progress_callback(done, total) that records segment progress on a job"""
+    def report_progress(done, total):
+        # Called on the worker pool's loop; the writes happen on the writer thread
+        store_write_nowait(job_store.update, job_id, segments_done=done, segments_total=total)
+        store_write_nowait(job_store.append_event, job_id, 'progress',
+                           {'segments_done': done, 'segments_total': total})
+    return report_progress
+
+def subtitle_fields(output_path, boundaries):
+    """Write VTT and SRT files beside an output MP3; returns the job fields naming them"""
+    try:
+        paths = write_subtitles(boundaries, os.path.splitext(output_path)[0])
+    except OSError as e:
+        print(f"Could not write subtitles for {output_path}: {e}")
+        return {}
+    if not paths:
+        return {}
+    return {'subtitles_vtt': paths['vtt'], 'subtitles_srt': paths['srt']}
+
+def start_tts_job(job_id, job, text, voice_id, speed, depth, is_ssml=False):
+    """
+    Record a TTS job and either complete it from the cache or queue synthesis.
+
+    ``text`` is synthesized directly; the script is never written to disk.
+
+    Raises:
+        QueueFullError: If the job had to be queued and the pool is full
+    """
+    key = cache_key(text, voice_id, speed, depth, is_ssml)
+    output_path = job['output_file']
+    job['cache_key'] = key
+
+    if tts_cache.lookup(key, output_path):
+        job.update(subtitle_fields(output_path, tts_cache.boundaries(key)))
+        job.update(status='completed', result=output_path, cached=True)
+        job_store.create(job_id, job)
+        job_store.append_event(job_id, 'complete', {'status': 'completed'})
+        return
+
+    # Raw audio is kept in memory while synthesis runs, so it can be streamed live
+    live_audio = live_streams.open(job_id)
+    job_store.create(job_id, job)
+    job_store.append_event(job_id, 'status', {'status': 'pending'})
+
+    async def synthesize():
+        # Word timings are captured from the same Edge TTS streams as the audio
+        boundaries = []
+        try:
+            result = await generate_tts_from_text(
+                text, output_path, voice_id, speed, depth, is_ssml,
+                progress_callback=progress_reporter(job_id), live_audio=live_audio,
+                sentence_cache=sentence_cache, word_boundaries=boundaries
+            )
+        finally:
+            live_streams.close(job_id)
+        # generate_tts_from_text falls back to a silent clip on failure; never cache that
+        if os.path.basename(result).startswith('silent_'):
+            return result
+        fields = await asyncio.to_thread(subtitle_fields, output_path, boundaries)
+        await store_write(job_store.update, job_id, **fields)
+        return await asyncio.to_thread(tts_cache.store, key, result, output_path, boundaries)
+
+    try:
+        submit_job(job_id, synthesize)
+    except QueueFullError:
+        live_streams.close(job_id)
+        job_store.delete(job_id)
+        raise
+
+def busy_response(error, as_json=False):
+    """Build a 503 response telling the client when to retry"""
+    message = f"The server is busy, please retry after {error.retry_after} seconds."
+    if as_json:
+        response = jsonify({'error': message, 'retry_after': error.retry_after})
+    else:
+        response = app.make_response(render_template('error.html', message=message))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
 
 # Routes
 @app.route('/')
 def index():
     # Check if there's a prefill parameter
     prefill = request.args.get('prefill', '')
-    return render_template('index.html', voices=AVAILABLE_VOICES, languages=AVAILABLE_LANGUAGES, prefill=prefill)
+    return render_template('index.html', voices=voice_catalog.voices(), languages=voice_catalog.languages(), prefill=prefill)
 
 # Update the upload route to store the title
 @app.route('/upload', methods=['POST'])
@@ -135,8 +336,7 @@ def upload_file():
     # Generate a unique job ID
     job_id = generate_unique_id()
     
-    # Create temp directories if they don't exist
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    # Create the output directory if it doesn't exist
     os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
     
     # Handle text input
@@ -145,13 +345,7 @@ def upload_file():
         
         if not text_content:
             return render_template('error.html', message="No text provided. Please enter some text to convert to speech.")
-        
-        # Save the text to a temporary file
-        script_filename = f"text_input_{job_id}.txt"
-        script_path = os.path.join(app.config['UPLOAD_FOLDER'], script_filename)
-        
-        with open(script_path, 'w', encoding='utf-8') as f:
-            f.write(text_content)
+        script_filename = ''
     
     # Handle file upload
     else:
@@ -166,50 +360,25 @@ def upload_file():
         if not script_file or not allowed_file(script_file.filename):
             return jsonify({'error': 'Invalid file format. Please upload a .txt file for scripts'}), 400
         
-        # Save the uploaded file
+        # Read the upload in memory; it is synthesized without being saved
         script_filename = secure_filename(script_file.filename)
-        script_path = os.path.join(app.config['UPLOAD_FOLDER'], script_filename)
-        script_file.save(script_path)
+        try:
+            text_content = script_file.read().decode('utf-8')
+        except UnicodeDecodeError:
+            return jsonify({'error': 'The script file must be UTF-8 encoded text'}), 400
         
         # If no title was provided, use the filename (without extension) as title
         if not title and script_filename:
             title = os.path.splitext(script_filename)[0]
     
-    # Generate safe filename from title if available
-    output_filename = f"tts_{job_id}.mp3"
-    if title:
-        # Create a safe filename from the title
-        safe_title = secure_filename(title)
-        if safe_title:
-            output_filename = f"{safe_title}_{job_id}.mp3"
-    
-    output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
-    
     # Store title and other values in job info for reference
-    jobs[job_id] = {
-        'status': 'pending',
-        'script_file': script_path,
-        'output_file': output_path,
-        'start_time': time.time(),
-        'input_type': input_method,
-        'voice_id': voice_id,
-        'speed': speed,
-        'depth': depth,
-        'title': title,
-        'filename': output_filename
-    }
+    job = tts_job(job_id, title, input_method, voice_id, speed, depth, script_name=script_filename)
     
-    # Start the processing task in a background thread
-    process_task = generate_simple_tts(
-        script_path, output_path, voice_id, speed, depth
-    )
-    
-    thread = threading.Thread(
-        target=run_async_task,
-        args=(process_task, job_id)
-    )
-    thread.daemon = True
-    thread.start()
+    # Serve from cache or queue the processing task on the shared worker pool
+    try:
+        start_tts_job(job_id, job, text_content, voice_id, speed, depth)
+    except QueueFullError as e:
+        return busy_response(e)
     
     # Store job ID in session
     if 'jobs' not in session:
@@ -219,9 +388,213 @@ def upload_file():
     
     return redirect(url_for('job_status', job_id=job_id))
 
+@app.route('/api/tts', methods=['POST'])
+def api_create_tts():
+    """
+    Submit one script as JSON and get a job id back.
+
+    Expects JSON: {"text": ..., "voice": ..., "speed": ..., "depth": ..., "title": ..., "ssml": false}
+    The text is synthesized straight from the request; only the finished
+    audio is written to disk.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    
+    text = str(payload.get('text', '')).strip()
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+    try:
+        speed = float(payload.get('speed', 1.0))
+        depth = int(payload.get('depth', 1))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid speed or depth'}), 400
+    voice_id = payload.get('voice', 'en-US-JennyNeural')
+    title = str(payload.get('title', '')).strip()
+    is_ssml = bool(payload.get('ssml', False))
+    if is_ssml and not (text.startswith('<speak') and text.endswith('</speak>')):
+        text = f'<speak>{text}</speak>'
+    
+    job_id = generate_unique_id()
+    os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
+    job = tts_job(job_id, title, 'api', voice_id, speed, depth, is_ssml=is_ssml)
+    
+    try:
+        start_tts_job(job_id, job, text, voice_id, speed, depth, is_ssml)
+    except QueueFullError as e:
+        return busy_response(e, as_json=True)
+    
+    if 'jobs' not in session:
+        session['jobs'] = []
+    session['jobs'].append(job_id)
+    session.modified = True
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': job['status'],
+        'cached': job.get('cached', False),
+        'status_url': url_for('api_job_status', job_id=job_id),
+        'events_url': url_for('api_job_events', job_id=job_id),
+        'download_url': url_for('download_file', job_id=job_id)
+    }), 202
+
+@app.route('/api/batch', methods=['POST'])
+def api_create_batch():
+    """
+    Submit many scripts at once.
+
+    Expects JSON: {"items": [{"text": ..., "voice": ..., "speed": ..., "depth": ..., "title": ...}, ...]}
+    Every item becomes a regular TTS job on the shared worker pool.
+    """
+    payload = request.get_json(silent=True) or {}
+    items = payload.get('items')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Provide a non-empty "items" list'}), 400
+    if len(items) > app.config['BATCH_MAX_ITEMS']:
+        return jsonify({'error': f"A batch may contain at most {app.config['BATCH_MAX_ITEMS']} items"}), 400
+    
+    # Validate everything before creating any job
+    parsed_items = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify({'error': f'Item {index} must be an object'}), 400
+        text = str(item.get('text', '')).strip()
+        if not text:
+            return jsonify({'error': f'Item {index} has no text'}), 400
+        try:
+            speed = float(item.get('speed', 1.0))
+            depth = int(item.get('depth', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': f'Item {index} has an invalid speed or depth'}), 400
+        parsed_items.append({
+            'text': text,
+            'voice_id': item.get('voice', 'en-US-JennyNeural'),
+            'speed': speed,
+            'depth': depth,
+            'title': str(item.get('title', '')).strip(),
+        })
+    
+    # Reject the whole batch up front rather than queueing only part of it
+    if worker_pool.free_slots() < len(parsed_items):
+        return busy_response(QueueFullError(worker_pool.estimate_retry_after()), as_json=True)
+    
+    batch_id = f"batch_{generate_unique_id()}"
+    job_ids = []
+    
+    for item in parsed_items:
+        job_id = generate_unique_id()
+        job = tts_job(job_id, item['title'], 'batch', item['voice_id'], item['speed'], item['depth'],
+                      batch_id=batch_id)
+        
+        try:
+            start_tts_job(job_id, job, item['text'], item['voice_id'], item['speed'], item['depth'])
+        except QueueFullError as e:
+            # Another request took the free slots in the meantime; keep what was queued
+            print(f"Batch {batch_id} truncated at {len(job_ids)} items: {e}")
+            break
+        job_ids.append(job_id)
+    
+    if not job_ids:
+        return busy_response(QueueFullError(worker_pool.estimate_retry_after()), as_json=True)
+    
+    job_store.create_batch(batch_id, job_ids)
+    
+    if 'jobs' not in session:
+        session['jobs'] = []
+    session['jobs'].extend(job_ids)
+    session.modified = True
+    
+    return jsonify({
+        'batch_id': batch_id,
+        'job_ids': job_ids,
+        'accepted': len(job_ids),
+        'submitted': len(parsed_items),
+        'status_url': url_for('api_batch_status', batch_id=batch_id),
+        'download_url': url_for('download_batch', batch_id=batch_id)
+    }), 202
+
+def batch_summary(batch):
+    """Aggregate the status of every job in a batch"""
+    batch_jobs = job_store.get_many(batch['job_ids'])
+    counts = {'pending': 0, 'processing': 0, 'completed': 0, 'failed': 0}
+    segments_done = 0
+    segments_total = 0
+    
+    for job in batch_jobs.values():
+        counts[job['status']] = counts.get(job['status'], 0) + 1
+        if job['status'] == 'completed':
+            segments_done += job.get('segments_total', 1)
+            segments_total += job.get('segments_total', 1)
+        elif 'percent' in job:
+            # Media downloads report a percentage instead of segments
+            segments_done += job['percent'] / 100.0
+            segments_total += 1
+        else:
+            segments_done += job.get('segments_done', 0)
+            segments_total += job.get('segments_total', 1)
+    
+    total = len(batch['job_ids'])
+    finished = counts['completed'] + counts['failed']
+    return {
+        'batch_id': batch['batch_id'],
+        'created': batch['created'],
+        'total': total,
+        'counts': counts,
+        'finished': finished == total,
+        'progress': round(segments_done / segments_total, 3) if segments_total else 0.0,
+        'jobs': [
+            {
+                'job_id': job_id,
+                'status': job['status'],
+                'title': job.get('title', ''),
+                'url': job.get('url'),
+                'filename': job.get('filename'),
+                'error': job.get('error')
+            }
+            for job_id, job in batch_jobs.items()
+        ]
+    }
+
+@app.route('/api/batch/<batch_id>')
+def api_batch_status(batch_id):
+    batch = job_store.get_batch(batch_id)
+    if batch is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(batch_summary(batch))
+
+@app.route('/api/batch/<batch_id>/download')
+def download_batch(batch_id):
+    """Stream the batch's finished outputs as a ZIP, built on the fly"""
+    batch = job_store.get_batch(batch_id)
+    if batch is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    
+    batch_jobs = job_store.get_many(batch['job_ids'])
+    unfinished = [job_id for job_id, job in batch_jobs.items() if job['status'] in ('pending', 'processing')]
+    if unfinished and request.args.get('partial') != '1':
+        return jsonify({
+            'error': 'Batch is still running; add ?partial=1 to download the finished items',
+            'unfinished': len(unfinished)
+        }), 409
+    
+    files = [
+        (job.get('filename') or os.path.basename(job['result']), job['result'])
+        for job in batch_jobs.values()
+        if job['status'] == 'completed' and job.get('result') and os.path.exists(job['result'])
+    ]
+    if not files:
+        return jsonify({'error': 'No finished audio in this batch'}), 404
+    
+    return Response(
+        stream_with_context(stream_zip(files)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{batch_id}.zip"'}
+    )
+
 @app.route('/ssml')
 def ssml_page():
-    return render_template('ssml.html', voices=AVAILABLE_VOICES)
+    return render_template('ssml.html', voices=voice_catalog.voices())
 
 @app.route('/upload-ssml', methods=['POST'])
 def upload_ssml():
@@ -239,25 +612,16 @@ def upload_ssml():
     # Generate a unique job ID
     job_id = generate_unique_id()
     
-    # Create temp directories if they don't exist
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    # Create the output directory if it doesn't exist
     os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
     
-    # Save the SSML to a temporary file
-    script_filename = f"ssml_input_{job_id}.xml"
-    script_path = os.path.join(app.config['UPLOAD_FOLDER'], script_filename)
-    
-    with open(script_path, 'w', encoding='utf-8') as f:
-        f.write(ssml_content)
-    
     # Output file setup
     output_filename = f"tts_{job_id}.mp3"
     output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
     
     # Initialize job status
-    jobs[job_id] = {
+    job = {
         'status': 'pending',
-        'script_file': script_path,
         'output_file': output_path,
         'start_time': time.time(),
         'input_type': 'ssml',
@@ -265,17 +629,11 @@ def upload_ssml():
         'voice_id': voice_id
     }
     
-    # Start the processing task in a background thread
-    process_task = generate_simple_tts(
-        script_path, output_path, voice_id, 1.0, 1, True
-    )
-    
-    thread = threading.Thread(
-        target=run_async_task,
-        args=(process_task, job_id)
-    )
-    thread.daemon = True
-    thread.start()
+    # Serve from cache or queue the processing task on the shared worker pool
+    try:
+        start_tts_job(job_id, job, ssml_content, voice_id, 1.0, 1, True)
+    except QueueFullError as e:
+        return busy_response(e)
     
     # Store job ID in session
     if 'jobs' not in session:
@@ -287,44 +645,219 @@ def upload_ssml():
 
 @app.route('/status/<job_id>')
 def job_status(job_id):
-    if job_id not in jobs:
+    job = job_store.get(job_id)
+    if job is None:
         return render_template('error.html', message="Job not found.")
     
-    job = jobs[job_id]
-    # Pass the AVAILABLE_VOICES list to the template
-    return render_template('status.html', job_id=job_id, job=job, voices=AVAILABLE_VOICES)
+    # Pass the voice list to the template
+    return render_template('status.html', job_id=job_id, job=job, voices=voice_catalog.voices())
 
 @app.route('/api/status/<job_id>')
 def api_job_status(job_id):
-    if job_id not in jobs:
+    job = job_store.get(job_id)
+    if job is None:
         return jsonify({'error': 'Job not found'}), 404
     
-    job = jobs[job_id].copy()
     # Calculate elapsed time
     elapsed = time.time() - job['start_time']
     job['elapsed_time'] = elapsed
     
     return jsonify(job)
 
+@app.route('/api/queue')
+def api_queue_status():
+    return jsonify(worker_pool.stats())
+
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    return jsonify({'tts': tts_cache.stats(), 'sentences': sentence_cache.stats(), 'scripts': script_client.stats(),
+                    'voices': voice_catalog.stats(), 'downloads': download_cache.stats()})
+
+@app.route('/api/voices')
+def api_voices():
+    """
+    List voices, optionally filtered by ?locale= (en-GB or en), ?language= and ?gender=.
+
+    Answered from the cached catalog, never from the network.
+    """
+    voices = voice_catalog.voices(
+        locale=request.args.get('locale'),
+        language=request.args.get('language'),
+        gender=request.args.get('gender')
+    )
+    return jsonify({'voices': voices, 'count': len(voices)})
+
+def sse_message(event, data, event_id=None):
+    """Format one Server-Sent Events message"""
+    message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    if event_id is not None:
+        message = f"id: {event_id}\n" + message
+    return message
+
+# Events after which a job's event stream is closed
+TERMINAL_EVENTS = ('complete', 'failed')
+EVENT_POLL_MIN = 0.25  # Seconds between event polls right after an event
+EVENT_POLL_MAX = 2.0  # Poll interval reached while a job stays quiet
+
+@app.route('/api/events/<job_id>')
+def api_job_events(job_id):
+    """Server-Sent Events stream of a job's state transitions and progress"""
+    if job_store.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # Browsers resend the last id they saw when EventSource reconnects
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', 0)
+    try:
+        last_event_id = int(last_event_id)
+    except ValueError:
+        last_event_id = 0
+    
+    def generate(last_event_id):
+        last_sent = time.time()
+        poll_interval = EVENT_POLL_MIN
+        while True:
+            events = job_store.events_since(job_id, last_event_id)
+            for event_id, event, data in events:
+                yield sse_message(event, data, event_id)
+                last_event_id = event_id
+                last_sent = time.time()
+                if event in TERMINAL_EVENTS:
+                    return
+            
+            if events:
+                poll_interval = EVENT_POLL_MIN
+                continue
+            
+            # Nothing new: the terminal event may already have been sent before a
+            # reconnect, or never written at all, so check the job itself
+            job = job_store.get(job_id)
+            if job is None:
+                return
+            if job['status'] in ('completed', 'failed'):
+                # The event may have landed between the two reads; prefer the real one
+                events = job_store.events_since(job_id, last_event_id)
+                if events:
+                    continue
+                if job['status'] == 'completed':
+                    yield sse_message('complete', {'status': 'completed'})
+                else:
+                    yield sse_message('failed', {'status': 'failed', 'error': job.get('error')})
+                return
+            
+            # Comment line keeps proxies from closing an idle connection
+            if time.time() - last_sent > 15:
+                yield ": keep-alive\n\n"
+                last_sent = time.time()
+            # Poll quickly while the job is busy, backing off while it is idle
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 1.5, EVENT_POLL_MAX)
+    
+    return Response(
+        stream_with_context(generate(last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/download/<job_id>')
 def download_file(job_id):
-    if job_id not in jobs or jobs[job_id]['status'] != 'completed':
+    job = job_store.get(job_id)
+    if job is None or job['status'] != 'completed':
         return render_template('error.html', message="File not available for download.")
     
-    output_file = jobs[job_id]['result']
+    output_file = job['result']
+    if not os.path.exists(output_file):
+        # Removed by the janitor; the render may still be in the cache
+        if not (job.get('cache_key') and tts_cache.lookup(job['cache_key'], output_file)):
+            return render_template('error.html', message="This file has expired. Please generate it again.")
     # Get the custom filename from the job info
-    filename = jobs[job_id].get('filename', f"voiceover_{job_id}.mp3")
+    filename = job.get('filename', f"voiceover_{job_id}.mp3")
     
     return send_file(output_file, as_attachment=True, download_name=filename)
 
+SUBTITLE_FORMATS = {'vtt': 'text/vtt', 'srt': 'application/x-subrip'}
+
+@app.route('/subtitles/<job_id>')
+def download_subtitles(job_id):
+    """
+    Serve a finished job's subtitles.
+
+    Query parameters:
+        format: "vtt" (default) or "srt"
+        download: "1" to send them as an attachment
+    """
+    subtitle_format = request.args.get('format', 'vtt').lower()
+    if subtitle_format not in SUBTITLE_FORMATS:
+        return jsonify({'error': 'Unsupported format, use vtt or srt'}), 400
+    
+    job = job_store.get(job_id)
+    if job is None or job['status'] != 'completed':
+        return jsonify({'error': 'Subtitles not available'}), 404
+    
+    path = job.get(f'subtitles_{subtitle_format}')
+    if not path or not os.path.exists(path):
+        # Removed by the janitor (or never written); rebuild them from the cached timings
+        boundaries = tts_cache.boundaries(job['cache_key']) if job.get('cache_key') else None
+        fields = subtitle_fields(job['result'], boundaries)
+        if not fields:
+            return jsonify({'error': 'Subtitles not available'}), 404
+        job_store.update(job_id, **fields)
+        path = fields[f'subtitles_{subtitle_format}']
+    
+    filename = os.path.splitext(job.get('filename') or f"voiceover_{job_id}.mp3")[0]
+    return send_file(
+        path,
+        mimetype=SUBTITLE_FORMATS[subtitle_format],
+        as_attachment=request.args.get('download') == '1',
+        download_name=f"{filename}.{subtitle_format}"
+    )
+
+def follow_job_audio(job_id, poll_interval=0.5, block_size=64 * 1024):
+    """
+    Yield a running job's audio until it finishes.
+
+    A job queued or running in this process is followed from its in-memory
+    LiveAudio as it is synthesized. Any other job (one run by another worker
+    process, or one that just finished) is sent from its finished output once
+    it completes.
+    """
+    live_audio = live_streams.get(job_id)
+    if live_audio is not None:
+        yield from live_audio.follow()
+        return
+    
+    while True:
+        job = job_store.get(job_id)
+        if job is None or job['status'] == 'failed':
+            return
+        if job['status'] == 'completed':
+            break
+        time.sleep(poll_interval)
+    
+    if not os.path.exists(job.get('result') or ''):
+        return
+    with open(job['result'], 'rb') as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            yield data
+
 @app.route('/stream-audio/<job_id>')
 def stream_audio(job_id):
-    # Get the job data from your jobs dictionary
-    job = jobs.get(job_id)
+    # Get the job data from the job store
+    job = job_store.get(job_id)
     
     if not job:
         return "Job not found", 404
     
+    # While the job is running, stream the raw audio as it is synthesized
+    if job['status'] in ('pending', 'processing'):
+        return Response(
+            stream_with_context(follow_job_audio(job_id)),
+            mimetype='audio/mpeg',
+            headers={'Cache-Control': 'no-cache'}
+        )
+    
     # Check if job is completed
     if job['status'] != 'completed':
         return "Audio not ready for streaming", 404
@@ -347,14 +880,10 @@ def stream_audio(job_id):
 @app.route('/dashboard')
 def dashboard():
     user_jobs = session.get('jobs', [])
-    user_job_data = {}
-    
-    for job_id in user_jobs:
-        if job_id in jobs:
-            user_job_data[job_id] = jobs[job_id]
+    user_job_data = job_store.get_many(user_jobs)
     
-    # Pass the AVAILABLE_VOICES list to the template
-    return render_template('dashboard.html', jobs=user_job_data, voices=AVAILABLE_VOICES)
+    # Pass the voice list to the template
+    return render_template('dashboard.html', jobs=user_job_data, voices=voice_catalog.voices())
 
 # Error handlers
 @app.errorhandler(404)
@@ -371,71 +900,56 @@ def _jinja2_filter_datetime(timestamp):
     dt = datetime.fromtimestamp(timestamp)
     return dt.strftime('%Y-%m-%d %H:%M')
 
+def script_stream_response(prompt, label):
+    """
+    Stream a generated script to the browser as Server-Sent Events.
+
+    Each piece of text arrives as a 'token' event as soon as the model
+    produces it; a final 'done' event carries the whole script, identical
+    to what the non-streaming endpoint returns.
+    """
+    def generate():
+        pieces = []
+        try:
+            for text in script_client.stream(prompt):
+                pieces.append(text)
+                yield sse_message('token', {'text': text})
+        except Exception as e:
+            print(f"Error streaming {label}: {e}")
+            yield sse_message('error', {'error': 'Failed to generate script. Please try again later.'})
+            return
+        yield sse_message('done', {'success': True, 'script': ''.join(pieces)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/shorts-generator')
 def shorts_generator():
     """Route for the AI shorts script generator page"""
-    return render_template('shorts_generator.html', voices=AVAILABLE_VOICES, languages=AVAILABLE_LANGUAGES)
+    return render_template('shorts_generator.html', voices=voice_catalog.voices(), languages=voice_catalog.languages())
 
-@app.route('/generate-shorts-script', methods=['POST'])
-def generate_shorts_script():
-    # Get data from request
-    topic = request.form.get('topic', '').strip()
+def shorts_prompt_from_form(form):
+    """Build the shorts prompt from form data, returning (prompt, error)"""
+    topic = form.get('topic', '').strip()
     
     if not topic:
-        return jsonify({'error': 'Please provide a topic'}), 400
-    
-    # Configure prompt for Gemini
-    prompt = f"""
-Write a short voiceover script for a YouTube Short (30–60 seconds) that feels deep, timeless, and quietly powerful — like a secret worth remembering. The style should feel calm and wise, similar to Robert Greene, but written in simple English that anyone at a B2 level can understand.
-
-TOPIC: {topic}
-
-Guidelines:
-
-    Script must be between 60–75 words (about 30–60 seconds aloud)
-    
-    adapt the tone to be calm, wise, and reflective — like a quiet truth being shared
-
-    use a simple, conversational style that feels like a friend sharing a secret
-
-    adapte rick rubin's style: "The best way to get what you want is to help others get what they want."
-    Use a calm, wise tone that feels timeless and deep but is easy to understand
-    Use simple, relatable language that anyone can grasp
-
-    Use very simple
-
-    Start with a hook that feels mysterious, wise, or quietly intense — something that stops the scroll
-
-    Speak like a calm, trusted voice — slow, thoughtful, like someone sharing a quiet truth
-
-    Avoid clichés, hype, or big motivational phrases
-
-    Use contrast, irony, or surprising insight — reveal something hidden in plain sight
-
-    Keep flow natural and smooth — short sentences, no complex grammar
-
-    End with a soft, reflective thought or a warm call to action that invites the viewer to think or feel something
-
-    NO bullet points, formatting, brackets, or special characters — just clean voiceover text.no much pauses in the text
-
-    The output must only be the spoken script, ready for an AI or human voiceover
+        return None, 'Please provide a topic'
     
+    return build_shorts_script_prompt(topic), None
 
-It should feel cinematic, reflective, and easy to understand — like wisdom told simply.
-
-
-"""
+@app.route('/generate-shorts-script', methods=['POST'])
+def generate_shorts_script():
+    # Get data from request
+    prompt, error = shorts_prompt_from_form(request.form)
+    if error:
+        return jsonify({'error': error}), 400
     
     try:
-        # Configure the Gemini API with your key
-        setup_gemini_api(app.config['GEMINI_API_KEY'])
-           
-        # Generate content with Gemini
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-       
-        # Extract the generated text
-        script_text = response.text
+        # Generate content with the shared Gemini client (repeats come from cache)
+        script_text = script_client.generate(prompt)
        
         # Return the generated script
         return jsonify({
@@ -447,70 +961,35 @@ It should feel cinematic, reflective, and easy to understand — like wisdom tol
         print(f"Error generating shorts script: {e}")
         return jsonify({'error': 'Failed to generate script. Please try again later.'}), 500
 
-@app.route('/generate-script', methods=['POST'])
-def generate_script():
-    # Get data from request
-    title = request.form.get('title', '').strip()
-    idea1 = request.form.get('idea1', '').strip()
-    idea2 = request.form.get('idea2', '').strip()
-    idea3 = request.form.get('idea3', '').strip()
+@app.route('/generate-shorts-script/stream', methods=['POST'])
+def generate_shorts_script_stream():
+    prompt, error = shorts_prompt_from_form(request.form)
+    if error:
+        return jsonify({'error': error}), 400
+    return script_stream_response(prompt, 'shorts script')
+
+def video_prompt_from_form(form):
+    """Build the video script prompt from form data, returning (prompt, error)"""
+    title = form.get('title', '').strip()
+    idea1 = form.get('idea1', '').strip()
+    idea2 = form.get('idea2', '').strip()
+    idea3 = form.get('idea3', '').strip()
     
     if not title:
-        return jsonify({'error': 'Please provide a video title'}), 400
-    
-    # Configure prompt for Gemini
-    prompt = f"""
-Create a conversational, engaging script for a short educational video that:
-
-1) Teaches a practical concept, hack, or mental model in a direct, no-fluff style
-2) Uses simple language that flows naturally when spoken aloud
-3) Follows a clear structure: hook → explanation → examples → application → call-to-action
-
-TITLE: {title}
-
-Script Requirements:
-- Start with a striking hook that challenges assumptions (e.g., "You don't need to be creative to come up with creative ideas...")
-- Speak directly to the viewer using "you" statements throughout
-- Explain concepts using everyday language as if talking to a friend
-- Include specific, relatable examples that prove your point (like Jobs/iPhone, Shakespeare/stories)
-- Break down the concept into a simple process anyone can follow
-- Add unexpected connections or surprising insights that create "aha" moments
-- End with practical application advice that viewers can implement immediately
-
-Style Guide:
-- Write in short, punchy sentences that maintain momentum
-- Create a natural speaking rhythm with varied sentence length
-- Avoid all formatting (no lists, bullet points, headings, or special characters)
-- Use contractions and casual phrasing for a conversational feel
-- Include subtle transitions between ideas that flow logically
-- Incorporate rhetorical questions that make viewers think
-- Blend authoritative knowledge with friendly, accessible tone
-- Include specific action steps within the natural flow of speech
-- Keep the entire script between 300-400 words for a 2-3 minute video
-
-CONTENT STRUCTURE:
-1. Hook challenging a common belief about {idea1}
-2. Simple explanation of the concept/process behind {idea2}
-3. Real-world examples showing the concept in action
-4. Step-by-step method viewers can apply to {idea3}
-5. Quick demonstration of the method with a specific example
-6. Final takeaway reinforcing how accessible/powerful this approach is
-
-Return ONLY the clean, ready-to-record script with no additional text or formatting.
-"""
+        return None, 'Please provide a video title'
+    
+    return build_video_script_prompt(title, idea1, idea2, idea3), None
 
+@app.route('/generate-script', methods=['POST'])
+def generate_script():
+    # Get data from request
+    prompt, error = video_prompt_from_form(request.form)
+    if error:
+        return jsonify({'error': error}), 400
     
     try:
-        # Configure the Gemini API with your key
-        # No need to check if API key is set - just configure it each time
-        setup_gemini_api(app.config['GEMINI_API_KEY'])
-           
-        # Generate content with Gemini
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-       
-        # Extract the generated text
-        script_text = response.text
+        # Generate content with the shared Gemini client (repeats come from cache)
+        script_text = script_client.generate(prompt)
        
         # Return the generated script
         return jsonify({
@@ -522,13 +1001,112 @@ Return ONLY the clean, ready-to-record script with no additional text or formatt
         print(f"Error generating script: {e}")
         return jsonify({'error': 'Failed to generate script. Please try again later.'}), 500
 
+@app.route('/generate-script/stream', methods=['POST'])
+def generate_script_stream():
+    prompt, error = video_prompt_from_form(request.form)
+    if error:
+        return jsonify({'error': error}), 400
+    return script_stream_response(prompt, 'script')
+
 @app.route('/script-generator')
 def script_generator():
     """Route for the AI script generator page"""
-    return render_template('script_generator.html', voices=AVAILABLE_VOICES, languages=AVAILABLE_LANGUAGES)
-
-@app.route('/download-audio', methods=['POST'])
-def download_audio():
+    return render_template('script_generator.html', voices=voice_catalog.voices(), languages=voice_catalog.languages())
+
+def media_download_progress(download_id, min_interval=0.5):
+    """
+    Build a progress callback that records yt-dlp progress on a download job.
+
+    yt-dlp prints many updates per second; only phase changes, whole-percent
+    steps and at most one update per ``min_interval`` are written.
+    """
+    last = {'phase': None, 'percent': -1.0, 'time': 0.0}
+    
+    def report(progress):
+        now = time.time()
+        percent = progress.get('percent', last['percent'])
+        if (progress['phase'] == last['phase'] and percent - last['percent'] < 1
+                and now - last['time'] < min_interval):
+            return
+        last.update(phase=progress['phase'], percent=percent, time=now)
+        store_write_nowait(job_store.update, download_id, **progress)
+        store_write_nowait(job_store.append_event, download_id, 'progress', progress)
+    return report
+
+def create_media_download(media_type, url, custom_filename, batch_id=None, title=''):
+    """
+    Record a media download job.
+
+    Media that was downloaded before completes immediately from the cache.
+
+    Returns:
+        (download_id, coroutine_factory), where coroutine_factory is None
+        when the job is already complete and otherwise still has to be queued
+    """
+    download_id = str(uuid.uuid4())
+    job = {
+        'id': download_id,
+        'status': 'pending',
+        'kind': 'media_download',
+        'type': media_type,
+        'url': url,
+        'filename': download_name(url, media_type, custom_filename),
+        'title': title,
+        'start_time': time.time(),
+        'timestamp': time.time()
+    }
+    if batch_id:
+        job['batch_id'] = batch_id
+    
+    cached_file = download_cache.lookup(url, media_type)
+    if cached_file:
+        job.update(status='completed', result=cached_file, file_path=cached_file,
+                   cached='hit', phase='done', percent=100.0)
+        job_store.create(download_id, job)
+        job_store.append_event(download_id, 'complete', {'status': 'completed'})
+        return download_id, None
+    
+    job_store.create(download_id, job)
+    job_store.append_event(download_id, 'status', {'status': 'pending'})
+    
+    async def download():
+        output_file, how = await download_cache.fetch(url, media_type, media_download_progress(download_id))
+        await store_write(job_store.update, download_id, file_path=output_file, cached=how,
+                          phase='done', percent=100.0)
+        return output_file
+    
+    return download_id, lambda: run_async_task(download, download_id)
+
+def start_media_download(media_type, url, custom_filename):
+    """
+    Record a media download job and queue it on the download pool.
+
+    Returns:
+        The new download id
+
+    Raises:
+        QueueFullError: If the download queue is full
+    """
+    download_id, coroutine_factory = create_media_download(media_type, url, custom_filename)
+    if coroutine_factory is None:
+        return download_id
+    
+    try:
+        download_pool.submit(coroutine_factory)
+    except QueueFullError:
+        job_store.delete(download_id)
+        raise
+    return download_id
+
+def get_media_download(download_id):
+    """Return a media download job, or None"""
+    download = job_store.get(download_id)
+    if download is None or download.get('kind') != 'media_download':
+        return None
+    return download
+
+def media_download_response(media_type):
+    """Validate a download form and queue the job, answering immediately"""
     # Get the URL and optional filename
     url = request.form.get('url', '').strip()
     custom_filename = request.form.get('filename', '').strip()
@@ -543,147 +1121,202 @@ def download_audio():
             'error': 'yt-dlp is not installed. Please install it with: pip install yt-dlp'
         })
     
-    # Generate a unique ID for this download
-    download_id = str(uuid.uuid4())
-    
     try:
-        # Create downloads directories if they don't exist
-        downloads_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
-        os.makedirs(downloads_folder, exist_ok=True)
-        
-        # Create a subfolder for audio downloads
-        audio_folder = os.path.join(downloads_folder, 'audio')
-        os.makedirs(audio_folder, exist_ok=True)
-        
-        # Download the MP3
-        output_file = download_mp3(url, audio_folder, custom_filename)
-        
-        if not output_file:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to download audio. Please check the URL and try again.'
-            })
-        
-        # Get the filename from the path
-        filename = os.path.basename(output_file)
-        
-        # Store download info (using global dictionary)
-        if not hasattr(app, 'media_downloads'):
-            app.media_downloads = {}
-        
-        app.media_downloads[download_id] = {
-            'id': download_id,
-            'type': 'audio',
-            'url': url,
-            'file_path': output_file,
-            'filename': filename,
-            'timestamp': time.time()
-        }
-        
-        # Store download ID in session
-        if 'media_downloads' not in session:
-            session['media_downloads'] = []
-        session['media_downloads'].append(download_id)
-        session.modified = True
-        
-        return jsonify({
-            'success': True,
-            'download_id': download_id,
-            'filename': filename,
-            'download_url': url_for('download_media', download_id=download_id)
-        })
-        
-    except Exception as e:
-        print(f"Error downloading audio: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': f"An error occurred: {str(e)}"
-        })
+        download_id = start_media_download(media_type, url, custom_filename)
+    except QueueFullError as e:
+        return busy_response(e, as_json=True)
+    
+    # Store download ID in session
+    if 'media_downloads' not in session:
+        session['media_downloads'] = []
+    session['media_downloads'].append(download_id)
+    session.modified = True
+    
+    return jsonify({
+        'success': True,
+        'download_id': download_id,
+        'status': 'pending',
+        'status_url': url_for('api_media_download_status', download_id=download_id),
+        'events_url': url_for('api_job_events', job_id=download_id),
+        'download_url': url_for('download_media', download_id=download_id)
+    }), 202
+
+@app.route('/download-audio', methods=['POST'])
+def download_audio():
+    return media_download_response('audio')
 
 # Route for downloading Pinterest videos
 @app.route('/download-video', methods=['POST'])
 def download_video():
-    # Get the URL and optional filename
-    url = request.form.get('url', '').strip()
-    custom_filename = request.form.get('filename', '').strip()
-    
-    if not url:
-        return jsonify({'success': False, 'error': 'No URL provided'})
+    return media_download_response('video')
+
+@app.route('/api/media-downloads/batch', methods=['POST'])
+def api_media_download_batch():
+    """
+    Download many URLs, optionally expanding playlists and channels, as one batch.
+
+    Expects JSON: {"urls": [...], "type": "audio" | "video", "playlist": false, "concurrency": 2}
+
+    Items run on the shared download pool, at most ``concurrency`` of them
+    at a time (capped by MEDIA_MAX_CONCURRENT_DOWNLOADS). Progress and the
+    ZIP of finished files use the regular /api/batch/<batch_id> routes.
+    """
+    payload = request.get_json(silent=True) or {}
+    urls = payload.get('urls')
+    media_type = payload.get('type', 'audio')
+    expand = bool(payload.get('playlist', False))
+    max_items = app.config['MEDIA_BATCH_MAX_ITEMS']
+    
+    if not isinstance(urls, list) or not urls:
+        return jsonify({'error': 'Provide a non-empty "urls" list'}), 400
+    if len(urls) > max_items:
+        return jsonify({'error': f"A batch may contain at most {max_items} URLs"}), 400
+    if media_type not in ('audio', 'video'):
+        return jsonify({'error': 'type must be "audio" or "video"'}), 400
+    urls = [str(url).strip() for url in urls]
+    if not all(url.startswith(('http://', 'https://')) for url in urls):
+        return jsonify({'error': 'Every URL must start with http:// or https://'}), 400
+    try:
+        concurrency = int(payload.get('concurrency', download_pool.max_concurrent))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'concurrency must be a number'}), 400
+    concurrency = max(1, min(concurrency, download_pool.max_concurrent))
     
-    # Check if yt-dlp is installed
     if not check_yt_dlp_installed():
-        return jsonify({
-            'success': False, 
-            'error': 'yt-dlp is not installed. Please install it with: pip install yt-dlp'
-        })
-    
-    # Generate a unique ID for this download
-    download_id = str(uuid.uuid4())
-    
-    try:
-        # Create downloads directories if they don't exist
-        downloads_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
-        os.makedirs(downloads_folder, exist_ok=True)
-        
-        # Create a subfolder for video downloads
-        video_folder = os.path.join(downloads_folder, 'video')
-        os.makedirs(video_folder, exist_ok=True)
-        
-        # Download the video
-        output_file = download_pinterest_video(url, video_folder, custom_filename)
-        
-        if not output_file:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to download video. Please check the URL and try again.'
+        return jsonify({'error': 'yt-dlp is not installed. Please install it with: pip install yt-dlp'}), 503
+    
+    batch_id = f"media_{generate_unique_id()}"
+    created = time.time()
+    job_ids = []
+    
+    def add_items(items):
+        """Create a download job per item; return (download_id, factory) for those still to be queued"""
+        pending = []
+        for item in items:
+            if len(job_ids) >= max_items:
+                print(f"Batch {batch_id} stopped at {max_items} items")
+                break
+            download_id, coroutine_factory = create_media_download(
+                media_type, item['url'], item['title'], batch_id=batch_id, title=item['title']
+            )
+            job_ids.append(download_id)
+            if coroutine_factory is not None:
+                pending.append((download_id, coroutine_factory))
+        job_store.create_batch(batch_id, job_ids, created=created)
+        return pending
+    
+    expansions = []
+    if expand:
+        # One job per URL lists its entries; the batch grows as they are found
+        for url in urls:
+            expansion_id = str(uuid.uuid4())
+            job_store.create(expansion_id, {
+                'status': 'pending',
+                'kind': 'playlist_expansion',
+                'url': url,
+                'title': f"Playlist {url}",
+                'batch_id': batch_id,
+                'start_time': created
             })
-        
-        # Get the filename from the path
-        filename = os.path.basename(output_file)
-        
-        # Store download info (using global dictionary)
-        if not hasattr(app, 'media_downloads'):
-            app.media_downloads = {}
-        
-        app.media_downloads[download_id] = {
-            'id': download_id,
-            'type': 'video',
-            'url': url,
-            'file_path': output_file,
-            'filename': filename,
-            'timestamp': time.time()
-        }
-        
-        # Store download ID in session
-        if 'media_downloads' not in session:
-            session['media_downloads'] = []
-        session['media_downloads'].append(download_id)
-        session.modified = True
-        
-        return jsonify({
-            'success': True,
-            'download_id': download_id,
-            'filename': filename,
-            'download_url': url_for('download_media', download_id=download_id)
-        })
-        
-    except Exception as e:
-        print(f"Error downloading video: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': f"An error occurred: {str(e)}"
-        })
+            expansions.append((expansion_id, url))
+            job_ids.append(expansion_id)
+        job_store.create_batch(batch_id, job_ids, created=created)
+        pending = []
+    else:
+        pending = add_items([{'url': url, 'title': ''} for url in urls])
+    
+    async def feed(pending):
+        queued = set()
+        try:
+            for expansion_id, url in expansions:
+                await store_write(job_store.update, expansion_id, status='processing')
+                try:
+                    entries = await expand_playlist(url, max_items - len(job_ids), engine=media_engine)
+                except Exception as e:
+                    print(f"Error expanding {url}: {e}")
+                    await store_write(job_store.update, expansion_id, status='failed', error=str(e))
+                    continue
+                # Add the entries before completing the expansion so the batch never looks finished early
+                pending.extend(await asyncio.to_thread(add_items, entries))
+                await store_write(job_store.update, expansion_id, status='completed', entries=len(entries))
+            
+            # Only `concurrency` items of this batch hold worker slots at once
+            semaphore = asyncio.Semaphore(concurrency)
+            for download_id, coroutine_factory in pending:
+                await semaphore.acquire()
+                
+                async def run(coroutine_factory=coroutine_factory):
+                    try:
+                        await coroutine_factory()
+                    finally:
+                        semaphore.release()
+                
+                await download_pool.enqueue(run)
+                queued.add(download_id)
+        except Exception as e:
+            # Nothing else would run the jobs not handed to the pool yet; fail them so the batch finishes
+            print(f"Error feeding batch {batch_id}: {e}")
+            error = f"The batch could not be queued: {e}"
+            jobs = await asyncio.to_thread(job_store.get_many, list(job_ids))
+            for job_id, job in jobs.items():
+                if job_id in queued or job['status'] not in ('pending', 'processing'):
+                    continue
+                await store_write(job_store.update, job_id, status='failed', error=error)
+                await store_write(job_store.append_event, job_id, 'failed', {'status': 'failed', 'error': error})
+    
+    # The feeder runs beside the workers, not in a worker slot
+    download_pool.run_coroutine(feed(pending))
+    
+    return jsonify({
+        'batch_id': batch_id,
+        'submitted': len(urls),
+        'playlist': expand,
+        'concurrency': concurrency,
+        'status_url': url_for('api_batch_status', batch_id=batch_id),
+        'download_url': url_for('download_batch', batch_id=batch_id)
+    }), 202
+
+@app.route('/api/media-downloads/<download_id>')
+def api_media_download_status(download_id):
+    """Status and live progress of a queued media download"""
+    download = get_media_download(download_id)
+    if download is None:
+        return jsonify({'error': 'Download not found'}), 404
+    
+    response = {
+        key: download.get(key)
+        for key in ('id', 'type', 'url', 'status', 'phase', 'percent', 'total', 'speed', 'eta', 'filename',
+                    'cached', 'error')
+    }
+    if download['status'] == 'completed':
+        response['download_url'] = url_for('download_media', download_id=download_id)
+    return jsonify(response)
+
+@app.route('/api/storage', methods=['GET', 'POST'])
+def api_storage():
+    """Janitor metrics; POST queues a sweep on the janitor thread"""
+    if request.method == 'POST':
+        # A sweep walks every directory, so it never runs on the request thread;
+        # poll GET until last_sweep_at moves to see its result
+        janitor.request_sweep()
+        return jsonify(janitor.stats()), 202
+    return jsonify(janitor.stats())
+
+@app.route('/api/media-downloads')
+def api_media_download_queue():
+    stats = download_pool.stats()
+    stats['engine'] = media_engine.stats() if media_engine else {'engine': 'subprocess'}
+    return jsonify(stats)
 
 # Route for downloading the media file
 @app.route('/download-media/<download_id>')
 def download_media(download_id):
-    if not hasattr(app, 'media_downloads'):
-        app.media_downloads = {}
-        
-    if download_id not in app.media_downloads:
+    download = get_media_download(download_id)
+    if download is None or download['status'] != 'completed':
         return render_template('error.html', message="Download not found.")
+    if not os.path.exists(download['file_path']):
+        return render_template('error.html', message="This download has expired. Please download it again.")
     
-    download = app.media_downloads[download_id]
     return send_file(
         download['file_path'],
         as_attachment=True,
@@ -694,28 +1327,23 @@ def download_media(download_id):
 @app.route('/download-history')
 def download_history():
     user_downloads = session.get('media_downloads', [])
-    user_download_data = {}
-    
-    if not hasattr(app, 'media_downloads'):
-        app.media_downloads = {}
-    
-    for download_id in user_downloads:
-        if download_id in app.media_downloads:
-            user_download_data[download_id] = app.media_downloads[download_id]
+    user_download_data = {
+        download_id: download
+        for download_id, download in job_store.get_many(user_downloads).items()
+        if download.get('kind') == 'media_download'
+    }
     
     return render_template('download_history.html', downloads=user_download_data)
 
 # Add a conversion option to send downloaded audio to voice generator
 @app.route('/convert-to-voice/<download_id>')
 def convert_to_voice(download_id):
-    if not hasattr(app, 'media_downloads'):
-        app.media_downloads = {}
-        
-    if download_id not in app.media_downloads or app.media_downloads[download_id]['type'] != 'audio':
+    download = get_media_download(download_id)
+    if download is None or download['type'] != 'audio' or download['status'] != 'completed':
         return render_template('error.html', message="Audio file not found.")
     
     # Get the file path
-    audio_file = app.media_downloads[download_id]['file_path']
+    audio_file = download['file_path']
     
     # Redirect to the main voice generator page with a parameter
     # to indicate we want to use this audio file
@@ -731,95 +1359,40 @@ def media_downloader():
 @app.route('/marketing-generator')
 def marketing_generator():
     """Route for the marketing script generator page"""
-    return render_template('marketing_generator.html', voices=AVAILABLE_VOICES, languages=AVAILABLE_LANGUAGES)
-
-@app.route('/generate-marketing-script', methods=['POST'])
-def generate_marketing_script():
-    # Get data from request
-    content_type = request.form.get('contentType', '').strip()
-    product_name = request.form.get('productName', '').strip()
-    target_audience = request.form.get('targetAudience', '').strip()
-    main_benefit = request.form.get('mainBenefit', '').strip()
-    key_features = request.form.get('keyFeatures', '').strip()
-    call_to_action = request.form.get('callToAction', '').strip()
-    script_length = request.form.get('scriptLength', 'medium').strip()
-    tone = request.form.get('tone', 'professional').strip()
-    additional_info = request.form.get('additionalInfo', '').strip()
+    return render_template('marketing_generator.html', voices=voice_catalog.voices(), languages=voice_catalog.languages())
+
+def marketing_prompt_from_form(form):
+    """Build the marketing prompt from form data, returning (prompt, error)"""
+    content_type = form.get('contentType', '').strip()
+    product_name = form.get('productName', '').strip()
+    target_audience = form.get('targetAudience', '').strip()
+    main_benefit = form.get('mainBenefit', '').strip()
+    key_features = form.get('keyFeatures', '').strip()
+    call_to_action = form.get('callToAction', '').strip()
+    script_length = form.get('scriptLength', 'medium').strip()
+    tone = form.get('tone', 'professional').strip()
+    additional_info = form.get('additionalInfo', '').strip()
     
     # Validate required fields
     if not product_name or not target_audience or not main_benefit:
-        return jsonify({'error': 'Please provide product name, target audience, and main benefit'}), 400
-    
-    # Map script length to word count and duration
-    length_mapping = {
-        'short': "80-120 words (30-60 seconds)",
-        'medium': "150-250 words (1-2 minutes)",
-        'long': "300-450 words (2-3 minutes)"
-    }
+        return None, 'Please provide product name, target audience, and main benefit'
     
-    # Map tone to descriptive text
-    tone_descriptions = {
-        'professional': "professional, authoritative, and trustworthy",
-        'conversational': "friendly, casual, and conversational",
-        'enthusiastic': "energetic, passionate, and excited",
-        'empathetic': "understanding, compassionate, and empathetic",
-        'humorous': "light, engaging, and subtly humorous",
-        'urgent': "urgent, compelling, and action-oriented"
-    }
-    
-    # Configure prompt for Gemini based on script type
-    prompt_prefix = ""
-    
-    if content_type == "product_explainer":
-        prompt_prefix = "Create a persuasive product explainer script that demonstrates features and benefits"
-    elif content_type == "lead_generation":
-        prompt_prefix = "Create a lead generation script focused on collecting contact information in exchange for value"
-    elif content_type == "sales_pitch":
-        prompt_prefix = "Create a direct sales pitch script designed to convert viewers into customers"
-    elif content_type == "testimonial_style":
-        prompt_prefix = "Create a testimonial-style script that tells a success story about using this product"
-    elif content_type == "educational":
-        prompt_prefix = "Create an educational marketing script that teaches while subtly promoting the product"
-    
-    # Build the complete prompt
-    prompt = f"""
-{prompt_prefix} for a {tone_descriptions.get(tone, "professional")} marketing video.
-
-PRODUCT: {product_name}
-TARGET AUDIENCE: {target_audience}
-PRIMARY BENEFIT: {main_benefit}
-KEY FEATURES: {key_features}
-CALL TO ACTION: {call_to_action}
-ADDITIONAL CONTEXT: {additional_info}
-
-Guidelines:
-- Script should be {length_mapping.get(script_length, "150-250 words (1-2 minutes)")} when spoken aloud
-- Use a {tone_descriptions.get(tone, "professional")} tone throughout
-- Start with a strong hook that grabs attention
-- Focus on benefits to the audience, not just features
-- Address pain points and how the product solves them
-- Include the call to action clearly and persuasively
-- Use conversational language (avoid jargon unless necessary for the audience)
-- Make the value proposition crystal clear
-- Create emotional connection with the audience when appropriate
-- Use social proof elements if relevant
-- Write in a natural speaking voice with smooth transitions
-- IMPORTANT: Output ONLY the script text, nothing else
-- NO bullet points, NO formatting, NO notes - just clean voiceover text
-
-The script should feel persuasive and compelling, with a clear focus on how {product_name} helps {target_audience} achieve {main_benefit}.
-"""
+    prompt = build_marketing_script_prompt(
+        content_type, product_name, target_audience, main_benefit,
+        key_features, call_to_action, script_length, tone, additional_info
+    )
+    return prompt, None
+
+@app.route('/generate-marketing-script', methods=['POST'])
+def generate_marketing_script():
+    # Get data from request
+    prompt, error = marketing_prompt_from_form(request.form)
+    if error:
+        return jsonify({'error': error}), 400
     
     try:
-        # Configure the Gemini API with your key
-        setup_gemini_api(app.config['GEMINI_API_KEY'])
-           
-        # Generate content with Gemini
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-       
-        # Extract the generated text
-        script_text = response.text
+        # Generate content with the shared Gemini client (repeats come from cache)
+        script_text = script_client.generate(prompt)
        
         # Return the generated script
         return jsonify({
@@ -830,6 +1403,139 @@ The script should feel persuasive and compelling, with a clear focus on how {pro
     except Exception as e:
         print(f"Error generating marketing script: {e}")
         return jsonify({'error': 'Failed to generate script. Please try again later.'}), 500
+
+@app.route('/generate-marketing-script/stream', methods=['POST'])
+def generate_marketing_script_stream():
+    prompt, error = marketing_prompt_from_form(request.form)
+    if error:
+        return jsonify({'error': error}), 400
+    return script_stream_response(prompt, 'marketing script')
+    
+# Form parsers for the script endpoints, by the "kind" /generate-voiceover accepts
+SCRIPT_PROMPT_BUILDERS = {
+    'video': video_prompt_from_form,
+    'shorts': shorts_prompt_from_form,
+    'marketing': marketing_prompt_from_form,
+}
+
+@app.route('/generate-voiceover', methods=['POST'])
+def generate_voiceover():
+    """
+    Generate a script and speak it as one job.
+
+    Takes the same form fields as the matching /generate-*-script endpoint
+    (chosen with "kind": video, shorts or marketing) plus voice, speed, depth
+    and an optional voiceoverTitle. The script is cut at sentence boundaries
+    while the model is still writing and each sentence is synthesized as soon
+    as it is complete, so the wait is close to the longer of the two steps
+    rather than their sum.
+
+    Script text is published as 'script' events on /api/events/<job_id>; the
+    audio goes through the usual status, stream and download routes.
+    """
+    kind = request.form.get('kind', 'shorts')
+    prompt_from_form = SCRIPT_PROMPT_BUILDERS.get(kind)
+    if prompt_from_form is None:
+        return jsonify({'error': f"Unknown script kind: {kind}"}), 400
+    
+    prompt, error = prompt_from_form(request.form)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    voice_id = request.form.get('voice', 'en-US-JennyNeural')
+    try:
+        speed = float(request.form.get('speed', 1.0))
+        depth = int(request.form.get('depth', 1))
+    except ValueError:
+        return jsonify({'error': 'Invalid speed or depth'}), 400
+    title = (request.form.get('voiceoverTitle') or request.form.get('title')
+             or request.form.get('topic') or request.form.get('productName') or '').strip()
+    
+    job_id = generate_unique_id()
+    output_filename = output_filename_for(title, job_id)
+    output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
+    
+    job = {
+        'status': 'pending',
+        'output_file': output_path,
+        'start_time': time.time(),
+        'input_type': 'generated',
+        'voice_id': voice_id,
+        'speed': speed,
+        'depth': depth,
+        'title': title,
+        'filename': output_filename
+    }
+    
+    cached_script = script_client.cached(prompt)
+    try:
+        if cached_script is not None:
+            # The script is already known: this is a plain TTS job (and may be cached too)
+            start_tts_job(job_id, job, cached_script, voice_id, speed, depth)
+        else:
+            start_pipelined_job(job_id, job, prompt)
+    except QueueFullError as e:
+        return busy_response(e, as_json=True)
+    
+    if 'jobs' not in session:
+        session['jobs'] = []
+    session['jobs'].append(job_id)
+    session.modified = True
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'events_url': url_for('api_job_events', job_id=job_id),
+        'download_url': url_for('download_file', job_id=job_id)
+    }), 202
+
+def start_pipelined_job(job_id, job, prompt):
+    """
+    Record a generate-and-speak job and queue it on the worker pool.
+
+    Raises:
+        QueueFullError: If the pool is full
+    """
+    live_audio = live_streams.open(job_id)
+    job_store.create(job_id, job)
+    job_store.append_event(job_id, 'status', {'status': 'pending'})
+    
+    async def generate_and_speak():
+        pieces = []
+        
+        async def script_pieces():
+            async for piece in script_client.astream(prompt):
+                pieces.append(piece)
+                store_write_nowait(job_store.append_event, job_id, 'script', {'text': piece})
+                yield piece
+        
+        boundaries = []
+        try:
+            result = await generate_tts_from_stream(
+                script_pieces(), job['voice_id'], job['speed'], job['depth'],
+                progress_callback=progress_reporter(job_id), live_audio=live_audio,
+                output_audio=job['output_file'], sentence_cache=sentence_cache,
+                word_boundaries=boundaries
+            )
+        finally:
+            live_streams.close(job_id)
+        fields = await asyncio.to_thread(subtitle_fields, job['output_file'], boundaries)
+        await store_write(job_store.update, job_id, **fields)
+        
+        script_text = ''.join(pieces)
+        
+        # Cache under the finished script so a plain /upload of it is a hit
+        key = cache_key(script_text, job['voice_id'], job['speed'], job['depth'], False)
+        await store_write(job_store.update, job_id, cache_key=key)
+        return await asyncio.to_thread(tts_cache.store, key, result, job['output_file'], boundaries)
+    
+    try:
+        submit_job(job_id, generate_and_speak)
+    except QueueFullError:
+        live_streams.close(job_id)
+        job_store.delete(job_id)
+        raise
     
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import io
+
+from pydub import AudioSegment
+from pydub.effects import speedup
+
+from dsp import segment_to_array, array_to_segment
+
+# Optional: libsndfile >= 1.1 decodes and encodes MP3 in-process, which avoids
+# spawning ffmpeg for every job. Without it, pydub/ffmpeg is used.
+try:
+    import soundfile as sf
+    HAVE_SOUNDFILE_MP3 = 'MP3' in sf.available_formats()
+except (ImportError, OSError):
+    sf = None
+    HAVE_SOUNDFILE_MP3 = False
+
+PCM_SAMPLE_WIDTH = 2  # 16-bit, used whenever samples go through pydub
+
+
+def decode_mp3(source):
+    """
+    Decode MP3 data to PCM exactly once.
+
+    Args:
+        source: File path, MP3 bytes or binary file object
+
+    Returns:
+        (samples, sample_rate) with samples as float32 of shape (frames, channels)
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    if HAVE_SOUNDFILE_MP3:
+        samples, sample_rate = sf.read(source, dtype='float32', always_2d=True)
+        return samples, sample_rate
+
+    segment = AudioSegment.from_file(source, format='mp3')
+    return segment_to_array(segment), segment.frame_rate
+
+
+def encode_mp3(samples, sample_rate, output_path, bitrate='192k'):
+    """
+    Encode PCM samples to an MP3 file (a path or a writable binary file object).
+
+    With libsndfile the highest constant bitrate for the sample rate is used
+    (160 kbps for the 24 kHz audio Edge TTS produces, the MPEG-2 maximum);
+    the ffmpeg fallback uses ``bitrate``.
+    """
+    if HAVE_SOUNDFILE_MP3:
+        sf.write(output_path, samples, sample_rate, format='MP3',
+                 bitrate_mode='CONSTANT', compression_level=0.0)
+    else:
+        segment = array_to_segment(samples, sample_rate, PCM_SAMPLE_WIDTH)
+        segment.export(output_path, format='mp3', bitrate=bitrate)
+    return output_path
+
+
+def change_speed(samples, sample_rate, playback_speed):
+    """Time-compress or stretch PCM samples with pydub's speedup, in memory"""
+    segment = array_to_segment(samples, sample_rate, PCM_SAMPLE_WIDTH)
+    return segment_to_array(speedup(segment, playback_speed=playback_speed))
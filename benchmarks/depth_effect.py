@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: depth effect, pydub filter chain vs. vectorized NumPy/SciPy engine
+
+Synthesizes a speech-like test signal (24 kHz mono, 16-bit, the format Edge
+TTS audio decodes to), runs both implementations and reports run time and
+how closely the outputs agree.
+
+Usage:
+  python benchmarks/depth_effect.py
+  python benchmarks/depth_effect.py --minutes 1 10 --depth 5
+  python benchmarks/depth_effect.py --skip-pydub --minutes 60
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from pydub import AudioSegment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dsp
+
+SAMPLE_RATE = 24000
+
+
+def make_test_audio(minutes, seed=0):
+    """Harmonic tone with a wobbling pitch plus noise, roughly speech-shaped"""
+    rng = np.random.default_rng(seed)
+    frames = int(minutes * 60 * SAMPLE_RATE)
+    t = np.arange(frames) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 6)) * 0.25
+    signal += 0.02 * rng.standard_normal(frames)
+    samples = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    return AudioSegment(samples.tobytes(), frame_rate=SAMPLE_RATE, sample_width=2, channels=1)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(reference, candidate):
+    """Signal-to-difference ratio in dB between two AudioSegments"""
+    a = np.array(reference.get_array_of_samples(), dtype=np.float64)
+    b = np.array(candidate.get_array_of_samples(), dtype=np.float64)
+    noise = np.sum((a - b) ** 2)
+    if noise == 0:
+        return float('inf')
+    return 10 * np.log10(np.sum(a ** 2) / noise)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the depth effect implementations")
+    parser.add_argument("--minutes", nargs="+", type=float, default=[1, 10, 60])
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--skip-pydub", action="store_true", help="Only time the NumPy engine")
+    args = parser.parse_args()
+
+    if not dsp.HAVE_SCIPY:
+        print("SciPy is not installed; the vectorized engine is unavailable")
+        return
+
+    print(f"Depth effect (depth={args.depth}), {SAMPLE_RATE} Hz mono 16-bit")
+    print(f"{'minutes':>8} {'pydub':>10} {'numpy':>10} {'speedup':>9} {'SNR dB':>8}")
+    print("-" * 49)
+
+    for minutes in args.minutes:
+        audio = make_test_audio(minutes)
+        fast, fast_time = timed(dsp.depth_effect_numpy, audio, args.depth)
+
+        if args.skip_pydub:
+            print(f"{minutes:>8g} {'-':>10} {fast_time:>9.2f}s {'-':>9} {'-':>8}")
+            continue
+
+        reference, ref_time = timed(dsp.depth_effect_pydub, audio, args.depth)
+        snr = compare(reference, fast)
+        print(f"{minutes:>8g} {ref_time:>9.2f}s {fast_time:>9.2f}s {ref_time / fast_time:>8.0f}x {snr:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
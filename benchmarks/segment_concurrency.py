@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: wall-clock time of segmented synthesis vs. segment count and concurrency
+
+By default each segment is replaced with a stub that sleeps for a fixed
+latency, which isolates the scheduling behaviour from network noise. Pass
+--live to send real requests to the Edge TTS service instead.
+
+Usage:
+  python benchmarks/segment_concurrency.py
+  python benchmarks/segment_concurrency.py --latency 1.5 --segments 1 8 32
+  python benchmarks/segment_concurrency.py --live --segments 1 4 8
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import edge_tts_script
+
+SAMPLE_SENTENCE = "The quick brown fox jumps over the lazy dog while the narrator keeps reading. "
+
+
+def make_stub(latency, jitter):
+    rng = random.Random(0)
+
+    async def stub_segment(text, output_file, *args, **kwargs):
+        # Jitter makes segments finish out of order, like real requests do
+        await asyncio.sleep(latency * (1 + rng.uniform(-jitter, jitter)))
+        with open(output_file, 'wb') as f:
+            f.write(b'\0' * 1024)
+        return True
+    return stub_segment
+
+
+async def time_run(segment_count, concurrency):
+    segments = [SAMPLE_SENTENCE * 4 for _ in range(segment_count)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        files = await edge_tts_script.generate_segments(
+            segments, temp_dir, max_concurrency=concurrency
+        )
+        elapsed = time.perf_counter() - start
+
+    # Ordering must survive out-of-order completion
+    expected = [os.path.join(temp_dir, f"segment_{i:03d}.mp3") for i in range(segment_count)]
+    assert files == expected, "segments returned out of order"
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent segment synthesis")
+    parser.add_argument("--segments", nargs="+", type=int, default=[1, 4, 16, 32])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub latency per segment (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Relative latency jitter for the stub")
+    parser.add_argument("--live", action="store_true", help="Call the real Edge TTS service")
+    args = parser.parse_args()
+
+    edge_tts_script.DEBUG_MODE = False
+    edge_tts_script.log_debug = lambda *a, **k: None
+    if not args.live:
+        edge_tts_script.generate_speech_segment = make_stub(args.latency, args.jitter)
+
+    mode = "live" if args.live else f"stub, {args.latency:.2f}s/segment"
+    print(f"Segment synthesis wall-clock time ({mode})")
+    header = f"{'segments':>10}" + "".join(f"{'c=' + str(c):>10}" for c in args.concurrency)
+    print(header)
+    print("-" * len(header))
+
+    for segment_count in args.segments:
+        row = f"{segment_count:>10}"
+        for concurrency in args.concurrency:
+            elapsed = await time_run(segment_count, concurrency)
+            row += f"{elapsed:>9.2f}s"
+        print(row)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-download overhead of the yt-dlp command vs. the in-process engine
+
+Both paths download the same media the same number of times. By default the
+"media" is a local file fetched through a file:// URL, so the numbers measure
+process start-up, extractor import and option handling rather than the
+network. Pass --url to time a real download instead.
+
+Usage:
+  python benchmarks/ytdlp_engine.py
+  python benchmarks/ytdlp_engine.py --runs 20 --size-kb 2048
+  python benchmarks/ytdlp_engine.py --url https://www.youtube.com/watch?v=... --runs 3
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_downloaders import run_yt_dlp
+from ytdlp_engine import HAVE_YT_DLP, InProcessEngine
+
+
+def make_sample(directory, size_kb):
+    path = os.path.join(directory, 'sample.mp4')
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size_kb * 1024))
+    return path
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def time_subprocess(url, output_file, runs, local):
+    times = []
+    for _ in range(runs):
+        remove(output_file)
+        cmd = ['yt-dlp', '-o', output_file, url]
+        if local:
+            cmd[1:1] = ['--enable-file-urls']
+        start = time.perf_counter()
+        return_code, output = await run_yt_dlp(cmd)
+        times.append(time.perf_counter() - start)
+        if return_code != 0:
+            raise RuntimeError(output)
+    return times
+
+
+async def time_engine(url, output_file, runs, local):
+    engine = InProcessEngine(max_workers=1)
+    options = {'outtmpl': output_file}
+    if local:
+        options['enable_file_urls'] = True
+
+    start = time.perf_counter()
+    await engine.warm(1)
+    startup = time.perf_counter() - start
+
+    times = []
+    try:
+        for _ in range(runs):
+            remove(output_file)
+            start = time.perf_counter()
+            return_code, output = await engine.download(url, options)
+            times.append(time.perf_counter() - start)
+            if return_code != 0:
+                raise RuntimeError(output)
+    finally:
+        await engine.close()
+    return startup, times
+
+
+def describe(times):
+    return (f"mean {statistics.mean(times) * 1000:7.1f} ms  "
+            f"median {statistics.median(times) * 1000:7.1f} ms  "
+            f"min {min(times) * 1000:7.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare per-download overhead of the two yt-dlp paths")
+    parser.add_argument("--runs", type=int, default=10, help="Downloads per path")
+    parser.add_argument("--size-kb", type=int, default=256, help="Size of the local sample file")
+    parser.add_argument("--url", help="Download this URL instead of a local sample")
+    args = parser.parse_args()
+
+    if not HAVE_YT_DLP:
+        print("Error: the yt_dlp module is not installed (pip install yt-dlp)")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        local = not args.url
+        url = args.url or f"file://{make_sample(temp_dir, args.size_kb)}"
+        output_file = os.path.join(temp_dir, 'output.%(ext)s' if args.url else 'output.mp4')
+
+        print(f"{args.runs} downloads of {url if args.url else f'a {args.size_kb} KiB local file'}\n")
+        subprocess_times = await time_subprocess(url, output_file, args.runs, local)
+        startup, engine_times = await time_engine(url, output_file, args.runs, local)
+
+    print(f"{'yt-dlp command':>16}: {describe(subprocess_times)}")
+    print(f"{'in-process':>16}: {describe(engine_times)}  (+{startup * 1000:.0f} ms once to start the worker)")
+    saved = statistics.mean(subprocess_times) - statistics.mean(engine_times)
+    print(f"\nOverhead saved per download: {saved * 1000:.1f} ms "
+          f"({statistics.mean(subprocess_times) / statistics.mean(engine_times):.1f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Bulk Content Pipeline
+
+Turns a spreadsheet of video ideas (the sheet ex.py produces: Title,
+Main Idea 1-3, Summary, City) into voiceover scripts and audio.
+
+Every row goes through two stages: script generation with Gemini, then TTS.
+The stages run concurrently with their own worker limits, so row 2's script
+is being written while row 1 is being spoken. Outputs are named after the
+row, and a rerun skips any stage whose output already exists, so an
+interrupted run can simply be started again.
+
+Usage:
+  python bulk_pipeline.py --sheet 20_YouTube_Ideas_with_Cities_2025.xlsx
+  python bulk_pipeline.py --sheet ideas.xlsx --output-dir bulk_output --voice en-GB-RyanNeural
+  python bulk_pipeline.py --sheet ideas.xlsx --script-workers 3 --tts-workers 2 --limit 5
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from script_generator import ScriptGenerator, create_gemini_model
+from script_prompts import build_video_script_prompt
+from tts import generate_simple_tts
+
+DEFAULT_VOICE = "en-US-JennyNeural"
+
+
+def row_slug(index, title):
+    """Stable, filesystem-safe name for a sheet row"""
+    safe_title = re.sub(r'[^\w\-_.]', '_', str(title)).strip('_')[:80]
+    return f"{index + 1:03d}_{safe_title}" if safe_title else f"{index + 1:03d}"
+
+
+def read_rows(sheet_path, limit=None):
+    """
+    Read the ideas sheet into a list of row dicts
+
+    Returns:
+        List of dicts with index, slug, title and idea1-3
+    """
+    frame = pd.read_excel(sheet_path).fillna('')
+    if 'Title' not in frame.columns:
+        raise ValueError(f"Sheet {sheet_path} has no 'Title' column")
+
+    rows = []
+    for index, record in frame.iterrows():
+        title = str(record.get('Title', '')).strip()
+        if not title:
+            continue
+        rows.append({
+            'index': index,
+            'slug': row_slug(index, title),
+            'title': title,
+            'idea1': str(record.get('Main Idea 1', '')).strip(),
+            'idea2': str(record.get('Main Idea 2', '')).strip(),
+            'idea3': str(record.get('Main Idea 3', '')).strip(),
+        })
+        if limit and len(rows) >= limit:
+            break
+    return rows
+
+
+def make_gemini_generator(api_key):
+    """Create one Gemini client for the run and return a blocking prompt -> text function"""
+    generator = ScriptGenerator(lambda: create_gemini_model(api_key))
+    return generator.generate
+
+
+def write_text_atomically(path, text):
+    """Write to a temporary name and rename, so a crash never leaves a partial output"""
+    partial_path = f"{path}.part"
+    with open(partial_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(partial_path, path)
+
+
+async def run_pipeline(rows, output_dir, generate_script, voice=DEFAULT_VOICE, speed=1.0, depth=1,
+                       script_workers=2, tts_workers=2):
+    """
+    Run script generation and TTS for every row as overlapping stages
+
+    Args:
+        rows: Rows from read_rows
+        output_dir: Directory for <slug>.txt scripts and <slug>.mp3 audio
+        generate_script: Blocking callable(prompt) -> script text
+        voice: Voice ID for TTS
+        speed: TTS speed
+        depth: TTS depth level
+        script_workers: Concurrent script generation requests
+        tts_workers: Concurrent TTS jobs
+
+    Returns:
+        Dict of counters: scripts, audio, skipped, failed
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stats = {'scripts': 0, 'audio': 0, 'skipped': 0, 'failed': 0}
+    script_semaphore = asyncio.Semaphore(max(1, script_workers))
+    tts_queue = asyncio.Queue()
+
+    async def script_stage(row):
+        script_path = os.path.join(output_dir, f"{row['slug']}.txt")
+        audio_path = os.path.join(output_dir, f"{row['slug']}.mp3")
+
+        if os.path.exists(audio_path):
+            print(f"[skip] {row['slug']}: audio already exists")
+            stats['skipped'] += 1
+            return
+
+        if not os.path.exists(script_path):
+            prompt = build_video_script_prompt(row['title'], row['idea1'], row['idea2'], row['idea3'])
+            async with script_semaphore:
+                print(f"[script] {row['slug']}: generating")
+                try:
+                    # The Gemini SDK is blocking; keep it off the event loop
+                    script_text = await asyncio.to_thread(generate_script, prompt)
+                except Exception as e:
+                    print(f"[script] {row['slug']}: failed: {e}")
+                    stats['failed'] += 1
+                    return
+            write_text_atomically(script_path, script_text)
+            stats['scripts'] += 1
+        else:
+            print(f"[script] {row['slug']}: reusing existing script")
+
+        await tts_queue.put((row, script_path, audio_path))
+
+    async def tts_worker():
+        while True:
+            item = await tts_queue.get()
+            if item is None:
+                return
+            row, script_path, audio_path = item
+            print(f"[tts] {row['slug']}: synthesizing")
+            try:
+                result = await generate_simple_tts(script_path, audio_path, voice, speed, depth)
+                # generate_simple_tts falls back to a silent clip on failure
+                if os.path.basename(result).startswith('silent_'):
+                    raise Exception("synthesis failed")
+                # The output is written atomically; only a fallback path needs copying
+                if os.path.abspath(result) != os.path.abspath(audio_path):
+                    partial_path = f"{audio_path}.part"
+                    shutil.copyfile(result, partial_path)
+                    os.replace(partial_path, audio_path)
+                stats['audio'] += 1
+                print(f"[tts] {row['slug']}: done")
+            except Exception as e:
+                print(f"[tts] {row['slug']}: failed: {e}")
+                stats['failed'] += 1
+
+    workers = [asyncio.create_task(tts_worker()) for _ in range(max(1, tts_workers))]
+    await asyncio.gather(*(script_stage(row) for row in rows))
+    for _ in workers:
+        await tts_queue.put(None)
+    await asyncio.gather(*workers)
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Generate scripts and voiceovers for every row of an ideas sheet")
+    parser.add_argument("--sheet", "-s", required=True, help="Excel file with Title and Main Idea 1-3 columns")
+    parser.add_argument("--output-dir", "-o", default="bulk_output", help="Directory for scripts and audio")
+    parser.add_argument("--voice", "-v", default=DEFAULT_VOICE, help="Voice ID to use")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed")
+    parser.add_argument("--depth", type=int, default=1, help="Voice depth level (1-5)")
+    parser.add_argument("--script-workers", type=int, default=2, help="Concurrent script generation requests")
+    parser.add_argument("--tts-workers", type=int, default=2, help="Concurrent TTS jobs")
+    parser.add_argument("--limit", type=int, help="Only process the first N rows")
+    parser.add_argument("--api-key", help="Gemini API key (defaults to GEMINI_API_KEY)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = args.api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("Error: set GEMINI_API_KEY or pass --api-key")
+        sys.exit(1)
+
+    rows = read_rows(args.sheet, args.limit)
+    print(f"Processing {len(rows)} rows from {args.sheet}")
+
+    start_time = time.time()
+    stats = await run_pipeline(
+        rows, args.output_dir, make_gemini_generator(api_key),
+        voice=args.voice, speed=args.speed, depth=args.depth,
+        script_workers=args.script_workers, tts_workers=args.tts_workers
+    )
+
+    print(f"\nFinished in {time.time() - start_time:.1f} seconds: "
+          f"{stats['scripts']} scripts, {stats['audio']} audio files, "
+          f"{stats['skipped']} skipped, {stats['failed']} failed")
+    if stats['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+import math
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.effects import low_pass_filter
+
+# Optional: SciPy runs the IIR filters in C. Without it, callers fall back to
+# the pydub effect chain.
+try:
+    from scipy.signal import sosfilt, sosfilt_zi
+    HAVE_SCIPY = True
+except ImportError:
+    HAVE_SCIPY = False
+
+BASS_CUTOFF_HZ = 300
+MAX_FADE_MS = 200
+
+
+def depth_parameters(depth):
+    """
+    Map a depth level to the effect settings used by generate_simple_tts.
+
+    Returns:
+        (cutoff_frequency_hz, bass_boost_db)
+    """
+    # 18000 - (depth * 3000) = range of 15000-6000 for depth 1-5
+    cutoff_frequency = 18000 - (depth * 3000)
+    # 0, 3, 6, 9, 12 dB boost
+    bass_boost_db = (depth - 1) * 3
+    return cutoff_frequency, bass_boost_db
+
+
+def one_pole_lowpass(cutoff, sample_rate):
+    """
+    Second-order section for the RC low-pass used by pydub.low_pass_filter.
+
+    pydub computes y[n] = y[n-1] + alpha * (x[n] - y[n-1]); as a biquad that
+    is b = [alpha, 0, 0], a = [1, alpha - 1, 0].
+    """
+    rc = 1.0 / (cutoff * 2 * math.pi)
+    dt = 1.0 / sample_rate
+    alpha = dt / (rc + dt)
+    return [alpha, 0.0, 0.0, 1.0, alpha - 1.0, 0.0]
+
+
+def bass_shelf(cutoff, boost_db, sample_rate):
+    """
+    Second-order section for "overlay a boosted low-passed copy".
+
+    x + g * LP(x) with a one-pole LP reduces to a first-order low shelf:
+    H(z) = ((1 + g*alpha) - (1 - alpha) z^-1) / (1 - (1 - alpha) z^-1)
+    """
+    alpha = one_pole_lowpass(cutoff, sample_rate)[0]
+    gain = 10 ** (boost_db / 20.0)
+    return [1.0 + gain * alpha, alpha - 1.0, 0.0, 1.0, alpha - 1.0, 0.0]
+
+
+def depth_filter_sos(depth, sample_rate):
+    """Build the cascaded sections implementing the depth effect"""
+    cutoff_frequency, bass_boost_db = depth_parameters(depth)
+    sections = [one_pole_lowpass(cutoff_frequency, sample_rate)]
+    if bass_boost_db > 0:
+        sections.append(bass_shelf(BASS_CUTOFF_HZ, bass_boost_db, sample_rate))
+    return np.array(sections, dtype=np.float64)
+
+
+def segment_to_array(segment):
+    """Decode an AudioSegment to a float32 array of shape (frames, channels) in [-1, 1]"""
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples = samples.reshape(-1, segment.channels)
+    return samples / float(1 << (8 * segment.sample_width - 1))
+
+
+def array_to_segment(samples, frame_rate, sample_width):
+    """Encode a float array of shape (frames, channels) back into an AudioSegment"""
+    scale = float(1 << (8 * sample_width - 1))
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    clipped = np.clip(samples * scale, -scale, scale - 1)
+    return AudioSegment(
+        clipped.astype(dtype).tobytes(),
+        frame_rate=frame_rate,
+        sample_width=sample_width,
+        channels=samples.shape[1]
+    )
+
+
+def apply_fades(samples, frame_rate, fade_ms):
+    """Linear fade in/out over fade_ms, in place"""
+    fade_frames = int(frame_rate * fade_ms / 1000)
+    if fade_frames <= 0:
+        return samples
+    ramp = np.linspace(0.0, 1.0, fade_frames, endpoint=False, dtype=np.float32)[:, None]
+    samples[:fade_frames] *= ramp
+    samples[-fade_frames:] *= ramp[::-1]
+    return samples
+
+
+def depth_effect_array(samples, frame_rate, depth):
+    """
+    Apply the depth effect to a float array of shape (frames, channels).
+
+    The filter state is primed with the first sample, matching pydub, which
+    passes the first sample of each filter through unchanged.
+    """
+    if len(samples) == 0:
+        return samples
+
+    sos = depth_filter_sos(depth, frame_rate)
+    zi = sosfilt_zi(sos)[:, :, None] * samples[0][None, None, :]
+    filtered, _ = sosfilt(sos, samples, axis=0, zi=zi)
+    filtered = np.clip(filtered, -1.0, 1.0).astype(np.float32)
+
+    duration_ms = len(samples) * 1000 // frame_rate
+    return apply_fades(filtered, frame_rate, min(MAX_FADE_MS, duration_ms // 20))
+
+
+def depth_effect_numpy(audio, depth):
+    """Apply the depth effect to an AudioSegment using vectorized filters"""
+    samples = segment_to_array(audio)
+    processed = depth_effect_array(samples, audio.frame_rate, depth)
+    return array_to_segment(processed, audio.frame_rate, audio.sample_width)
+
+
+def depth_effect_pydub(audio, depth):
+    """Apply the depth effect with pydub's pure-Python filters (reference implementation)"""
+    cutoff_frequency, bass_boost_db = depth_parameters(depth)
+    processed_audio = low_pass_filter(audio, cutoff_frequency)
+
+    if bass_boost_db > 0:
+        # Boost the bass and mix it back with the filtered audio
+        bass_part = processed_audio.low_pass_filter(BASS_CUTOFF_HZ)
+        bass_part = bass_part + bass_boost_db
+        processed_audio = processed_audio.overlay(bass_part)
+
+    fade_time = min(MAX_FADE_MS, len(processed_audio) // 20)
+    return processed_audio.fade_in(fade_time).fade_out(fade_time)
+
+
+def apply_depth_effect(audio, depth):
+    """Apply the depth effect, using the vectorized engine when SciPy is available"""
+    if HAVE_SCIPY:
+        return depth_effect_numpy(audio, depth)
+    return depth_effect_pydub(audio, depth)
+
+
+def apply_depth_effect_array(samples, frame_rate, depth):
+    """Array counterpart of apply_depth_effect, for pipelines that keep PCM in memory"""
+    if HAVE_SCIPY:
+        return depth_effect_array(samples, frame_rate, depth)
+    processed = depth_effect_pydub(array_to_segment(samples, frame_rate, 2), depth)
+    return segment_to_array(processed)
@@ -27,6 +27,10 @@ import threading
 from datetime import datetime
 from pathlib import Path
 
+from segmenter import split_text, MAX_SEGMENT_LENGTH
+from voice_catalog import VoiceCatalog
+from subtitles import format_timestamp, group_cues, to_vtt
+
 try:
     import edge_tts
     import numpy as np
@@ -37,12 +41,19 @@ except ImportError as e:
     print("Please install required packages: pip install edge-tts numpy soundfile pyaudio")
     sys.exit(1)
 
+# Optional: streaming resampler used when merged segments differ in sample rate
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
 # Constants
 DEFAULT_VOICE = "en-US-JennyNeural"
 DEFAULT_RATE = "+0%"
 DEFAULT_VOLUME = "+0%"
 DEFAULT_PITCH = "+0Hz"
-MAX_SEGMENT_LENGTH = 3000  # Maximum text segment length to ensure stability
+MAX_CONCURRENT_SEGMENTS = 4  # Segments synthesized in parallel for long text
+MERGE_BLOCK_FRAMES = 65536  # Frames read per block when merging segments
 
 # Configure debug logging
 DEBUG_MODE = True  # Set to False to disable verbose debug output
@@ -88,33 +99,10 @@ def segment_text(text, max_length=MAX_SEGMENT_LENGTH):
     """
     log_debug(f"Segmenting text of length {len(text)} characters")
     
-    # If text is shorter than max_length, return as single segment
-    if len(text) <= max_length:
-        log_debug(f"Text is shorter than max length, returning as single segment")
-        return [text]
-    
-    segments = []
-    current_pos = 0
+    segments = split_text(text, max_length)
     
-    while current_pos < len(text):
-        # Find a good breaking point (end of sentence or paragraph)
-        end_pos = min(current_pos + max_length, len(text))
-        
-        if end_pos < len(text):
-            # Try to find sentence or paragraph breaks
-            for delim in ['\n\n', '\n', '. ', '! ', '? ', '; ']:
-                last_delim = text.rfind(delim, current_pos, end_pos)
-                if last_delim != -1:
-                    end_pos = last_delim + len(delim)
-                    break
-        
-        # Extract segment and add to list
-        segment = text[current_pos:end_pos].strip()
-        if segment:
-            segments.append(segment)
-            log_debug(f"Created segment {len(segments)}: {len(segment)} characters")
-        
-        current_pos = end_pos
+    for i, segment in enumerate(segments):
+        log_debug(f"Created segment {i + 1}: {len(segment)} characters")
     
     log_debug(f"Text segmented into {len(segments)} parts")
     return segments
@@ -148,20 +136,19 @@ def clean_text(text):
 
 async def get_available_voices():
     """
-    Get all available voices from Edge TTS
+    Get all available voices from Edge TTS, through the on-disk voice catalog
     
     Returns:
-        List of voice dictionaries
+        List of voice dictionaries (ShortName, Gender, Locale)
     """
     log_debug("Retrieving available voices")
     
-    try:
-        voices = await edge_tts.list_voices()
-        log_debug(f"Successfully retrieved {len(voices)} voices")
-        return voices
-    except Exception as e:
-        log_debug(f"ERROR: Failed to retrieve voices: {str(e)}")
-        return []
+    # The catalog only goes to the network when its disk copy is older than its TTL
+    catalog = VoiceCatalog()
+    refreshed = await catalog.refresh()
+    voices = catalog.records()
+    log_debug(f"Retrieved {len(voices)} voices ({'fetched' if refreshed else 'from ' + catalog.source})")
+    return voices
 
 async def generate_speech_segment(text, output_file, voice=DEFAULT_VOICE, rate=DEFAULT_RATE, 
                                  volume=DEFAULT_VOLUME, pitch=DEFAULT_PITCH):
@@ -211,8 +198,48 @@ async def generate_speech_segment(text, output_file, voice=DEFAULT_VOICE, rate=D
         log_debug(f"ERROR: Failed to generate speech: {str(e)}")
         return False
 
+async def generate_segments(segments, temp_dir, voice=DEFAULT_VOICE, rate=DEFAULT_RATE,
+                            volume=DEFAULT_VOLUME, pitch=DEFAULT_PITCH,
+                            max_concurrency=MAX_CONCURRENT_SEGMENTS):
+    """
+    Synthesize text segments concurrently
+    
+    Args:
+        segments: List of text segments, in playback order
+        temp_dir: Directory for the per-segment audio files
+        voice: Voice to use
+        rate: Speech rate
+        volume: Speech volume
+        pitch: Speech pitch
+        max_concurrency: Maximum number of segments in flight at once
+    
+    Returns:
+        List of segment file paths in the original order, skipping failures
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    log_debug(f"Generating {len(segments)} segments with concurrency {max_concurrency}")
+    
+    async def generate_one(i, segment):
+        segment_file = os.path.join(temp_dir, f"segment_{i:03d}.mp3")
+        async with semaphore:
+            success = await generate_speech_segment(
+                segment, segment_file, voice, rate, volume, pitch
+            )
+        
+        if not success:
+            log_debug(f"ERROR: Failed to generate segment {i}")
+            return None
+        return segment_file
+    
+    # gather returns results in submission order, regardless of completion order
+    results = await asyncio.gather(
+        *(generate_one(i, segment) for i, segment in enumerate(segments))
+    )
+    return [segment_file for segment_file in results if segment_file]
+
 async def generate_speech(text, output_file, voice=DEFAULT_VOICE, rate=DEFAULT_RATE, 
-                         volume=DEFAULT_VOLUME, pitch=DEFAULT_PITCH, segment_audio=True):
+                         volume=DEFAULT_VOLUME, pitch=DEFAULT_PITCH, segment_audio=True,
+                         max_concurrency=MAX_CONCURRENT_SEGMENTS):
     """
     Generate speech from text, segmenting if necessary
     
@@ -224,6 +251,7 @@ async def generate_speech(text, output_file, voice=DEFAULT_VOICE, rate=DEFAULT_R
         volume: Speech volume
         pitch: Speech pitch
         segment_audio: Whether to segment text for better quality
+        max_concurrency: Maximum number of segments synthesized at once
     
     Returns:
         True if successful, False otherwise
@@ -252,19 +280,11 @@ async def generate_speech(text, output_file, voice=DEFAULT_VOICE, rate=DEFAULT_R
         # Create a temporary directory for segment files
         with tempfile.TemporaryDirectory() as temp_dir:
             log_debug(f"Created temporary directory: {temp_dir}")
-            segment_files = []
             
-            # Generate speech for each segment
-            for i, segment in enumerate(segments):
-                segment_file = os.path.join(temp_dir, f"segment_{i:03d}.wav")
-                success = await generate_speech_segment(
-                    segment, segment_file, voice, rate, volume, pitch
-                )
-                
-                if success:
-                    segment_files.append(segment_file)
-                else:
-                    log_debug(f"ERROR: Failed to generate segment {i}")
+            # Generate speech for all segments concurrently
+            segment_files = await generate_segments(
+                segments, temp_dir, voice, rate, volume, pitch, max_concurrency
+            )
             
             if not segment_files:
                 log_debug("ERROR: No segments were successfully generated")
@@ -273,48 +293,119 @@ async def generate_speech(text, output_file, voice=DEFAULT_VOICE, rate=DEFAULT_R
             # Merge audio segments
             log_debug(f"Merging {len(segment_files)} audio segments")
             try:
-                merge_audio_files(segment_files, output_file)
+                if output_path.suffix.lower() == '.mp3':
+                    # Segments are already MP3 in the same stream format, so
+                    # joining them needs no decode or re-encode
+                    concatenate_mp3_files(segment_files, output_file)
+                else:
+                    merge_audio_files(segment_files, output_file)
                 log_debug(f"Successfully merged audio to: {output_file}")
                 return True
             except Exception as e:
                 log_debug(f"ERROR: Failed to merge audio segments: {str(e)}")
                 return False
 
-def merge_audio_files(input_files, output_file):
+def concatenate_mp3_files(input_files, output_file):
+    """
+    Join MP3 files that share one stream format by copying their frames
+    
+    Args:
+        input_files: List of input MP3 file paths
+        output_file: Output MP3 file path
+    """
+    log_debug(f"Concatenating {len(input_files)} MP3 files without transcoding")
+    
+    with open(output_file, 'wb') as output:
+        for file_path in input_files:
+            with open(file_path, 'rb') as source:
+                while True:
+                    block = source.read(1024 * 1024)
+                    if not block:
+                        break
+                    output.write(block)
+    
+    log_debug(f"Concatenated MP3 file created: {os.path.getsize(output_file)} bytes")
+
+def match_channels(block, channels):
+    """
+    Convert a (frames, channels) block to the requested channel count
+    
+    Args:
+        block: 2-D audio block
+        channels: Target number of channels
+    
+    Returns:
+        Block with the target number of channels
+    """
+    if block.shape[1] == channels:
+        return block
+    if channels == 1:
+        # Downmix to mono
+        return block.mean(axis=1, keepdims=True)
+    if block.shape[1] == 1:
+        # Duplicate mono into every channel
+        return np.repeat(block, channels, axis=1)
+    raise ValueError(f"Cannot map {block.shape[1]} channels to {channels}")
+
+def merge_audio_files(input_files, output_file, block_frames=MERGE_BLOCK_FRAMES, resample=True):
     """
     Merge multiple audio files into a single file
     
+    Segments are streamed block by block into one open output file, so peak
+    memory depends on block_frames rather than the total length of the audio.
+    The first segment's sample rate and channel count define the output.
+    
     Args:
         input_files: List of input audio file paths
         output_file: Output audio file path
+        block_frames: Number of frames read per block
+        resample: Whether to resample segments whose sample rate differs
+    
+    Raises:
+        ValueError: If a segment's sample rate differs and it cannot be resampled
     """
     log_debug(f"Merging {len(input_files)} audio files")
     
-    # Load and concatenate audio data
-    audio_data = []
-    sample_rate = None
-    
-    for file_path in input_files:
-        log_debug(f"Loading audio file: {file_path}")
-        data, rate = sf.read(file_path)
-        
-        if sample_rate is None:
-            sample_rate = rate
-        elif rate != sample_rate:
-            log_debug(f"WARNING: Sample rate mismatch: {rate} vs {sample_rate}")
-        
-        audio_data.append(data)
-    
-    # Concatenate audio data
-    merged_data = np.concatenate(audio_data)
+    first_info = sf.info(input_files[0])
+    sample_rate = first_info.samplerate
+    channels = first_info.channels
+    total_frames = 0
     
-    # Write merged audio to output file
     log_debug(f"Writing merged audio to: {output_file}")
-    sf.write(output_file, merged_data, sample_rate)
+    with sf.SoundFile(output_file, 'w', samplerate=sample_rate, channels=channels) as output:
+        for file_path in input_files:
+            log_debug(f"Streaming audio file: {file_path}")
+            with sf.SoundFile(file_path) as source:
+                resampler = None
+                if source.samplerate != sample_rate:
+                    if not resample:
+                        raise ValueError(
+                            f"Sample rate mismatch in {file_path}: {source.samplerate} vs {sample_rate}"
+                        )
+                    if soxr is None:
+                        raise ValueError(
+                            f"Sample rate mismatch in {file_path}: {source.samplerate} vs {sample_rate} "
+                            "(install soxr to resample)"
+                        )
+                    log_debug(f"Resampling {file_path} from {source.samplerate}Hz to {sample_rate}Hz")
+                    resampler = soxr.ResampleStream(source.samplerate, sample_rate, channels, dtype='float32')
+                
+                for block in source.blocks(blocksize=block_frames, dtype='float32', always_2d=True):
+                    block = match_channels(block, channels)
+                    if resampler is not None:
+                        block = resampler.resample_chunk(block)
+                    output.write(block)
+                    total_frames += len(block)
+                
+                if resampler is not None:
+                    # Flush the samples still buffered in the resampler
+                    tail = resampler.resample_chunk(np.zeros((0, channels), dtype=np.float32), last=True)
+                    output.write(tail)
+                    total_frames += len(tail)
     
     # Verify output file
     output_size = os.path.getsize(output_file)
-    log_debug(f"Merged audio file created: {output_size} bytes")
+    log_debug(f"Merged audio file created: {output_size} bytes, {total_frames} frames")
 
 def play_audio_file(file_path):
     """
@@ -376,7 +467,7 @@ async def play_speech_directly(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE,
     log_debug("Playing speech directly")
     
     # Create a temporary file
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
+    with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp_file:
         temp_path = tmp_file.name
     
     try:
@@ -442,6 +533,8 @@ async def main():
     parser.add_argument("--volume", "-vol", help="Volume level (e.g. +0%, +50%)", default=DEFAULT_VOLUME, type=str)
     parser.add_argument("--pitch", "-pit", help="Speech pitch (e.g. +0Hz, -2Hz)", default=DEFAULT_PITCH, type=str)
     parser.add_argument("--no-segment", "-ns", help="Disable text segmentation", action="store_true")
+    parser.add_argument("--concurrency", "-c", help="Segments to synthesize in parallel",
+                        default=MAX_CONCURRENT_SEGMENTS, type=int)
     parser.add_argument("--debug", "-d", help="Enable debug mode", action="store_true")
     
     args = parser.parse_args()
@@ -502,7 +595,8 @@ async def main():
         rate=args.rate,
         volume=args.volume,
         pitch=args.pitch,
-        segment_audio=not args.no_segment
+        segment_audio=not args.no_segment,
+        max_concurrency=args.concurrency
     )
     
     end_time = time.time()
@@ -522,10 +616,7 @@ async def main():
 # Additional utility functions
 def format_duration(milliseconds):
     """Format milliseconds to HH:MM:SS.mmm format"""
-    seconds, ms = divmod(milliseconds, 1000)
-    minutes, seconds = divmod(seconds, 60)
-    hours, minutes = divmod(minutes, 60)
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+    return format_timestamp(milliseconds)
 
 def create_subtitles_vtt(word_boundaries, output_file):
     """
@@ -537,40 +628,14 @@ def create_subtitles_vtt(word_boundaries, output_file):
     """
     log_debug(f"Creating WebVTT subtitles: {output_file}")
     
-    lines = ["WEBVTT", ""]
-    current_line = ""
-    line_start = None
-    line_end = None
-    
-    for word in word_boundaries:
-        if not current_line:
-            current_line = word["text"]
-            line_start = word["offset"] / 10000  # Convert to milliseconds
-            line_end = (word["offset"] + word["duration"]) / 10000
-        elif len(current_line) + len(word["text"]) + 1 <= 80:  # Max 80 chars per line
-            current_line += " " + word["text"]
-            line_end = (word["offset"] + word["duration"]) / 10000
-        else:
-            # Write completed line
-            lines.append(f"{format_duration(line_start)} --> {format_duration(line_end)}")
-            lines.append(current_line)
-            lines.append("")
-            
-            # Start new line
-            current_line = word["text"]
-            line_start = word["offset"] / 10000
-            line_end = (word["offset"] + word["duration"]) / 10000
-    
-    # Add the last line if not empty
-    if current_line:
-        lines.append(f"{format_duration(line_start)} --> {format_duration(line_end)}")
-        lines.append(current_line)
+    # Words are joined into cues of at most 80 characters, as the web app does
+    cues = group_cues(word_boundaries)
     
     # Write VTT file
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+        f.write(to_vtt(cues))
     
-    log_debug(f"WebVTT subtitles created with {len(lines)} lines")
+    log_debug(f"WebVTT subtitles created with {len(cues)} cues")
 
 # Example of streaming audio generation using Edge TTS
 async def stream_speech_to_speaker(text, voice=DEFAULT_VOICE, rate=DEFAULT_RATE, 
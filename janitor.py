@@ -0,0 +1,269 @@
+import os
+import time
+import threading
+
+from job_store import ACTIVE_STATUSES
+
+# Job fields that hold paths of files a job reads or writes
+JOB_PATH_FIELDS = ('script_file', 'output_file', 'result', 'file_path')
+ACTIVE_JOBS_LIMIT = 100000  # Upper bound on active jobs read per sweep
+
+
+class RetentionRule:
+    """
+    Quota for one directory tree.
+
+    Args:
+        name: Label used in metrics ("uploads", "downloads"...)
+        root: Directory to keep in check
+        max_bytes: Evict least recently used files beyond this total; None for no limit
+        max_age: Remove files not accessed for this many seconds; None for no limit
+        min_age: Never touch files accessed more recently than this (files being written)
+        skip: Names of top-level subdirectories owned by something else (e.g. a cache
+            that enforces its own size)
+    """
+
+    def __init__(self, name, root, max_bytes=None, max_age=None, min_age=300, skip=()):
+        self.name = name
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.min_age = min_age
+        self.skip = set(skip)
+
+        self.files_removed = 0
+        self.bytes_reclaimed = 0
+        self.last_scan = {}
+
+
+def last_access(st):
+    """
+    When a file was last used.
+
+    The caches bump mtime on every hit, and atime is only updated lazily on
+    most mounts, so whichever is newer wins.
+    """
+    return max(st.st_atime, st.st_mtime)
+
+
+def active_job_paths(job_store):
+    """Absolute paths referenced by jobs that are still queued or running"""
+    paths = set()
+    for status in ACTIVE_STATUSES:
+        for job in job_store.list_by_status(status, limit=ACTIVE_JOBS_LIMIT):
+            for field in JOB_PATH_FIELDS:
+                value = job.get(field)
+                if isinstance(value, str) and value:
+                    paths.add(os.path.abspath(value))
+    return paths
+
+
+class Janitor:
+    """
+    Background retention for the directories the app writes into.
+
+    Every ``interval`` seconds each rule's tree is scanned: files idle for
+    longer than the rule's ``max_age`` are removed, then the least recently
+    used remaining files until the tree fits in ``max_bytes``. Files
+    referenced by pending or processing jobs, and files touched within
+    ``min_age``, are never removed. Empty subdirectories left behind are
+    pruned. Finished jobs older than ``job_retention`` are dropped from the
+    job store first, so their files stop being referenced.
+
+    A file hardlinked elsewhere (outputs link into the render cache) only
+    counts as reclaimed once its last link is gone.
+    """
+
+    def __init__(self, rules, job_store=None, interval=600, job_retention=None):
+        self.rules = list(rules)
+        self.job_store = job_store
+        self.interval = interval
+        self.job_retention = job_retention
+
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+        self.sweeps = 0
+        self.jobs_expired = 0
+        self.last_sweep_at = 0
+        self.last_sweep_seconds = 0.0
+        self.total_scan_seconds = 0.0
+
+    def _scan(self, rule):
+        """Return ([(last_access, size, reclaimable, path)], [directories]) under a rule's root"""
+        files = []
+        directories = []
+        for directory, subdirectories, filenames in os.walk(rule.root):
+            if directory == rule.root:
+                subdirectories[:] = [name for name in subdirectories if name not in rule.skip]
+            else:
+                directories.append(directory)
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                reclaimable = st.st_size if st.st_nlink <= 1 else 0
+                files.append((last_access(st), st.st_size, reclaimable, path))
+        return files, directories
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Janitor could not remove {path}: {e}")
+            return False
+
+    def sweep_rule(self, rule, protected=frozenset(), now=None):
+        """
+        Apply one rule now.
+
+        Returns:
+            Dict with files_removed, bytes_reclaimed, bytes_before, bytes_after,
+            files_scanned, scan_seconds and sweep_seconds
+        """
+        now = now or time.time()
+        start = time.perf_counter()
+        files, directories = self._scan(rule) if os.path.isdir(rule.root) else ([], [])
+        scan_seconds = time.perf_counter() - start
+        total = sum(size for _, size, _, _ in files)
+        bytes_before = total
+
+        candidates = sorted(
+            entry for entry in files
+            if now - entry[0] >= rule.min_age and os.path.abspath(entry[3]) not in protected
+        )
+
+        removed = 0
+        reclaimed = 0
+        for accessed, size, reclaimable, path in candidates:
+            expired = rule.max_age is not None and now - accessed > rule.max_age
+            over_quota = rule.max_bytes is not None and total > rule.max_bytes
+            # Oldest first, so once neither applies to this file it applies to none of the rest
+            if not (expired or over_quota):
+                break
+            if self._remove(path):
+                total -= size
+                removed += 1
+                reclaimed += reclaimable
+
+        # Deepest first, so a parent emptied by its children goes too
+        for directory in sorted(directories, key=len, reverse=True):
+            try:
+                if now - os.stat(directory).st_mtime >= rule.min_age:
+                    os.rmdir(directory)
+            except OSError:
+                pass  # Not empty, or already gone
+
+        report = {
+            'files_removed': removed,
+            'bytes_reclaimed': reclaimed,
+            'bytes_before': bytes_before,
+            'bytes_after': total,
+            'files_scanned': len(files),
+            'scan_seconds': round(scan_seconds, 4),
+            'sweep_seconds': round(time.perf_counter() - start, 4),
+        }
+        with self._lock:
+            rule.files_removed += removed
+            rule.bytes_reclaimed += reclaimed
+            rule.last_scan = report
+        return report
+
+    def sweep(self):
+        """
+        Run every rule once.
+
+        Returns:
+            Dict of rule name -> report from sweep_rule
+        """
+        # A manual sweep and the background one never run together
+        with self._sweep_lock:
+            start = time.perf_counter()
+            expired = 0
+            protected = frozenset()
+            if self.job_store is not None:
+                if self.job_retention:
+                    expired = self.job_store.delete_older_than(self.job_retention)
+                protected = frozenset(active_job_paths(self.job_store))
+
+            reports = {}
+            for rule in self.rules:
+                try:
+                    reports[rule.name] = self.sweep_rule(rule, protected)
+                except Exception as e:
+                    print(f"Janitor failed to sweep {rule.root}: {e}")
+
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.sweeps += 1
+                self.jobs_expired += expired
+                self.last_sweep_at = time.time()
+                self.last_sweep_seconds = round(elapsed, 4)
+                self.total_scan_seconds += elapsed
+
+        removed = sum(report['files_removed'] for report in reports.values())
+        if removed or expired:
+            reclaimed = sum(report['bytes_reclaimed'] for report in reports.values())
+            print(f"Janitor removed {removed} files ({reclaimed} bytes) and {expired} expired jobs "
+                  f"in {elapsed:.2f} seconds")
+        return reports
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Cleared before sweeping, so a request made during the sweep runs another one
+            self._wake.clear()
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Janitor sweep failed: {e}")
+            self._wake.wait(self.interval)
+
+    def request_sweep(self):
+        """Have the background thread sweep now instead of at its next interval"""
+        self._wake.set()
+
+    def start(self):
+        """Start sweeping in a daemon thread; a no-op if already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='storage-janitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sweeps': self.sweeps,
+                'interval': self.interval,
+                'sweep_requested': self._wake.is_set(),
+                'jobs_expired': self.jobs_expired,
+                'last_sweep_at': self.last_sweep_at,
+                'last_sweep_seconds': self.last_sweep_seconds,
+                'total_scan_seconds': round(self.total_scan_seconds, 4),
+                'bytes_reclaimed': sum(rule.bytes_reclaimed for rule in self.rules),
+                'files_removed': sum(rule.files_removed for rule in self.rules),
+                'directories': {
+                    rule.name: {
+                        'root': rule.root,
+                        'max_bytes': rule.max_bytes,
+                        'max_age': rule.max_age,
+                        'files_removed': rule.files_removed,
+                        'bytes_reclaimed': rule.bytes_reclaimed,
+                        'last_scan': dict(rule.last_scan),
+                    }
+                    for rule in self.rules
+                },
+            }
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when the worker pool cannot accept another job."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Server is busy, retry after {retry_after} seconds")
+
+
+class WorkerPool:
+    """
+    A single long-lived asyncio event loop with a fixed number of workers.
+
+    Jobs are submitted from any thread as coroutine factories and placed on a
+    bounded queue. At most ``max_concurrent`` jobs run at the same time; when
+    the queue is full, ``submit`` raises ``QueueFullError`` instead of piling
+    up more work.
+
+    Every job shares the loop's thread, so jobs must not block it: CPU-bound
+    work and blocking I/O go through ``asyncio.to_thread``. The loop's default
+    executor has a thread for each worker plus a few spare, so every running
+    job can have blocking work in flight at once.
+    """
+
+    def __init__(self, max_concurrent=4, max_queued=100, name='tts-worker-pool'):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queued = max(1, int(max_queued))
+        self.name = name
+
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._started = threading.Event()
+        self._start_lock = threading.Lock()
+
+        # Running average of job duration, used to estimate Retry-After
+        self._avg_job_seconds = 10.0
+        self._running = 0
+
+    def start(self):
+        """Start the event loop thread (safe to call more than once)"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._started.clear()
+            self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            self._started.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=self.max_concurrent + 4, thread_name_prefix=f'{self.name}-blocking'
+        ))
+
+        for i in range(self.max_concurrent):
+            self._loop.create_task(self._worker(i))
+
+        self._started.set()
+        self._loop.run_forever()
+
+    async def _worker(self, worker_id):
+        while True:
+            coroutine_factory = await self._queue.get()
+            self._running += 1
+            started = time.time()
+            try:
+                await coroutine_factory()
+            except Exception as e:
+                print(f"Error in worker {worker_id}: {str(e)}")
+            finally:
+                self._running -= 1
+                elapsed = time.time() - started
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+                self._queue.task_done()
+
+    def estimate_retry_after(self):
+        """Estimate how many seconds until a queue slot frees up"""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        waves = (queued // self.max_concurrent) + 1
+        return max(1, int(round(self._avg_job_seconds * waves / self.max_concurrent)))
+
+    def submit(self, coroutine_factory):
+        """
+        Queue a job for execution on the shared event loop.
+
+        Args:
+            coroutine_factory: Callable taking no arguments that returns the
+                coroutine to run. The coroutine is only created once a worker
+                picks the job up, so rejected jobs never leave an un-awaited
+                coroutine behind.
+
+        Raises:
+            QueueFullError: If the queue is already at capacity
+        """
+        self.start()
+
+        # put_nowait must run on the loop thread; wait for it so QueueFull
+        # surfaces to the caller synchronously
+        future = asyncio.run_coroutine_threadsafe(self._enqueue_async(coroutine_factory), self._loop)
+        try:
+            future.result()
+        except asyncio.QueueFull:
+            raise QueueFullError(self.estimate_retry_after())
+
+    async def _enqueue_async(self, coroutine_factory):
+        self._queue.put_nowait(coroutine_factory)
+
+    async def enqueue(self, coroutine_factory):
+        """
+        Queue a job from a coroutine running on the pool's own loop, waiting
+        for a free queue slot instead of raising QueueFullError.
+
+        Used by jobs that feed many follow-up jobs (e.g. a playlist) so they
+        trickle in as workers free up.
+        """
+        await self._queue.put(coroutine_factory)
+
+    def run_coroutine(self, coroutine):
+        """
+        Run a coroutine on the pool's event loop without taking a worker slot.
+
+        Returns:
+            concurrent.futures.Future for the coroutine's result
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def free_slots(self):
+        """Number of jobs that can still be queued right now"""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return self.max_queued - queued
+
+    def stats(self):
+        """Return current queue depth and worker utilisation"""
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queued': self.max_queued,
+            'running': self._running,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'avg_job_seconds': round(self._avg_job_seconds, 2),
+        }
@@ -0,0 +1,456 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+
+ACTIVE_STATUSES = ('pending', 'processing')
+ORPHANED_ERROR = "The server restarted before this job finished. Please submit it again."
+
+
+class JobStore:
+    """
+    Interface for job state storage.
+
+    A job is a plain dict. ``job_id``, ``status`` and ``start_time`` are
+    always present; every other key is stored as-is and returned unchanged.
+    """
+
+    def create(self, job_id, job):
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """Return the job dict, or None if it does not exist"""
+        raise NotImplementedError
+
+    def update(self, job_id, **fields):
+        """Merge ``fields`` into an existing job"""
+        raise NotImplementedError
+
+    def delete(self, job_id):
+        raise NotImplementedError
+
+    def get_many(self, job_ids):
+        """Return a dict of job_id -> job for the ids that exist"""
+        jobs = {}
+        for job_id in job_ids:
+            job = self.get(job_id)
+            if job is not None:
+                jobs[job_id] = job
+        return jobs
+
+    def list_by_status(self, status, limit=100):
+        raise NotImplementedError
+
+    def delete_older_than(self, max_age_seconds):
+        """
+        Remove finished jobs older than ``max_age_seconds``; return the count.
+
+        Events of the removed jobs go with them, as do batches none of whose
+        jobs are left.
+        """
+        raise NotImplementedError
+
+    def append_event(self, job_id, event, data):
+        """Record a progress event for a job; return its increasing event id"""
+        raise NotImplementedError
+
+    def events_since(self, job_id, last_event_id=0):
+        """Return (event_id, event, data) tuples newer than ``last_event_id``"""
+        raise NotImplementedError
+
+    def create_batch(self, batch_id, job_ids, created=None):
+        """Record a group of jobs submitted together"""
+        raise NotImplementedError
+
+    def get_batch(self, batch_id):
+        """Return {'batch_id', 'created', 'job_ids'}, or None if it does not exist"""
+        raise NotImplementedError
+
+    def start_heartbeat(self, interval=30):
+        """
+        Keep this process's jobs alive and fail jobs left behind by dead processes.
+
+        A no-op for stores whose jobs cannot outlive the process.
+        """
+
+    def __contains__(self, job_id):
+        return self.get(job_id) is not None
+
+
+class MemoryJobStore(JobStore):
+    """In-process store, only suitable for a single worker process"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._events = {}
+        self._batches = {}
+        self._next_event_id = 1
+        self._lock = threading.Lock()
+
+    def create(self, job_id, job):
+        with self._lock:
+            self._jobs[job_id] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def delete(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._events.pop(job_id, None)
+
+    def list_by_status(self, status, limit=100):
+        with self._lock:
+            matches = [dict(job, job_id=job_id) for job_id, job in self._jobs.items()
+                       if job.get('status') == status]
+        matches.sort(key=lambda job: job.get('start_time', 0), reverse=True)
+        return matches[:limit]
+
+    def delete_older_than(self, max_age_seconds):
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.get('start_time', 0) < cutoff
+                       and job.get('status') in ('completed', 'failed')]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._events.pop(job_id, None)
+            # Batches created before the cutoff whose jobs have all been purged
+            for batch_id, batch in list(self._batches.items()):
+                if batch['created'] < cutoff and not any(
+                        job_id in self._jobs for job_id in batch['job_ids']):
+                    del self._batches[batch_id]
+        return len(expired)
+
+    def append_event(self, job_id, event, data):
+        with self._lock:
+            event_id = self._next_event_id
+            self._next_event_id += 1
+            self._events.setdefault(job_id, []).append((event_id, event, dict(data)))
+        return event_id
+
+    def events_since(self, job_id, last_event_id=0):
+        with self._lock:
+            return [entry for entry in self._events.get(job_id, []) if entry[0] > last_event_id]
+
+    def create_batch(self, batch_id, job_ids, created=None):
+        with self._lock:
+            self._batches[batch_id] = {
+                'batch_id': batch_id,
+                'created': created or time.time(),
+                'job_ids': list(job_ids),
+            }
+
+    def get_batch(self, batch_id):
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            return dict(batch, job_ids=list(batch['job_ids'])) if batch else None
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed store shared by every worker process on the host.
+
+    The database runs in WAL mode so status polling from one process does not
+    block writes from the worker that owns the job. ``status`` and
+    ``start_time`` live in their own indexed columns; the rest of the job is
+    kept as a JSON document.
+
+    Jobs are stamped with the ``owner`` of the process that created them.
+    Each process records a heartbeat; pending or processing jobs whose owner
+    has stopped beating (it exited or crashed mid-job) are marked as failed
+    so nothing waits on them forever.
+    """
+
+    def __init__(self, db_path, owner=None):
+        self.db_path = db_path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._heartbeat_thread = None
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                start_time REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_start_time ON jobs (start_time)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_events (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                event TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, event_id)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS batches (
+                batch_id TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                job_ids TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workers (
+                owner TEXT PRIMARY KEY,
+                heartbeat REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared across threads, keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row):
+        job = json.loads(row[3])
+        job['status'] = row[1]
+        job['start_time'] = row[2]
+        return job
+
+    def create(self, job_id, job):
+        job = dict(job)
+        status = job.pop('status', 'pending')
+        start_time = job.pop('start_time', time.time())
+        job.setdefault('owner', self.owner)
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO jobs (job_id, status, start_time, data) VALUES (?, ?, ?, ?)',
+            (job_id, status, start_time, json.dumps(job))
+        )
+        conn.commit()
+
+    def get(self, job_id):
+        row = self._connection().execute(
+            'SELECT job_id, status, start_time, data FROM jobs WHERE job_id = ?', (job_id,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id, **fields):
+        conn = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front so the read-modify-write
+        # below cannot interleave with another process updating the same job
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT job_id, status, start_time, data FROM jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()
+            if row is None:
+                conn.rollback()
+                return
+
+            job = self._row_to_job(row)
+            job.update(fields)
+            status = job.pop('status')
+            start_time = job.pop('start_time')
+            conn.execute(
+                'UPDATE jobs SET status = ?, start_time = ?, data = ? WHERE job_id = ?',
+                (status, start_time, json.dumps(job), job_id)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def delete(self, job_id):
+        conn = self._connection()
+        conn.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+        conn.execute('DELETE FROM job_events WHERE job_id = ?', (job_id,))
+        conn.commit()
+
+    def get_many(self, job_ids):
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        placeholders = ','.join('?' * len(job_ids))
+        rows = self._connection().execute(
+            f'SELECT job_id, status, start_time, data FROM jobs WHERE job_id IN ({placeholders})',
+            job_ids
+        ).fetchall()
+        found = {row[0]: self._row_to_job(row) for row in rows}
+        # Preserve the caller's ordering
+        return {job_id: found[job_id] for job_id in job_ids if job_id in found}
+
+    def list_by_status(self, status, limit=100):
+        rows = self._connection().execute(
+            'SELECT job_id, status, start_time, data FROM jobs WHERE status = ? '
+            'ORDER BY start_time DESC LIMIT ?',
+            (status, limit)
+        ).fetchall()
+        return [dict(self._row_to_job(row), job_id=row[0]) for row in rows]
+
+    def delete_older_than(self, max_age_seconds):
+        cutoff = time.time() - max_age_seconds
+        conn = self._connection()
+        cursor = conn.execute(
+            "DELETE FROM jobs WHERE start_time < ? AND status IN ('completed', 'failed')",
+            (cutoff,)
+        )
+        conn.execute('DELETE FROM job_events WHERE job_id NOT IN (SELECT job_id FROM jobs)')
+        # Batches created before the cutoff whose jobs have all been purged
+        conn.execute(
+            'DELETE FROM batches WHERE created < ? AND NOT EXISTS ('
+            'SELECT 1 FROM json_each(batches.job_ids) AS batch_job '
+            'JOIN jobs ON jobs.job_id = batch_job.value)',
+            (cutoff,)
+        )
+        conn.commit()
+        return cursor.rowcount
+
+    def append_event(self, job_id, event, data):
+        conn = self._connection()
+        cursor = conn.execute(
+            'INSERT INTO job_events (job_id, event, data) VALUES (?, ?, ?)',
+            (job_id, event, json.dumps(data))
+        )
+        conn.commit()
+        return cursor.lastrowid
+
+    def events_since(self, job_id, last_event_id=0):
+        rows = self._connection().execute(
+            'SELECT event_id, event, data FROM job_events WHERE job_id = ? AND event_id > ? '
+            'ORDER BY event_id',
+            (job_id, last_event_id)
+        ).fetchall()
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def create_batch(self, batch_id, job_ids, created=None):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO batches (batch_id, created, job_ids) VALUES (?, ?, ?)',
+            (batch_id, created or time.time(), json.dumps(list(job_ids)))
+        )
+        conn.commit()
+
+    def get_batch(self, batch_id):
+        row = self._connection().execute(
+            'SELECT batch_id, created, job_ids FROM batches WHERE batch_id = ?', (batch_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'batch_id': row[0], 'created': row[1], 'job_ids': json.loads(row[2])}
+
+    def heartbeat(self):
+        """Record that this process is alive"""
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO workers (owner, heartbeat) VALUES (?, ?)',
+            (self.owner, time.time())
+        )
+        conn.commit()
+
+    def fail_orphaned_jobs(self, stale_after):
+        """
+        Fail pending or processing jobs whose owner has not beaten for ``stale_after``
+        seconds, and append a terminal event for each.
+
+        Returns:
+            Number of jobs failed
+        """
+        cutoff = time.time() - stale_after
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            live = {row[0] for row in conn.execute(
+                'SELECT owner FROM workers WHERE heartbeat >= ?', (cutoff,)
+            )}
+            live.add(self.owner)
+            placeholders = ','.join('?' * len(ACTIVE_STATUSES))
+            rows = conn.execute(
+                f'SELECT job_id, status, start_time, data FROM jobs WHERE status IN ({placeholders})',
+                ACTIVE_STATUSES
+            ).fetchall()
+
+            orphaned = 0
+            for row in rows:
+                job = json.loads(row[3])
+                if job.get('owner') in live:
+                    continue
+                job['error'] = ORPHANED_ERROR
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', data = ? WHERE job_id = ?",
+                    (json.dumps(job), row[0])
+                )
+                conn.execute(
+                    'INSERT INTO job_events (job_id, event, data) VALUES (?, ?, ?)',
+                    (row[0], 'failed', json.dumps({'status': 'failed', 'error': ORPHANED_ERROR}))
+                )
+                orphaned += 1
+
+            conn.execute('DELETE FROM workers WHERE heartbeat < ?', (cutoff,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        if orphaned:
+            print(f"Marked {orphaned} jobs left by stopped processes as failed")
+        return orphaned
+
+    def start_heartbeat(self, interval=30):
+        """
+        Beat every ``interval`` seconds in a daemon thread, failing the jobs of
+        processes silent for four intervals. The first beat (and recovery of
+        jobs left by a previous run) happens before this returns.
+        """
+        if self._heartbeat_thread is not None:
+            return
+        self.heartbeat()
+        self.fail_orphaned_jobs(interval * 4)
+
+        def beat():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.heartbeat()
+                    self.fail_orphaned_jobs(interval * 4)
+                except Exception as e:
+                    print(f"Job store heartbeat failed: {e}")
+
+        self._heartbeat_thread = threading.Thread(target=beat, name='job-store-heartbeat', daemon=True)
+        self._heartbeat_thread.start()
+
+
+def create_job_store(backend='sqlite', db_path=None):
+    """
+    Build the configured job store.
+
+    Args:
+        backend: 'sqlite' (default, shared across processes) or 'memory'
+        db_path: Database file for the SQLite backend
+
+    Returns:
+        JobStore instance
+    """
+    if backend == 'memory':
+        return MemoryJobStore()
+    if backend == 'sqlite':
+        if not db_path:
+            raise ValueError("db_path is required for the sqlite job store")
+        return SQLiteJobStore(db_path)
+    raise ValueError(f"Unknown job store backend: {backend}")
@@ -0,0 +1,73 @@
+import threading
+
+
+class LiveAudio:
+    """
+    Raw audio of a running job, held in memory so it can be played while it
+    is synthesized.
+
+    The synthesis pipeline writes to it like a file. Any number of listeners
+    iterate ``follow()``: they get everything written so far, then new audio
+    as it arrives, until ``close()``. Chunks are kept as the bytes objects
+    they were written as, so listeners share them without copies.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def write(self, data):
+        with self._condition:
+            self._chunks.append(bytes(data))
+            self._condition.notify_all()
+        return len(data)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def follow(self):
+        """
+        Yield the audio from the start, then new audio as it arrives, until
+        the stream is closed.
+
+        A waiting listener is always woken by new audio or by close(), so a
+        listener that left is noticed, at the latest, when the job finishes.
+        """
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._chunks) and not self._closed:
+                    self._condition.wait()
+                chunks = self._chunks[index:]
+                index += len(chunks)
+            if not chunks:
+                return
+            yield from chunks
+
+
+class LiveAudioRegistry:
+    """The LiveAudio of every job running in this process, by job id"""
+
+    def __init__(self):
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def open(self, job_id):
+        stream = LiveAudio()
+        with self._lock:
+            self._streams[job_id] = stream
+        return stream
+
+    def get(self, job_id):
+        with self._lock:
+            return self._streams.get(job_id)
+
+    def close(self, job_id):
+        """Close a job's stream and forget it; listeners already following it finish reading"""
+        with self._lock:
+            stream = self._streams.pop(job_id, None)
+        if stream is not None:
+            stream.close()
@@ -1,70 +1,581 @@
 import os
-import subprocess
+import asyncio
 import shutil
 import re
 import time
 import uuid
-from urllib.parse import urlparse
+import json
+import hashlib
+import threading
+from collections import deque
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+# "[download]  42.3% of ~  10.00MiB at    1.00MiB/s ETA 00:05" (yt-dlp --newline)
+PROGRESS_PATTERN = re.compile(
+    r'^\[download\]\s+(?P<percent>[\d.]+)%'
+    r'(?:\s+of\s+~?\s*(?P<total>\S+))?'
+    r'(?:\s+at\s+(?P<speed>\S+))?'
+    r'(?:\s+ETA\s+(?P<eta>\S+))?'
+)
+
+# Post-processing steps that follow the download itself
+PHASE_PREFIXES = {
+    '[ExtractAudio]': 'converting',
+    '[Merger]': 'merging',
+    '[VideoConvertor]': 'converting',
+    '[FixupM3u8]': 'converting',
+}
+
+OUTPUT_TAIL_LINES = 20  # Lines of yt-dlp output kept for error messages
+
+
+class DownloadError(Exception):
+    """Raised when yt-dlp fails or produces no file"""
+
+
+def parse_progress(line):
+    """
+    Parse one line of yt-dlp output.
+
+    Returns:
+        Dict with phase and, while downloading, percent/total/speed/eta;
+        None for lines that carry no progress information
+    """
+    line = line.strip()
+    match = PROGRESS_PATTERN.match(line)
+    if match:
+        progress = {'phase': 'downloading', 'percent': float(match.group('percent'))}
+        for key in ('total', 'speed', 'eta'):
+            value = match.group(key)
+            if value and value != 'Unknown':
+                progress[key] = value
+        return progress
+
+    for prefix, phase in PHASE_PREFIXES.items():
+        if line.startswith(prefix):
+            return {'phase': phase}
+    if line.startswith('[download] Destination:'):
+        return {'phase': 'downloading', 'percent': 0.0}
+    return None
+
+
+def print_progress(progress):
+    """Show download progress on one line; used by the command-line downloaders"""
+    if 'percent' in progress:
+        print(f"\r[{progress['phase']}] {progress['percent']:5.1f}%", end='', flush=True)
+    else:
+        print(f"\n[{progress['phase']}]", flush=True)
+
+
+async def run_yt_dlp(cmd, progress_callback=None):
+    """
+    Run yt-dlp without blocking the event loop, reporting progress as it goes.
+
+    Args:
+        cmd: yt-dlp command line
+        progress_callback: Optional callable(progress_dict) for each progress line
+
+    Returns:
+        (return_code, last lines of combined stdout/stderr)
+    """
+    # --newline puts every progress update on its own line so it can be parsed live
+    process = await asyncio.create_subprocess_exec(
+        *cmd[:1], '--newline', *cmd[1:],
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT
+    )
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    try:
+        async for raw_line in process.stdout:
+            line = raw_line.decode('utf-8', errors='replace').rstrip()
+            if not line:
+                continue
+            tail.append(line)
+            progress = parse_progress(line)
+            if progress and progress_callback:
+                progress_callback(progress)
+        return_code = await process.wait()
+    except BaseException:
+        # Don't leave yt-dlp running when the job is cancelled
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    return return_code, '\n'.join(tail)
+
+
+def safe_filename(filename):
+    return re.sub(r'[^\w\-_.]', '_', filename)
+
+
+def audio_output_file(output_path, filename=None):
+    """Where download_mp3 writes its result"""
+    # Generate a unique filename if none provided
+    if not filename:
+        filename = f"audio_{uuid.uuid4().hex[:8]}"
+    return os.path.join(output_path, f"{safe_filename(filename)}.mp3")
+
+
+def pinterest_pin_id(url):
+    """Extract the numeric pin id from a Pinterest URL, or None"""
+    if '/pin/' in url:
+        pin_id_match = re.search(r'/pin/(\d+)', url)
+        if pin_id_match:
+            return pin_id_match.group(1)
+    return None
+
+
+def video_output_file(url, output_path, filename=None):
+    """Where download_pinterest_video writes its result"""
+    pin_id = pinterest_pin_id(url)
+    if filename:
+        output_filename = f"{safe_filename(filename)}.mp4"
+    elif pin_id:
+        output_filename = f"pinterest_{pin_id}.mp4"
+    else:
+        output_filename = f"pinterest_{uuid.uuid4().hex[:8]}.mp4"
+    return os.path.join(output_path, output_filename)
+
+
+def audio_download_command(url, output_file):
+    """yt-dlp command that downloads a video's audio track and converts it to MP3"""
+    return [
+        'yt-dlp',
+        '-x',                    # Extract audio
+        '--audio-format', 'mp3', # Convert to MP3
+        '--audio-quality', '0',  # Best quality
+        '-o', output_file,       # Output filename
+        '--no-playlist',         # Don't download playlists
+        url                      # Video URL
+    ]
+
+
+def video_download_commands(url, output_file):
+    """yt-dlp commands for a Pinterest video: the preferred one, then a fallback"""
+    return [
+        [
+            'yt-dlp',
+            '--merge-output-format', 'mp4',  # Ensure output is MP4
+            '-o', output_file,               # Output filename
+            '--no-warnings',                 # Suppress warnings
+            url                              # Pinterest URL
+        ],
+        [
+            # Alternate approach if the first attempt fails
+            'yt-dlp',
+            '-f', 'b',          # Use best format
+            '--merge-output-format', 'mp4',
+            '-o', output_file,
+            url
+        ],
+    ]
+
+
+async def download_mp3_async(url, output_path='youtube_audio', filename=None, progress_callback=None,
+                             engine=None):
+    """
+    Download audio from a video URL and save as MP3, without blocking the event loop.
+
+    Args:
+        url (str): URL of the video
+        output_path (str): Directory to save the MP3 file
+        filename (str): Output filename (without extension)
+        progress_callback: Optional callable(progress_dict) fed from yt-dlp's output
+        engine: Optional ytdlp_engine.InProcessEngine; the yt-dlp command is used without one
+
+    Returns:
+        str: Path to the saved MP3 file
+
+    Raises:
+        DownloadError: If yt-dlp fails or the file is missing afterwards
+    """
+    os.makedirs(output_path, exist_ok=True)
+    output_file = audio_output_file(output_path, filename)
+
+    print(f"Downloading audio from: {url}")
+    if engine is not None:
+        return_code, output = await engine.download(url, engine.audio_options(output_file), progress_callback)
+    else:
+        return_code, output = await run_yt_dlp(audio_download_command(url, output_file), progress_callback)
+
+    if return_code != 0:
+        print(f"Error: {output}")
+        raise DownloadError(output.splitlines()[-1] if output else f"yt-dlp exited with code {return_code}")
+
+    # Check if file exists
+    if not os.path.exists(output_file):
+        raise DownloadError("Download completed but could not locate the MP3 file.")
+    print(f"Successfully downloaded: {output_file}")
+    return output_file
+
+
+async def download_pinterest_video_async(url, output_path='pinterest_videos', filename=None,
+                                         progress_callback=None, engine=None):
+    """
+    Download video from a Pinterest URL, without blocking the event loop.
+
+    Args:
+        url (str): Pinterest URL of the video
+        output_path (str): Directory to save the video file
+        filename (str): Output filename (without extension)
+        progress_callback: Optional callable(progress_dict) fed from yt-dlp's output
+        engine: Optional ytdlp_engine.InProcessEngine; the yt-dlp command is used without one
+
+    Returns:
+        str: Path to the saved video file
+
+    Raises:
+        DownloadError: If the URL is not a Pinterest link or every attempt fails
+    """
+    # Validate Pinterest URL
+    parsed_url = urlparse(url)
+    if 'pinterest' not in parsed_url.netloc:
+        raise DownloadError("URL does not appear to be a Pinterest link.")
+
+    os.makedirs(output_path, exist_ok=True)
+    output_file = video_output_file(url, output_path, filename)
+
+    output = ''
+    attempts = engine.video_options(output_file) if engine is not None else video_download_commands(url, output_file)
+    for attempt in attempts:
+        if engine is not None:
+            return_code, output = await engine.download(url, attempt, progress_callback)
+        else:
+            return_code, output = await run_yt_dlp(attempt, progress_callback)
+        if return_code == 0:
+            break
+    else:
+        print(f"Error: {output}")
+        raise DownloadError(output.splitlines()[-1] if output else "yt-dlp failed")
+
+    # Check if file was downloaded successfully
+    if not os.path.exists(output_file):
+        raise DownloadError("Download completed but could not locate the video file.")
+    print(f"Successfully downloaded: {output_file}")
+    return output_file
+
+
+YOUTUBE_ID_PATTERN = re.compile(r'^[\w-]{11}$')
+# Query parameters that never change what a URL points to
+TRACKING_PARAMS = {'si', 'feature', 'fbclid', 'gclid', 'pp', 'ab_channel'}
+MEDIA_EXTENSIONS = {'audio': 'mp3', 'video': 'mp4'}
+
+
+def youtube_video_id(url):
+    """Return the 11-character video id of a YouTube URL, or None"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().split(':')[0]
+    if host.startswith('www.') or host.startswith('m.'):
+        host = host.split('.', 1)[1]
+
+    candidate = None
+    if host == 'youtu.be':
+        candidate = parsed.path.lstrip('/').split('/')[0]
+    elif host in ('youtube.com', 'music.youtube.com', 'youtube-nocookie.com'):
+        if parsed.path == '/watch':
+            candidate = dict(parse_qsl(parsed.query)).get('v')
+        else:
+            parts = parsed.path.strip('/').split('/')
+            if len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+                candidate = parts[1]
+    return candidate if candidate and YOUTUBE_ID_PATTERN.match(candidate) else None
+
+
+def normalize_url(url):
+    """Lower-case the host, drop the fragment, tracking parameters and trailing slash"""
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query)
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return f"{parsed.scheme.lower() or 'https'}://{host}{path}" + (f"?{urlencode(query)}" if query else '')
+
+
+def media_identity(url):
+    """
+    Identify what a URL downloads: the extractor's id when it is known
+    ("youtube:dQw4w9WgXcQ", "pinterest:1234"), the normalized URL otherwise.
+    """
+    video_id = youtube_video_id(url)
+    if video_id:
+        return f"youtube:{video_id}"
+    if 'pinterest' in urlparse(url).netloc:
+        pin_id = pinterest_pin_id(url)
+        if pin_id:
+            return f"pinterest:{pin_id}"
+    return f"url:{normalize_url(url)}"
+
+
+def download_key(url, media_type):
+    """Cache key for a URL downloaded as 'audio' or 'video'"""
+    identity = f"{media_type}|{media_identity(url)}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:32]
+
+
+def download_name(url, media_type, filename=None):
+    """Name offered to the user for a download; stable for the same URL"""
+    extension = MEDIA_EXTENSIONS[media_type]
+    if filename:
+        return f"{safe_filename(filename)}.{extension}"
+    if media_type == 'video':
+        pin_id = pinterest_pin_id(url)
+        return f"pinterest_{pin_id or download_key(url, media_type)[:8]}.{extension}"
+    return f"audio_{download_key(url, media_type)[:8]}.{extension}"
+
+
+class DownloadCache:
+    """
+    Downloads stored once per media item, keyed by extractor id or normalized URL.
+
+    Files live at ``<root>/<media_type>/<key>.<ext>``; the name a user asked
+    for is only used when the file is served. A hit returns the existing file
+    without running yt-dlp. Concurrent requests for the same item in this
+    process share one download (and its progress updates). yt-dlp writes into
+    a staging directory and the finished file is moved into place, so a
+    partial file is never served. Files under ``root`` are evicted least
+    recently used first once their total size exceeds ``max_bytes``; a
+    file's mtime is bumped on every hit and serves as its last-access time.
+    Downloads go through ``engine`` (see ytdlp_engine) when one is given.
+
+    ``fetch`` must always be awaited on the same event loop.
+    """
+
+    def __init__(self, root, max_bytes=5 * 1024 * 1024 * 1024, engine=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.engine = engine
+        self._inflight = {}
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def path_for(self, url, media_type):
+        key = download_key(url, media_type)
+        return os.path.join(self.root, media_type, f"{key}.{MEDIA_EXTENSIONS[media_type]}")
+
+    def lookup(self, url, media_type):
+        """
+        Return the stored file for a URL, or None.
+
+        Safe to call from any thread.
+        """
+        path = self.path_for(url, media_type)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    async def fetch(self, url, media_type, progress_callback=None):
+        """
+        Return the file for a URL, downloading it unless it is stored or already in flight.
+
+        Returns:
+            (path, how) where how is 'hit', 'coalesced' or 'downloaded'
+        """
+        key = download_key(url, media_type)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            task, callbacks = inflight
+            if progress_callback:
+                callbacks.append(progress_callback)
+            with self._lock:
+                self.coalesced += 1
+            print(f"Joining download already in progress for {url}")
+            return await asyncio.shield(task), 'coalesced'
+
+        path = self.lookup(url, media_type)
+        if path:
+            print(f"Download cache hit for {url}")
+            return path, 'hit'
+
+        with self._lock:
+            self.misses += 1
+        callbacks = [progress_callback] if progress_callback else []
+
+        def fan_out(progress):
+            for callback in list(callbacks):
+                callback(progress)
+
+        task = asyncio.ensure_future(self._download(url, media_type, key, fan_out))
+        self._inflight[key] = (task, callbacks)
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a cancelled requester doesn't abort the download for the others
+        return await asyncio.shield(task), 'downloaded'
+
+    async def _download(self, url, media_type, key, progress_callback):
+        staging_dir = os.path.join(self.root, '.staging', uuid.uuid4().hex)
+        try:
+            if media_type == 'audio':
+                staged = await download_mp3_async(url, staging_dir, key, progress_callback, self.engine)
+            else:
+                staged = await download_pinterest_video_async(url, staging_dir, key, progress_callback,
+                                                              self.engine)
+
+            path = self.path_for(url, media_type)
+            # Disk work runs off the event loop so other downloads and waiters keep going
+            await asyncio.to_thread(self._publish, staged, path)
+        finally:
+            await asyncio.to_thread(shutil.rmtree, staging_dir, ignore_errors=True)
+
+        await asyncio.to_thread(self.evict, keep={path})
+        return path
+
+    @staticmethod
+    def _publish(staged, path):
+        """Move a finished download from staging into the cache"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged, path)
+
+    def evict(self, keep=()):
+        """Remove least-recently-used files under root until they fit in max_bytes"""
+        entries = []
+        total = 0
+        for directory, subdirectories, filenames in os.walk(self.root):
+            # Downloads still in progress are not part of the cache yet
+            subdirectories[:] = [name for name in subdirectories if name != '.staging']
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return 0
+
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self.evictions += removed
+        print(f"Evicted {removed} cached downloads")
+        return removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'in_flight': len(self._inflight),
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                'max_bytes': self.max_bytes,
+            }
+
+
+async def dump_flat_playlist(url, max_entries=None):
+    """
+    Run ``yt-dlp --flat-playlist -J`` and return the parsed JSON.
+
+    Raises:
+        DownloadError: If yt-dlp cannot read the URL
+    """
+    cmd = ['yt-dlp', '--flat-playlist', '-J', '--no-warnings']
+    if max_entries:
+        cmd += ['--playlist-end', str(max_entries)]
+    process = await asyncio.create_subprocess_exec(
+        *cmd, url,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        message = stderr.decode('utf-8', errors='replace').strip().splitlines()
+        raise DownloadError(message[-1] if message else f"yt-dlp exited with code {process.returncode}")
+    return json.loads(stdout)
+
+
+async def expand_playlist(url, max_entries=None, depth=2, engine=None):
+    """
+    List the videos behind a playlist or channel URL without downloading them.
+
+    A URL that points at a single video expands to itself. Channel pages,
+    whose entries are playlists (the Videos, Shorts... tabs), are expanded
+    one level further.
+
+    Args:
+        url: Playlist, channel or video URL
+        max_entries: Stop after this many videos
+        depth: How many levels of nested playlists to follow
+        engine: Optional ytdlp_engine.InProcessEngine; the yt-dlp command is used without one
+
+    Returns:
+        List of {'url', 'title'} dicts, in playlist order
+
+    Raises:
+        DownloadError: If yt-dlp cannot read the URL
+    """
+    if engine is not None:
+        info = await engine.extract_flat(url, max_entries)
+    else:
+        info = await dump_flat_playlist(url, max_entries)
+    if info.get('_type') != 'playlist':
+        return [{'url': info.get('webpage_url') or url, 'title': info.get('title') or ''}]
+
+    entries = []
+    for entry in info.get('entries') or []:
+        if not entry:
+            continue
+        entry_url = entry.get('webpage_url') or entry.get('url')
+        if entry_url and not entry_url.startswith('http') and entry.get('ie_key') == 'Youtube':
+            entry_url = f"https://www.youtube.com/watch?v={entry.get('id') or entry_url}"
+        if not entry_url:
+            continue
+
+        if entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab':
+            if depth > 1:
+                remaining = max_entries - len(entries) if max_entries else None
+                entries.extend(await expand_playlist(entry_url, remaining, depth - 1, engine))
+        else:
+            entries.append({'url': entry_url, 'title': entry.get('title') or ''})
+
+        if max_entries and len(entries) >= max_entries:
+            return entries[:max_entries]
+    return entries
+
 
 def download_mp3(url, output_path='youtube_audio', filename=None):
     """
     Download audio from a video URL and save as MP3.
    
+    Blocking wrapper around download_mp3_async for scripts and tools.
+   
     Args:
         url (str): URL of the video
         output_path (str): Directory to save the MP3 file
         filename (str): Output filename (without extension)
    
     Returns:
-        str: Path to the saved MP3 file
+        str: Path to the saved MP3 file, or None on failure
     """
     try:
-        # Create output directory if it doesn't exist
-        if not os.path.exists(output_path):
-            os.makedirs(output_path)
-        
-        # Generate a unique filename if none provided
-        if not filename:
-            filename = f"audio_{uuid.uuid4().hex[:8]}"
-        
-        # Ensure filename is safe
-        filename = re.sub(r'[^\w\-_.]', '_', filename)
-        output_file = os.path.join(output_path, f"{filename}.mp3")
-       
-        print(f"Downloading audio from: {url}")
-       
-        # Use yt-dlp to download and convert directly to MP3
-        cmd = [
-            'yt-dlp',
-            '-x',                    # Extract audio
-            '--audio-format', 'mp3', # Convert to MP3
-            '--audio-quality', '0',  # Best quality
-            '-o', output_file,       # Output filename
-            '--no-playlist',         # Don't download playlists
-            url                      # Video URL
-        ]
-       
-        # Run the command
-        result = subprocess.run(cmd, capture_output=True, text=True)
-       
-        if result.returncode != 0:
-            print(f"Error: {result.stderr}")
-            return None
-        
-        # Check if file exists
-        if os.path.exists(output_file):
-            print(f"Successfully downloaded: {output_file}")
-            return output_file
-        else:
-            print("Download completed but could not locate the MP3 file.")
-            return None
-           
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing yt-dlp: {e}")
-        if e.stderr:
-            print(f"Error details: {e.stderr}")
-        return None
-       
+        return asyncio.run(download_mp3_async(url, output_path, filename))
     except Exception as e:
         print(f"Error: {str(e)}")
         return None
@@ -73,78 +584,18 @@ def download_pinterest_video(url, output_path='pinterest_videos', filename=None)
     """
     Download video from a Pinterest URL and save it.
     
+    Blocking wrapper around download_pinterest_video_async for scripts and tools.
+    
     Args:
         url (str): Pinterest URL of the video
         output_path (str): Directory to save the video file
         filename (str): Output filename (without extension)
     
     Returns:
-        str: Path to the saved video file
+        str: Path to the saved video file, or None on failure
     """
     try:
-        # Create output directory if it doesn't exist
-        if not os.path.exists(output_path):
-            os.makedirs(output_path)
-        
-        # Validate Pinterest URL
-        parsed_url = urlparse(url)
-        if 'pinterest' not in parsed_url.netloc:
-            print("Error: URL does not appear to be a Pinterest link.")
-            return None
-        
-        # Extract pin ID for filename
-        pin_id = None
-        if '/pin/' in url:
-            pin_id_match = re.search(r'/pin/(\d+)', url)
-            if pin_id_match:
-                pin_id = pin_id_match.group(1)
-        
-        # Set output filename
-        if filename:
-            filename = re.sub(r'[^\w\-_.]', '_', filename)  # Ensure filename is safe
-            output_filename = f"{filename}.mp4"
-        elif pin_id:
-            output_filename = f"pinterest_{pin_id}.mp4"
-        else:
-            output_filename = f"pinterest_{uuid.uuid4().hex[:8]}.mp4"
-        
-        output_file = os.path.join(output_path, output_filename)
-        
-        # Use yt-dlp to download the Pinterest video
-        cmd = [
-            'yt-dlp',
-            '--merge-output-format', 'mp4',  # Ensure output is MP4
-            '-o', output_file,               # Output filename
-            '--no-warnings',                 # Suppress warnings
-            url                              # Pinterest URL
-        ]
-        
-        # Run the command
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            # Try alternate approach if first attempt fails
-            alt_cmd = [
-                'yt-dlp',
-                '-f', 'b',          # Use best format
-                '--merge-output-format', 'mp4',
-                '-o', output_file,
-                url
-            ]
-            
-            alt_result = subprocess.run(alt_cmd, capture_output=True, text=True)
-            
-            if alt_result.returncode != 0:
-                return None
-        
-        # Check if file was downloaded successfully
-        if os.path.exists(output_file):
-            print(f"Successfully downloaded: {output_file}")
-            return output_file
-        else:
-            print("Download completed but could not locate the video file.")
-            return None
-        
+        return asyncio.run(download_pinterest_video_async(url, output_path, filename))
     except Exception as e:
         print(f"Error: {str(e)}")
         return None
@@ -3,10 +3,10 @@ import os
 import argparse
 import subprocess
 import shutil
-import re
-import time
 from urllib.parse import urlparse
 
+from media_downloaders import print_progress, video_output_file
+
 def download_pinterest_video(url, output_path='pinterest videos', filename=None):
     """
     Download video from a Pinterest URL and save it.
@@ -32,22 +32,7 @@ def download_pinterest_video(url, output_path='pinterest videos', filename=None)
         
         print(f"Downloading video from: {url}")
         
-        # Extract pin ID for filename
-        pin_id = None
-        if '/pin/' in url:
-            pin_id_match = re.search(r'/pin/(\d+)', url)
-            if pin_id_match:
-                pin_id = pin_id_match.group(1)
-        
-        # Set output filename
-        if filename:
-            output_filename = f"{filename}.mp4"
-        elif pin_id:
-            output_filename = f"pinterest_{pin_id}.mp4"
-        else:
-            output_filename = f"pinterest_{int(time.time())}.mp4"
-        
-        output_file = os.path.join(output_path, output_filename)
+        output_file = video_output_file(url, output_path, filename)
         
         # Use yt-dlp to download the Pinterest video
         # Note: We're not specifying format selection to let yt-dlp choose the best option
@@ -105,14 +90,69 @@ def download_pinterest_video(url, output_path='pinterest videos', filename=None)
         print(f"Error: {str(e)}")
         return None
 
+def download_pinterest_video_in_process(url, output_path='pinterest videos', filename=None):
+    """
+    Download video from a Pinterest URL, using the yt_dlp module in this
+    process instead of starting the yt-dlp command (once per attempt).
+    
+    Args:
+        url (str): Pinterest URL of the video
+        output_path (str): Directory to save the video file
+        filename (str): Output filename (without extension)
+    
+    Returns:
+        str: Path to the saved video file, or None on failure
+    """
+    from ytdlp_engine import video_download_options, run_download
+    
+    parsed_url = urlparse(url)
+    if 'pinterest' not in parsed_url.netloc:
+        print("Error: URL does not appear to be a Pinterest link.")
+        return None
+    
+    os.makedirs(output_path, exist_ok=True)
+    output_file = video_output_file(url, output_path, filename)
+    print(f"Downloading video from: {url}")
+    
+    # Preferred options first, then the best pre-merged format
+    for attempt, options in enumerate(video_download_options(output_file)):
+        if attempt:
+            print("Trying alternate download method...")
+        return_code, output, _ = run_download(url, options, print_progress)
+        print()
+        if return_code == 0:
+            break
+        print("Error occurred during download:")
+        print(output)
+    else:
+        return None
+    
+    if os.path.exists(output_file):
+        print(f"Successfully downloaded: {output_file}")
+        return output_file
+    print("Download completed but could not locate the video file.")
+    return None
+
 def main():
     parser = argparse.ArgumentParser(description='Download videos from Pinterest URLs')
     parser.add_argument('url', help='Pinterest URL of the video')
     parser.add_argument('-o', '--output', default='pinterest videos', help='Output directory')
     parser.add_argument('-f', '--filename', help='Output filename (without extension)')
     
+    parser.add_argument('--in-process', action='store_true',
+                        help='Use the yt_dlp Python module instead of starting the yt-dlp command')
+    
     args = parser.parse_args()
     
+    if args.in_process:
+        from ytdlp_engine import HAVE_YT_DLP
+        if not HAVE_YT_DLP:
+            print("Error: the yt_dlp module is not installed.")
+            print("Please install it with: pip install yt-dlp")
+            return
+        download_pinterest_video_in_process(args.url, args.output, args.filename)
+        return
+    
     # Check if yt-dlp is installed
     if shutil.which('yt-dlp') is None:
         print("Error: yt-dlp is not installed.")
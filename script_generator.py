@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import threading
+
+from cachetools import TTLCache
+
+DEFAULT_MODEL_NAME = 'gemini-2.0-flash'
+
+
+def create_gemini_model(api_key, model_name=DEFAULT_MODEL_NAME):
+    """Configure the Gemini SDK and build a model client"""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+
+class ScriptGenerator:
+    """
+    Long-lived LLM client with a TTL + LRU cache of prompt results.
+
+    The model is created once, on first use, by ``model_factory``. Any object
+    with a ``generate_content(prompt, stream=False)`` method returning something
+    with a ``.text`` attribute (or an iterable of them when streaming) works, so
+    a local stub can replace Gemini in tests and development.
+    """
+
+    def __init__(self, model_factory, ttl=3600, max_entries=256):
+        self._model_factory = model_factory
+        self._model = None
+        self._model_lock = threading.Lock()
+
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._model_factory()
+        return self._model
+
+    @staticmethod
+    def _key(prompt):
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def cached(self, prompt):
+        """Return the cached result for a fully rendered prompt, or None"""
+        with self._cache_lock:
+            return self._cache.get(self._key(prompt))
+
+    def remember(self, prompt, text):
+        """Store a result for a fully rendered prompt"""
+        with self._cache_lock:
+            self._cache[self._key(prompt)] = text
+
+    def generate(self, prompt):
+        """
+        Generate text for a prompt, answering repeats from the cache.
+
+        Returns:
+            Generated text
+        """
+        text = self.cached(prompt)
+        if text is not None:
+            with self._cache_lock:
+                self.hits += 1
+            return text
+
+        with self._cache_lock:
+            self.misses += 1
+        text = self.model.generate_content(prompt).text
+        self.remember(prompt, text)
+        return text
+
+    def stream(self, prompt):
+        """
+        Generate text for a prompt piece by piece, as the model produces it.
+
+        A cached result is yielded whole. Otherwise the joined pieces are
+        cached once the model finishes, so a later ``generate`` or ``stream``
+        of the same prompt returns exactly the same script. A stream that is
+        abandoned part way is not cached.
+
+        Yields:
+            Chunks of generated text
+        """
+        text = self.cached(prompt)
+        if text is not None:
+            with self._cache_lock:
+                self.hits += 1
+            yield text
+            return
+
+        with self._cache_lock:
+            self.misses += 1
+        pieces = []
+        for chunk in self.model.generate_content(prompt, stream=True):
+            piece = chunk.text
+            if piece:
+                pieces.append(piece)
+                yield piece
+        self.remember(prompt, ''.join(pieces))
+
+    async def astream(self, prompt):
+        """
+        Async version of ``stream`` for use on an event loop.
+
+        The blocking SDK iterator runs in a worker thread and hands each piece
+        over through a queue, so the loop stays free (e.g. for TTS requests)
+        while the model is writing.
+
+        Yields:
+            Chunks of generated text
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        finished = object()
+
+        def produce():
+            try:
+                for piece in self.stream(prompt):
+                    loop.call_soon_threadsafe(queue.put_nowait, piece)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        producer = loop.run_in_executor(None, produce)
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await producer
+
+    def stats(self):
+        with self._cache_lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._cache),
+                'max_entries': self._cache.maxsize,
+                'ttl': self._cache.ttl,
+            }
+
+
+class StubModel:
+    """Offline stand-in for the Gemini model, for tests and local development"""
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, reply="This is a stub script."):
+        self.reply = reply
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if not stream:
+            return self._Response(self.reply)
+        # Stream word by word, keeping the whitespace, like a real model would
+        words = self.reply.split(' ')
+        return [self._Response(word if i == 0 else ' ' + word) for i, word in enumerate(words)]
@@ -0,0 +1,166 @@
+import re
+import hashlib
+
+MAX_SEGMENT_LENGTH = 3000  # Maximum text segment length to ensure stability
+
+# Break points tried in order of preference
+SEGMENT_DELIMITERS = ['\n\n', '\n', '. ', '! ', '? ', '; ']
+
+# End of a sentence: terminal punctuation (plus closing quotes/brackets)
+# followed by whitespace, or a line break
+SENTENCE_BOUNDARY = re.compile(r'[.!?\u2026]+["\'\u201d\u2019)\]]*\s+|\n\s*')
+MIN_SENTENCE_LENGTH = 20  # Shorter sentences are merged with the next one
+SENTENCES_PER_GROUP = 8  # Average sentences per chunk in group_sentences
+
+
+def split_text(text, max_length=MAX_SEGMENT_LENGTH):
+    """
+    Split text into segments no longer than max_length.
+
+    Segments end at the latest paragraph, line or sentence break that fits,
+    falling back to a hard cut when a span has no break at all.
+
+    Args:
+        text: Text to segment
+        max_length: Maximum length of each segment
+
+    Returns:
+        List of non-empty text segments
+    """
+    if len(text) <= max_length:
+        return [text]
+
+    segments = []
+    current_pos = 0
+
+    while current_pos < len(text):
+        # Find a good breaking point (end of sentence or paragraph)
+        end_pos = min(current_pos + max_length, len(text))
+
+        if end_pos < len(text):
+            for delim in SEGMENT_DELIMITERS:
+                last_delim = text.rfind(delim, current_pos, end_pos)
+                if last_delim != -1:
+                    end_pos = last_delim + len(delim)
+                    break
+
+        segment = text[current_pos:end_pos].strip()
+        if segment:
+            segments.append(segment)
+
+        current_pos = end_pos
+
+    return segments
+
+
+class SentenceSplitter:
+    """
+    Cut streamed text into sentences as soon as each one is complete.
+
+    Text is fed in arbitrary pieces (e.g. LLM tokens); a sentence is released
+    once the whitespace after its final punctuation has arrived. Very short
+    sentences are held back and joined with the next, and sentences or text
+    that run past max_length are cut with split_text, so no piece is longer
+    than max_length.
+    """
+
+    def __init__(self, min_length=MIN_SENTENCE_LENGTH, max_length=MAX_SEGMENT_LENGTH):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.buffer = ''
+
+    def feed(self, text):
+        """
+        Add streamed text.
+
+        Returns:
+            List of sentences completed by this piece (possibly empty)
+        """
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self.buffer):
+            sentence = self.buffer[start:match.end()].strip()
+            if len(sentence) >= self.min_length:
+                # A run-on sentence is cut like any other long text
+                sentences.extend(split_text(sentence, self.max_length))
+                start = match.end()
+        self.buffer = self.buffer[start:]
+
+        if len(self.buffer) > self.max_length:
+            pieces = split_text(self.buffer, self.max_length)
+            sentences.extend(pieces[:-1])
+            self.buffer = pieces[-1]
+        return sentences
+
+    def flush(self):
+        """
+        Release whatever text is left once the stream has ended.
+
+        Returns:
+            List with the final sentence, or an empty list
+        """
+        remainder = self.buffer.strip()
+        self.buffer = ''
+        return [remainder] if remainder else []
+
+
+def split_sentences(text, min_length=MIN_SENTENCE_LENGTH, max_length=MAX_SEGMENT_LENGTH):
+    """
+    Split complete text into the sentences SentenceSplitter would stream.
+
+    Boundaries depend only on nearby punctuation, so editing one sentence
+    leaves the others unchanged.
+
+    Returns:
+        List of non-empty sentences
+    """
+    splitter = SentenceSplitter(min_length, max_length)
+    return splitter.feed(text) + splitter.flush()
+
+
+def is_cut_point(sentence, group_size=SENTENCES_PER_GROUP):
+    """Whether a chunk ends after this sentence; true for about one sentence in group_size"""
+    digest = hashlib.blake2b(sentence.encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'big') % group_size == 0
+
+
+def group_sentences(sentences, max_length=MAX_SEGMENT_LENGTH, group_size=SENTENCES_PER_GROUP,
+                    alone=frozenset()):
+    """
+    Join consecutive sentences into chunks of up to max_length characters.
+
+    Chunks end after sentences picked by their content (see is_cut_point) or
+    before they would overflow, never at a fixed count. The same sentences
+    therefore always group the same way, and an edit only changes the chunk
+    holding the edited sentence, so chunks cached from an earlier render of
+    the script keep matching.
+
+    Args:
+        sentences: Sentences in order, e.g. from split_sentences
+        max_length: Maximum length of each chunk
+        group_size: Average number of sentences per chunk
+        alone: Sentences to keep as chunks of their own (e.g. already cached ones)
+
+    Returns:
+        List of chunks
+    """
+    chunks = []
+    current = ''
+    for sentence in sentences:
+        if sentence in alone:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(sentence)
+            continue
+        if current and len(current) + len(sentence) + 1 > max_length:
+            chunks.append(current)
+            current = ''
+        current = f"{current} {sentence}" if current else sentence
+        if is_cut_point(sentence, group_size):
+            chunks.append(current)
+            current = ''
+    if current:
+        chunks.append(current)
+    return chunks
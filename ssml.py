@@ -4,31 +4,10 @@ import os
 from pathlib import Path
 import edge_tts
 
-# Define available voices with language grouping
-AVAILABLE_VOICES = [
-    # English voices
-    {"id": "en-US-GuyNeural", "name": "Guy (Male, US)", "language": "English"},
-    {"id": "en-US-JennyNeural", "name": "Jenny (Female, US)", "language": "English"},
-    {"id": "en-GB-RyanNeural", "name": "Ryan (Male, UK)", "language": "English"},
-    {"id": "en-GB-SoniaNeural", "name": "Sonia (Female, UK)", "language": "English"},
-    {"id": "en-AU-NatashaNeural", "name": "Natasha (Female, Australian)", "language": "English"},
-    
-    # Arabic voices
-    {"id": "ar-MA-JamalNeural", "name": "Jamal (Male, Moroccan)", "language": "Arabic"},
-    {"id": "ar-EG-ShakirNeural", "name": "Shakir (Male, Egyptian)", "language": "Arabic"},
-    
-    # French voices
-    {"id": "fr-FR-HenriNeural", "name": "Henri (Male)", "language": "French"},
-    {"id": "fr-FR-DeniseNeural", "name": "Denise (Female)", "language": "French"},
-    
-    # German voices
-    {"id": "de-DE-ConradNeural", "name": "Conrad (Male)", "language": "German"},
-    {"id": "de-DE-KatjaNeural", "name": "Katja (Female)", "language": "German"},
-    
-    # Spanish voices
-    {"id": "es-ES-AlvaroNeural", "name": "Álvaro (Male)", "language": "Spanish"},
-    {"id": "es-ES-ElviraNeural", "name": "Elvira (Female)", "language": "Spanish"}
-]
+from voice_catalog import VoiceCatalog
+
+# Shared with the web app; refreshed from Edge TTS at most once per TTL
+voice_catalog = VoiceCatalog()
 
 async def generate_speech_from_ssml(ssml_content, output_path, voice_id):
     """
@@ -64,7 +43,7 @@ def list_available_voices():
     print("\nAvailable voices:")
     # Group voices by language for better readability
     languages = {}
-    for voice in AVAILABLE_VOICES:
+    for voice in voice_catalog.voices():
         if voice["language"] not in languages:
             languages[voice["language"]] = []
         languages[voice["language"]].append(voice)
@@ -89,6 +68,7 @@ async def main():
     
     # List voices if requested
     if args.list_voices:
+        await voice_catalog.refresh()
         list_available_voices()
         return
     
@@ -63,44 +63,12 @@ document.addEventListener("DOMContentLoaded", function() {
             submitBtn.innerHTML = '<i class="fas fa-download me-2"></i>Download';
             
             if (data.success) {
-                // Update UI for successful download
-                downloadItem.className = 'download-item status-complete';
-                downloadItem.innerHTML = `
-                    <div class="d-flex justify-content-between align-items-center">
-                        <div>
-                            <div class="d-flex align-items-center">
-                                <i class="fas fa-check-circle me-2 text-success"></i>
-                                <strong>${type}</strong>
-                            </div>
-                            <div class="mt-1">${data.filename}</div>
-                        </div>
-                        <div>
-                            <span class="badge bg-success me-2">Complete</span>
-                            <a href="${data.download_url}" class="btn btn-sm btn-primary">
-                                <i class="fas fa-download"></i>
-                            </a>
-                        </div>
-                    </div>
-                `;
-                
-                // Clear the form
+                // The server queued the download; follow its progress
                 form.reset();
+                trackDownload(data.status_url, downloadItem, downloadId, type, displayURL);
             } else {
                 // Update UI for failed download
-                downloadItem.className = 'download-item status-error';
-                downloadItem.innerHTML = `
-                    <div class="d-flex justify-content-between align-items-center">
-                        <div>
-                            <div class="d-flex align-items-center">
-                                <i class="fas fa-exclamation-circle me-2 text-danger"></i>
-                                <strong>${type}</strong>
-                            </div>
-                            <div class="mt-1" style="color: var(--gray-dark);">${displayURL}</div>
-                            <div class="mt-1 text-danger">${data.error}</div>
-                        </div>
-                        <span class="badge bg-danger">Failed</span>
-                    </div>
-                `;
+                showFailed(downloadItem, type, displayURL, data.error);
             }
         })
         .catch(error => {
@@ -125,4 +93,81 @@ document.addEventListener("DOMContentLoaded", function() {
             `;
         });
     }
-});
\ No newline at end of file
+    
+    // Poll a queued download until it finishes, showing yt-dlp's progress
+    function trackDownload(statusUrl, downloadItem, downloadId, type, displayURL) {
+        const statusBadge = document.getElementById(`status-${downloadId}`);
+        const phaseLabels = {
+            downloading: 'Downloading',
+            converting: 'Converting',
+            merging: 'Merging',
+            done: 'Finishing'
+        };
+        
+        const poll = () => {
+            fetch(statusUrl)
+                .then(response => response.json())
+                .then(status => {
+                    if (status.status === 'completed') {
+                        showComplete(downloadItem, type, status.filename, status.download_url);
+                        return;
+                    }
+                    if (status.status === 'failed' || status.error) {
+                        showFailed(downloadItem, type, displayURL, status.error || 'Download failed.');
+                        return;
+                    }
+                    
+                    // Still queued or running
+                    let label = status.status === 'pending' ? 'Queued' : (phaseLabels[status.phase] || 'Processing');
+                    if (status.phase === 'downloading' && status.percent != null) {
+                        label += ` ${Math.round(status.percent)}%`;
+                        if (status.eta) {
+                            label += ` (ETA ${status.eta})`;
+                        }
+                    }
+                    statusBadge.textContent = label;
+                    setTimeout(poll, 1000);
+                })
+                .catch(() => setTimeout(poll, 3000));
+        };
+        poll();
+    }
+    
+    function showComplete(downloadItem, type, filename, downloadUrl) {
+        downloadItem.className = 'download-item status-complete';
+        downloadItem.innerHTML = `
+            <div class="d-flex justify-content-between align-items-center">
+                <div>
+                    <div class="d-flex align-items-center">
+                        <i class="fas fa-check-circle me-2 text-success"></i>
+                        <strong>${type}</strong>
+                    </div>
+                    <div class="mt-1">${filename}</div>
+                </div>
+                <div>
+                    <span class="badge bg-success me-2">Complete</span>
+                    <a href="${downloadUrl}" class="btn btn-sm btn-primary">
+                        <i class="fas fa-download"></i>
+                    </a>
+                </div>
+            </div>
+        `;
+    }
+    
+    function showFailed(downloadItem, type, displayURL, error) {
+        downloadItem.className = 'download-item status-error';
+        downloadItem.innerHTML = `
+            <div class="d-flex justify-content-between align-items-center">
+                <div>
+                    <div class="d-flex align-items-center">
+                        <i class="fas fa-exclamation-circle me-2 text-danger"></i>
+                        <strong>${type}</strong>
+                    </div>
+                    <div class="mt-1" style="color: var(--gray-dark);">${displayURL}</div>
+                    <div class="mt-1 text-danger">${error}</div>
+                </div>
+                <span class="badge bg-danger">Failed</span>
+            </div>
+        `;
+    }
+});
@@ -0,0 +1,75 @@
+// script_stream.js - Read a script from the /stream endpoints as it is generated
+
+/**
+ * POST form data to a streaming script endpoint and report text as it arrives.
+ *
+ * The server sends Server-Sent Events: 'token' events with the next piece of
+ * text, then 'done' with the complete script (or 'error'). EventSource only
+ * supports GET, so the body is read with fetch and parsed here.
+ *
+ * @param {string} url - Streaming endpoint, e.g. '/generate-script/stream'
+ * @param {FormData} formData - Form fields, same as the non-streaming endpoint
+ * @param {function(string, string)} onToken - Called with (newText, scriptSoFar)
+ * @returns {Promise<string>} Resolves with the complete script
+ */
+async function streamScript(url, formData, onToken) {
+    const response = await fetch(url, {
+        method: 'POST',
+        body: formData
+    });
+
+    // Validation errors come back as plain JSON, like the original endpoints
+    if (!response.ok) {
+        let message = 'An error occurred while generating the script.';
+        try {
+            const data = await response.json();
+            message = data.error || message;
+        } catch (e) {}
+        throw new Error(message);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let script = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+
+        // Messages are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            message.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data += line.slice(5).trim();
+                }
+            });
+            if (!data) {
+                continue;
+            }
+
+            const payload = JSON.parse(data);
+            if (event === 'token') {
+                script += payload.text;
+                onToken(payload.text, script);
+            } else if (event === 'done') {
+                return payload.script;
+            } else if (event === 'error') {
+                throw new Error(payload.error);
+            }
+        }
+    }
+
+    throw new Error('The connection closed before the script was finished.');
+}
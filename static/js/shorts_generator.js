@@ -67,34 +67,34 @@ $(document).ready(function() {
         // Get form data
         const topic = $('#topic').val();
         
-        // Send AJAX request
-        $.ajax({
-            url: '/generate-shorts-script',
-            type: 'POST',
-            data: {
-                topic: topic
-            },
-            success: function(response) {
-                // Hide loading spinner
+        // Stream the script into the page as it is generated
+        const formData = new FormData();
+        formData.append('topic', topic);
+        $('#scriptOutput').text('');
+        
+        streamScript('/generate-shorts-script/stream', formData, function(text, scriptSoFar) {
+            if ($('#outputContainer').is(':hidden')) {
                 $('#loadingSpinner').hide();
-                $('#generateBtn').prop('disabled', false);
-                
-                // Display script
-                $('#scriptOutput').text(response.script);
                 $('#outputContainer').fadeIn(300);
-            },
-            error: function(xhr) {
-                // Hide loading spinner
-                $('#loadingSpinner').hide();
-                $('#generateBtn').prop('disabled', false);
-                
-                // Show error
-                let errorMessage = 'An error occurred while generating the script.';
-                if (xhr.responseJSON && xhr.responseJSON.error) {
-                    errorMessage = xhr.responseJSON.error;
-                }
-                alert(errorMessage);
             }
+            $('#scriptOutput').text(scriptSoFar);
+        })
+        .then(function(script) {
+            // Hide loading spinner
+            $('#loadingSpinner').hide();
+            $('#generateBtn').prop('disabled', false);
+            
+            // Display script
+            $('#scriptOutput').text(script);
+            $('#outputContainer').fadeIn(300);
+        })
+        .catch(function(error) {
+            // Hide loading spinner
+            $('#loadingSpinner').hide();
+            $('#generateBtn').prop('disabled', false);
+            
+            // Show error
+            alert(error.message || 'An error occurred while generating the script.');
         });
     });
     
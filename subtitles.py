@@ -0,0 +1,95 @@
+import os
+
+TICKS_PER_MS = 10000  # Edge TTS offsets and durations are in 100-nanosecond ticks
+MAX_CUE_LENGTH = 80  # Characters per subtitle line
+
+
+def boundary(offset, duration, text):
+    """A word boundary in the shape Edge TTS reports it (ticks)"""
+    return {'offset': int(offset), 'duration': int(duration), 'text': text}
+
+
+def shift_boundaries(boundaries, offset_ticks):
+    """Copies of ``boundaries`` moved later by ``offset_ticks``"""
+    return [dict(word, offset=int(word['offset'] + offset_ticks)) for word in boundaries]
+
+
+def scale_boundaries(boundaries, factor):
+    """Stretch boundaries in place by ``factor`` (output length / input length)"""
+    for word in boundaries:
+        word['offset'] = int(word['offset'] * factor)
+        word['duration'] = int(word['duration'] * factor)
+    return boundaries
+
+
+def group_cues(boundaries, max_length=MAX_CUE_LENGTH):
+    """
+    Join consecutive words into subtitle cues of at most ``max_length`` characters.
+
+    Returns:
+        List of (start_ms, end_ms, text) tuples
+    """
+    cues = []
+    current_line = ''
+    line_start = line_end = 0
+    for word in boundaries:
+        start = word['offset'] // TICKS_PER_MS
+        end = (word['offset'] + word['duration']) // TICKS_PER_MS
+        if current_line and len(current_line) + len(word['text']) + 1 <= max_length:
+            current_line += ' ' + word['text']
+            line_end = end
+            continue
+        if current_line:
+            cues.append((line_start, line_end, current_line))
+        current_line, line_start, line_end = word['text'], start, end
+    if current_line:
+        cues.append((line_start, line_end, current_line))
+    return cues
+
+
+def format_timestamp(milliseconds, separator='.'):
+    """Format milliseconds as HH:MM:SS.mmm (VTT) or HH:MM:SS,mmm (SRT)"""
+    seconds, ms = divmod(int(milliseconds), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{ms:03d}"
+
+
+def to_vtt(cues):
+    lines = ["WEBVTT", ""]
+    for start, end, text in cues:
+        lines.append(f"{format_timestamp(start)} --> {format_timestamp(end)}")
+        lines.append(text)
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def to_srt(cues):
+    lines = []
+    for number, (start, end, text) in enumerate(cues, 1):
+        lines.append(str(number))
+        lines.append(f"{format_timestamp(start, ',')} --> {format_timestamp(end, ',')}")
+        lines.append(text)
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def write_subtitles(boundaries, base_path, max_length=MAX_CUE_LENGTH):
+    """
+    Write ``<base_path>.vtt`` and ``<base_path>.srt`` from word boundaries.
+
+    Returns:
+        {'vtt': path, 'srt': path}, or None when there are no boundaries
+    """
+    if not boundaries:
+        return None
+    cues = group_cues(boundaries, max_length)
+    paths = {}
+    for extension, render in (('vtt', to_vtt), ('srt', to_srt)):
+        path = f"{base_path}.{extension}"
+        partial_path = f"{path}.part"
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            f.write(render(cues))
+        os.replace(partial_path, path)
+        paths[extension] = path
+    return paths
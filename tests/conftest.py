@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep test jobs out of jobs.db
+os.environ.setdefault('JOB_STORE_BACKEND', 'memory')
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import app as app_module
+
+
+def read_stream(client, url, headers=None, timeout=5):
+    """GET an event stream; return (body, seconds) or fail if it never closes"""
+    result = {}
+
+    def read():
+        started = time.time()
+        response = client.get(url, headers=headers or {})
+        result['body'] = response.get_data(as_text=True)
+        result['seconds'] = time.time() - started
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    reader.join(timeout)
+    assert not reader.is_alive(), "event stream was never closed"
+    return result['body'], result['seconds']
+
+
+def create_job(status):
+    job_id = app_module.generate_unique_id()
+    app_module.job_store.create(job_id, {'status': status, 'start_time': time.time()})
+    return job_id
+
+
+def test_reconnect_after_terminal_event_closes_stream():
+    job_id = create_job('pending')
+    store = app_module.job_store
+    store.append_event(job_id, 'status', {'status': 'processing'})
+    store.update(job_id, status='completed')
+    last_event_id = store.append_event(job_id, 'complete', {'status': 'completed'})
+
+    client = app_module.app.test_client()
+    body, seconds = read_stream(client, f'/api/events/{job_id}',
+                                headers={'Last-Event-ID': str(last_event_id)})
+
+    assert 'event: complete' in body
+    assert seconds < 2
+
+
+def test_finished_job_without_terminal_event_closes_stream():
+    job_id = create_job('failed')
+    app_module.job_store.update(job_id, error='boom')
+
+    client = app_module.app.test_client()
+    body, _ = read_stream(client, f'/api/events/{job_id}')
+
+    assert 'event: failed' in body
+    assert 'boom' in body
+
+
+def test_stream_replays_events_up_to_terminal_event():
+    job_id = create_job('pending')
+    store = app_module.job_store
+    store.append_event(job_id, 'progress', {'segments_done': 1, 'segments_total': 2})
+    store.update(job_id, status='completed')
+    store.append_event(job_id, 'complete', {'status': 'completed'})
+
+    client = app_module.app.test_client()
+    body, _ = read_stream(client, f'/api/events/{job_id}')
+
+    assert body.index('event: progress') < body.index('event: complete')
+    assert body.count('event: complete') == 1
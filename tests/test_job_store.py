@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+from job_store import MemoryJobStore, SQLiteJobStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / 'jobs.db'))
+
+
+def test_delete_older_than_purges_batches_with_no_jobs_left(store):
+    old = time.time() - 3600
+    store.create('old-1', {'status': 'completed', 'start_time': old})
+    store.create('old-2', {'status': 'failed', 'start_time': old})
+    store.create_batch('old-batch', ['old-1', 'old-2'], created=old)
+
+    # One job purged, one still running: the batch must survive
+    store.create('old-3', {'status': 'completed', 'start_time': old})
+    store.create('old-4', {'status': 'processing', 'start_time': old})
+    store.create_batch('mixed-batch', ['old-3', 'old-4'], created=old)
+
+    store.create('new-1', {'status': 'completed', 'start_time': time.time()})
+    store.create_batch('new-batch', ['new-1'])
+
+    assert store.delete_older_than(60) == 3
+
+    assert store.get_batch('old-batch') is None
+    assert store.get_batch('mixed-batch')['job_ids'] == ['old-3', 'old-4']
+    assert store.get_batch('new-batch')['job_ids'] == ['new-1']
+    assert store.get('old-4') is not None
@@ -0,0 +1,53 @@
+from segmenter import SentenceSplitter, group_sentences, split_sentences
+
+MAX_LENGTH = 3000
+
+
+def run_on_sentence(length):
+    """Unpunctuated words ending in a single full stop"""
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append('word')
+    return ' '.join(words)[:length - 1] + '.'
+
+
+def test_split_sentences_respects_max_length():
+    text = f"A short opening sentence here. {run_on_sentence(10001)} And a short closing one."
+
+    sentences = split_sentences(text, max_length=MAX_LENGTH)
+
+    assert all(len(sentence) <= MAX_LENGTH for sentence in sentences)
+    assert sentences[0] == "A short opening sentence here."
+    assert sentences[-1] == "And a short closing one."
+
+
+def test_streamed_sentences_respect_max_length():
+    splitter = SentenceSplitter(max_length=MAX_LENGTH)
+    text = run_on_sentence(10001) + ' ' + run_on_sentence(7000) + ' '
+
+    sentences = []
+    for start in range(0, len(text), 37):
+        sentences.extend(splitter.feed(text[start:start + 37]))
+    sentences.extend(splitter.flush())
+
+    assert all(len(sentence) <= MAX_LENGTH for sentence in sentences)
+    assert ''.join(sentences).replace(' ', '') == text.replace(' ', '')
+
+
+def test_grouped_chunks_respect_max_length():
+    text = ' '.join([run_on_sentence(10001)] + ["Another ordinary sentence follows."] * 200)
+
+    chunks = group_sentences(split_sentences(text, max_length=MAX_LENGTH), MAX_LENGTH)
+
+    assert all(len(chunk) <= MAX_LENGTH for chunk in chunks)
+
+
+def test_group_sentences_is_stable_around_an_edit():
+    sentences = [f"Sentence number {i} has some words in it." for i in range(100)]
+    edited = list(sentences)
+    edited[50] = "This sentence was rewritten."
+
+    before = set(group_sentences(sentences, MAX_LENGTH))
+    after = group_sentences(edited, MAX_LENGTH)
+
+    assert sum(chunk not in before for chunk in after) <= 2
@@ -1,114 +1,407 @@
 import os
+import uuid
+import shutil
+import asyncio
 import tempfile
-import time
 from pydub import AudioSegment
-from pydub.effects import low_pass_filter, speedup
 
-async def generate_simple_tts(script_file, output_audio, voice_id, speed=-0.1, depth=9, is_ssml=False):
-    """Generate TTS audio with customizable speed and depth.
+from audio_io import decode_mp3, encode_mp3, change_speed
+from dsp import apply_depth_effect_array, depth_parameters
+from segmenter import split_text, split_sentences, group_sentences, SentenceSplitter
+from tts_cache import link_or_copy, sentence_key
+from subtitles import boundary, shift_boundaries, scale_boundaries
+
+MAX_CHUNK_LENGTH = 3000  # Characters per synthesis request
+MAX_CONCURRENT_CHUNKS = 4  # Chunks synthesized in parallel per job
+# Raw audio is kept in memory up to this size (~90 minutes of Edge TTS speech),
+# then spills to an anonymous temp file
+SPILL_THRESHOLD = 32 * 1024 * 1024
+# Edge TTS sends constant-bitrate audio-24khz-48kbitrate-mono-mp3, so a
+# segment's duration follows from its size
+EDGE_MP3_BITRATE = 48000
+TICKS_PER_SECOND = 10_000_000  # Unit of WordBoundary offsets
+
+def audio_ticks(byte_count):
+    """Duration of Edge TTS MP3 data, in WordBoundary ticks"""
+    return byte_count * 8 * TICKS_PER_SECOND // EDGE_MP3_BITRATE
+
+def tts_temp_dir():
+    """Directory for TTS intermediates that have to touch the disk"""
+    temp_dir = os.path.join(tempfile.gettempdir(), 'tts_generator')
+    os.makedirs(temp_dir, exist_ok=True)
+    return temp_dir
+
+def unique_temp_path(prefix, temp_dir=None):
+    """A temp file name no other job can pick, e.g. silent_<uuid>.mp3"""
+    return os.path.join(temp_dir or tts_temp_dir(), f'{prefix}_{uuid.uuid4().hex}.mp3')
+
+def audio_buffer(temp_dir=None):
+    """In-memory buffer for raw MP3 audio that moves to disk past SPILL_THRESHOLD"""
+    return tempfile.SpooledTemporaryFile(max_size=SPILL_THRESHOLD, prefix='base_tts_',
+                                         dir=temp_dir or tts_temp_dir())
+
+async def stream_chunk(text, voice_id, rate=None, boundaries=None):
+    """Synthesize one chunk of text, yielding MP3 bytes as they arrive.
+    
+    Word boundaries arrive in the same stream; when a ``boundaries`` list is
+    given they are appended to it, with offsets relative to this chunk.
+    """
+    from edge_tts import Communicate
+    
+    communicate = Communicate(text, voice_id)
+    if rate:
+        communicate.rate = rate
+    
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            yield chunk["data"]
+        elif chunk["type"] == "WordBoundary" and boundaries is not None:
+            boundaries.append(boundary(chunk["offset"], chunk["duration"], chunk["text"]))
+
+class OrderedChunkWriter:
+    """Write concurrently produced chunks to a file in playback order.
+    
+    Audio for the earliest unfinished chunk goes straight to the file (and to
+    the optional ``live`` copy, so listeners can play it immediately). Audio
+    for later chunks is buffered until every chunk before them has finished.
+    """
+    
+    def __init__(self, output, live=None):
+        self.output = output
+        self.live = live
+        self.head = 0
+        self.buffers = {}
+        self.finished = set()
+    
+    def _emit(self, data):
+        self.output.write(data)
+        if self.live is not None:
+            self.live.write(data)
+    
+    def write(self, index, data):
+        if index == self.head:
+            self._emit(data)
+        else:
+            self.buffers.setdefault(index, bytearray()).extend(data)
+    
+    def finish(self, index):
+        self.finished.add(index)
+        while self.head in self.finished:
+            self.finished.discard(self.head)
+            self.head += 1
+            # The new head may already have audio waiting
+            pending = self.buffers.pop(self.head, None)
+            if pending:
+                self._emit(pending)
+
+async def synthesize_stream(chunks, output_file, voice_id, rate=None,
+                           max_concurrency=MAX_CONCURRENT_CHUNKS, progress_callback=None,
+                           sentence_cache=None, word_boundaries=None, live_audio=None):
+    """Synthesize text chunks as they arrive and assemble them in order.
+    
+    Synthesis of each chunk starts as soon as the chunk is produced, so the
+    source can still be generating text (e.g. an LLM writing a script) while
+    the first chunks are already being spoken. The output file grows while
+    synthesis runs: audio for the first unfinished chunk is written as it
+    streams in, and later chunks follow as soon as everything before them is
+    done. Edge TTS returns the same MP3 stream format for every request, which
+    makes byte-level concatenation safe.
+    
+    With a sentence_cache, a chunk synthesized before with the same voice and
+    rate is copied from the cache instead of being requested again, and new
+    chunks are added to it.
+    
+    With a word_boundaries list, the WordBoundary events of every chunk are
+    collected from the same streams and added to it once all chunks are done,
+    shifted by the length of the audio before their chunk.
+    
+    Args:
+        chunks: Async iterable of text chunks, in playback order
+        output_file: Path of the MP3 file to write, or a writable binary file
+            object (e.g. from audio_buffer), which is left open
+        voice_id: Voice ID to use for TTS
+        rate: Optional edge-tts rate string
+        max_concurrency: Maximum number of chunks in flight at once
+        progress_callback: Optional callable(done, total) run after each chunk;
+            total counts the chunks produced so far
+        sentence_cache: Optional tts_cache.SentenceCache
+        word_boundaries: Optional list to extend with word boundaries (ticks
+            from the start of output_file)
+        live_audio: Optional object with a write(data) method (e.g.
+            live_audio.LiveAudio) that receives the audio in playback order
+            as it streams in
+        
+    Returns:
+        output_file, once the audio is assembled
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    done = 0
+    total = 0
+    reused = 0
+    tasks = []
+    collect_words = word_boundaries is not None
+    chunk_words = {}
+    chunk_bytes = {}
+    
+    is_path = isinstance(output_file, (str, os.PathLike))
+    output = open(output_file, 'wb') if is_path else output_file
+    try:
+        writer = OrderedChunkWriter(output, live_audio)
+        
+        async def run(index, text):
+            nonlocal done, reused
+            key = sentence_key(text, voice_id, rate) if sentence_cache else None
+            # Cache reads, writes and evictions touch the disk; keep them off the event loop
+            cached, words = await asyncio.to_thread(sentence_cache.get_entry, key) if key else (None, None)
+            if collect_words and words is None:
+                # Cached before boundaries were kept; synthesize it again
+                cached = None
+            
+            if cached:
+                writer.write(index, cached)
+                received = len(cached)
+                reused += 1
+            else:
+                pieces = []
+                words = [] if collect_words else None
+                async with semaphore:
+                    async for data in stream_chunk(text, voice_id, rate, words):
+                        writer.write(index, data)
+                        pieces.append(data)
+                
+                if not pieces:
+                    raise Exception(f"No audio received for chunk {index + 1}")
+                received = sum(len(data) for data in pieces)
+                if key:
+                    await asyncio.to_thread(sentence_cache.put, key, b''.join(pieces), words)
+            writer.finish(index)
+            chunk_bytes[index] = received
+            chunk_words[index] = words or []
+            
+            done += 1
+            print(f"Synthesized chunk {done}/{total}")
+            if progress_callback:
+                progress_callback(done, total)
+        
+        try:
+            async for text in chunks:
+                tasks.append(asyncio.ensure_future(run(total, text)))
+                total += 1
+                # Fail fast instead of waiting for the source to finish
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+            if not tasks:
+                raise Exception("No text to synthesize")
+            await asyncio.gather(*tasks)
+            if sentence_cache:
+                print(f"Reused {reused} of {total} sentences from the cache")
+            if collect_words:
+                offset = 0
+                for index in range(total):
+                    word_boundaries.extend(shift_boundaries(chunk_words[index], offset))
+                    offset += audio_ticks(chunk_bytes[index])
+        except BaseException:
+            # Stop the remaining chunks before the output file is closed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    finally:
+        if is_path:
+            output.close()
+    
+    return output_file
+
+async def synthesize_chunks(chunks, output_file, voice_id, rate=None,
+                            max_concurrency=MAX_CONCURRENT_CHUNKS, progress_callback=None,
+                            sentence_cache=None, word_boundaries=None, live_audio=None):
+    """Synthesize a list of text chunks concurrently and assemble them in order.
+    
+    See synthesize_stream; every chunk is known up front here.
+    """
+    async def iterate():
+        for text in chunks:
+            yield text
+    
+    return await synthesize_stream(
+        iterate(), output_file, voice_id, rate, max_concurrency, progress_callback, sentence_cache,
+        word_boundaries, live_audio
+    )
+
+def edge_rate(speed):
+    """Convert a playback speed to an edge-tts rate string (None for normal speed)"""
+    if speed == 1.0:
+        return None
+    # Convert speed to rate percentage with enhanced effect
+    # We'll use both edge-tts rate AND pydub speedup for more noticeable effect
+    rate_percentage = int((1.0/speed) * 100)
+    print(f"Setting edge-tts rate to: {rate_percentage}%")
+    return f"{rate_percentage}%"
+
+def write_atomically(output_path, write):
+    """Call write(file) on a temporary name and rename it into place"""
+    partial_path = f"{output_path}.part"
+    with open(partial_path, 'wb') as f:
+        write(f)
+    os.replace(partial_path, output_path)
+    return output_path
+
+def post_process(base_audio, speed, depth, output_path, word_boundaries=None):
+    """Apply the extra speed change and depth effect to synthesized audio.
+    
+    Args:
+        base_audio: Path of the synthesized MP3, or a binary file object holding it
+        speed: Playback speed the audio was synthesized for
+        depth: Voice depth level
+        output_path: Where to write the finished MP3
+        word_boundaries: Optional word boundaries of base_audio, rescaled in
+            place when the speed change alters the audio's length
+    
+    Returns:
+        output_path
+    """
+    is_path = isinstance(base_audio, (str, os.PathLike))
+    if not is_path:
+        base_audio.seek(0)
+    
+    # Speed changes between 0.8x and 1.2x are handled by edge-tts alone
+    needs_speed = speed < 0.8 or speed > 1.2
+    if not needs_speed and depth <= 1:
+        # Nothing to post-process: serve the synthesized MP3 as-is,
+        # without decoding or re-encoding it
+        if is_path:
+            return link_or_copy(base_audio, output_path)
+        return write_atomically(output_path, lambda f: shutil.copyfileobj(base_audio, f))
+    
+    # Decode once; every stage below works on the same PCM array
+    samples, sample_rate = decode_mp3(base_audio)
+    
+    # Process speed again for more dramatic effect if needed (for very slow or very fast)
+    if needs_speed:
+        # Apply additional speed adjustment using pydub
+        # For slow speech: stretch it further
+        # For fast speech: speed it up more
+        if speed < 0.8:
+            # For slow speech, we need to lengthen it more (use a lower playback speed)
+            playback_speed = 0.85  # Additional slowing
+            print(f"Applying additional slowdown with factor: {playback_speed}")
+        else:
+            # For fast speech, increase speed further
+            playback_speed = 1.15  # Additional speedup
+            print(f"Applying additional speedup with factor: {playback_speed}")
+        original_frames = len(samples)
+        samples = change_speed(samples, sample_rate, playback_speed)
+        if word_boundaries and original_frames:
+            scale_boundaries(word_boundaries, len(samples) / original_frames)
    
+    # Apply enhanced depth processing if needed
+    if depth > 1:
+        # Low-pass cutoff, bass boost and fades in one vectorized pass
+        cutoff_frequency, bass_boost_db = depth_parameters(depth)
+        print(f"Applying depth effect: cutoff {cutoff_frequency}Hz, bass boost +{bass_boost_db}dB")
+        samples = apply_depth_effect_array(samples, sample_rate, depth)
+    
+    # Encode once, straight to the output
+    return write_atomically(output_path, lambda f: encode_mp3(samples, sample_rate, f))
+
+async def generate_simple_tts(script_file, output_audio, voice_id, speed=-0.1, depth=9, is_ssml=False,
+                              progress_callback=None, live_audio=None, sentence_cache=None,
+                              word_boundaries=None):
+    """Generate TTS audio for a script file with customizable speed and depth.
+    
+    Reads the file and hands its text to generate_tts_from_text, which takes
+    the same arguments.
+    
     Args:
         script_file: Path to the script file
+    
+    Returns:
+        output_audio, or the path of a silent clip (named silent_*) if synthesis failed
+    """
+    # Read the script
+    with open(script_file, 'r', encoding='utf-8') as file:
+        script = file.read()
+    
+    return await generate_tts_from_text(
+        script, output_audio, voice_id, speed, depth, is_ssml, progress_callback, live_audio,
+        sentence_cache, word_boundaries
+    )
+
+async def generate_tts_from_text(script, output_audio, voice_id, speed=-0.1, depth=9, is_ssml=False,
+                                 progress_callback=None, live_audio=None, sentence_cache=None,
+                                 word_boundaries=None):
+    """Generate TTS audio for text held in memory, with customizable speed and depth.
+   
+    Args:
+        script: Text (or SSML document) to speak
         output_audio: Path for the output file
         voice_id: Voice ID to use for TTS (includes language selection)
         speed: Playback speed (1.0 = normal, <1.0 = slower, >1.0 = faster)
         depth: Voice depth level (1-5, higher values = deeper voice tone)
         is_ssml: Whether the input is SSML markup
+        progress_callback: Optional callable(done, total) reporting chunk progress
+        live_audio: Optional object with a write(data) method that also
+            receives the raw synthesized MP3 as it streams in, for listeners
+            of the live stream
+        sentence_cache: Optional tts_cache.SentenceCache. Sentences cached on
+            their own are then reused, and the rest are sent in content-defined
+            groups (see segmenter.group_sentences) that are cached in turn, so
+            re-rendering an edited script only requests the groups that changed
+        word_boundaries: Optional list to fill with the words' timings in the
+            output audio, for subtitles (ticks of 100 ns)
        
     Returns:
-        Path to the generated audio file
+        output_audio, or the path of a silent clip (named silent_*) if synthesis failed
     """
     print(f"Generating voice with {voice_id}, speed={speed}, depth={depth}...,SSML={is_ssml}")
    
-    # Read the script
-    with open(script_file, 'r', encoding='utf-8') as file:
-        script = file.read()
-   
-    # Create directory for temporary files
-    temp_dir = os.path.join(tempfile.gettempdir(), 'tts_generator')
-    os.makedirs(temp_dir, exist_ok=True)
+    # Directory for the intermediates that have to touch the disk
+    temp_dir = tts_temp_dir()
    
     try:
         from edge_tts import Communicate
        
-        # Generate base TTS with specified speed
-        temp_audio_file = os.path.join(temp_dir, f'base_tts_{int(time.time())}.mp3')
-        communicate = Communicate(script, voice_id)
+        # Generate base TTS with specified speed, in memory
+        base_audio = audio_buffer(temp_dir)
        
         # Apply speed setting for edge-tts
         # Note: We'll apply additional speed processing later for more dramatic effect
-        if speed != 1.0:
-            # Convert speed to rate percentage with enhanced effect
-            # We'll use both edge-tts rate AND pydub speedup for more noticeable effect
-            rate_percentage = int((1.0/speed) * 100)
-            print(f"Setting edge-tts rate to: {rate_percentage}%")
-            communicate.rate = f"{rate_percentage}%"
-           
-        await communicate.save(temp_audio_file)
-       
-        # Check if the audio file was created successfully
-        if os.path.exists(temp_audio_file) and os.path.getsize(temp_audio_file) > 0:
-            print("Successfully generated voice audio file")
-        else:
-            raise Exception("Failed to generate audio with voice")
-       
-        # Load audio for processing
-        audio = AudioSegment.from_file(temp_audio_file)
+        rate = edge_rate(speed)
         
-        # Process speed again for more dramatic effect if needed (for very slow or very fast)
-        if speed < 0.8 or speed > 1.2:
-            # Apply additional speed adjustment using pydub
-            # For slow speech: stretch it further
-            # For fast speech: speed it up more
-            if speed < 0.8:
-                # For slow speech, we need to lengthen it more (use a lower playback speed)
-                playback_speed = 0.85  # Additional slowing
-                audio = speedup(audio, playback_speed=playback_speed)
-                print(f"Applied additional slowdown with factor: {playback_speed}")
-            elif speed > 1.2:
-                # For fast speech, increase speed further
-                playback_speed = 1.15  # Additional speedup
-                audio = speedup(audio, playback_speed=playback_speed)
-                print(f"Applied additional speedup with factor: {playback_speed}")
-       
-        # Apply enhanced depth processing if needed
-        if depth > 1:
-            # More dramatic cutoff frequency range for deeper voice effect
-            # Original: 12000 - (depth * 1000) = range of 11000-8000
-            # New: 18000 - (depth * 3000) = range of 15000-6000
-            cutoff_frequency = 18000 - (depth * 3000)  # Much lower cutoff for deeper voice
-            print(f"Applying low-pass filter with cutoff: {cutoff_frequency}Hz")
-            processed_audio = low_pass_filter(audio, cutoff_frequency)
-            
-            # Add bass boost for deeper voice effect
-            # We'll boost frequencies below 300Hz
-            # Higher depth = more bass boost
-            bass_boost_db = (depth - 1) * 3  # 0, 3, 6, 9, 12 dB boost
-            if bass_boost_db > 0:
-                print(f"Applying bass boost: +{bass_boost_db}dB")
-                # Create a bass-boosted version
-                bass_part = processed_audio.low_pass_filter(300)  # Get just the bass frequencies
-                bass_part = bass_part + bass_boost_db  # Boost the bass
-                # Mix the boosted bass back with the original
-                processed_audio = processed_audio.overlay(bass_part)
-           
-            # Add basic fade in/out
-            fade_time = min(200, len(processed_audio) // 20)
-            processed_audio = processed_audio.fade_in(fade_time).fade_out(fade_time)
-           
-            # Save processed audio
-            processed_file = os.path.join(temp_dir, f'processed_voice_{int(time.time())}.mp3')
-            processed_audio.export(processed_file, format="mp3", bitrate="192k")
-            return processed_file
+        # SSML documents must be sent whole; plain text is split into chunks
+        # that are synthesized in parallel
+        if is_ssml:
+            chunks = [script]
+            sentence_cache = None
+        elif sentence_cache:
+            sentences = split_sentences(script)
+            with_boundaries = word_boundaries is not None
+            cached = await asyncio.to_thread(lambda: {
+                sentence for sentence in sentences
+                if sentence_cache.contains(sentence_key(sentence, voice_id, rate), with_boundaries)
+            })
+            chunks = group_sentences(sentences, MAX_CHUNK_LENGTH, alone=cached)
         else:
-            # Return the speed-adjusted file
-            if speed < 0.8 or speed > 1.2:
-                # Save the speed-processed file
-                speed_processed_file = os.path.join(temp_dir, f'speed_processed_{int(time.time())}.mp3')
-                audio.export(speed_processed_file, format="mp3", bitrate="192k")
-                return speed_processed_file
+            chunks = split_text(script, MAX_CHUNK_LENGTH)
+        print(f"Synthesizing {len(chunks)} chunk(s)")
+        try:
+            await synthesize_chunks(
+                chunks, base_audio, voice_id, rate, progress_callback=progress_callback,
+                sentence_cache=sentence_cache, word_boundaries=word_boundaries, live_audio=live_audio
+            )
+           
+            # Check if the audio was created successfully
+            if base_audio.tell() > 0:
+                print("Successfully generated voice audio file")
             else:
-                return temp_audio_file
+                raise Exception("Failed to generate audio with voice")
+           
+            # Decoding, effects and encoding are CPU-bound; keep them off the event loop
+            return await asyncio.to_thread(post_process, base_audio, speed, depth, output_audio,
+                                           word_boundaries)
+        finally:
+            base_audio.close()
            
     except ImportError:
         print("Required libraries not found, installing...")
@@ -117,7 +410,7 @@ async def generate_simple_tts(script_file, output_audio, voice_id, speed=-0.1, d
         from edge_tts import Communicate
        
         # Try again after installation
-        temp_audio_file = os.path.join(temp_dir, f'base_tts_{int(time.time())}.mp3')
+        temp_audio_file = unique_temp_path('base_tts', temp_dir)
         communicate = Communicate(script, voice_id)
        
         # Apply speed setting on retry
@@ -132,7 +425,64 @@ async def generate_simple_tts(script_file, output_audio, voice_id, speed=-0.1, d
         print(f"Error generating TTS: {e}")
        
         # Create a silent audio file as fallback
-        silent_file = os.path.join(temp_dir, f'silent_{int(time.time())}.mp3')
+        silent_file = unique_temp_path('silent', temp_dir)
         silence = AudioSegment.silent(duration=5000)
-        silence.export(silent_file, format="mp3")
-        return silent_file
\ No newline at end of file
+        await asyncio.to_thread(silence.export, silent_file, format="mp3")
+        return silent_file
+
+async def generate_tts_from_stream(text_stream, voice_id, speed=1.0, depth=1,
+                                   progress_callback=None, live_audio=None, output_audio=None,
+                                   sentence_cache=None, word_boundaries=None):
+    """Speak text while it is still being written.
+    
+    The streamed text is cut at sentence boundaries and each sentence is sent
+    to Edge TTS as soon as it is complete, so synthesis overlaps with whatever
+    produces the text. Sentences are stitched in order, then the same speed
+    and depth processing as generate_simple_tts is applied.
+    
+    Unlike generate_simple_tts there is no silent fallback: errors propagate
+    so the job is marked as failed.
+    
+    Args:
+        text_stream: Async iterable of text pieces (e.g. LLM tokens)
+        voice_id: Voice ID to use for TTS
+        speed: Playback speed (1.0 = normal, <1.0 = slower, >1.0 = faster)
+        depth: Voice depth level (1-5, higher values = deeper voice tone)
+        progress_callback: Optional callable(done, total) reporting sentence progress
+        live_audio: Optional object with a write(data) method that also
+            receives the raw synthesized MP3 as it streams in, for listeners
+            of the live stream
+        output_audio: Path for the output file (defaults to a new file in the
+            temp directory)
+        sentence_cache: Optional tts_cache.SentenceCache for sentences spoken before
+        word_boundaries: Optional list to fill with the words' timings in the
+            output audio, for subtitles (ticks of 100 ns)
+       
+    Returns:
+        Path to the generated audio file
+    """
+    print(f"Generating streamed voice with {voice_id}, speed={speed}, depth={depth}")
+    
+    temp_dir = tts_temp_dir()
+    base_audio = audio_buffer(temp_dir)
+    
+    splitter = SentenceSplitter()
+    
+    async def sentences():
+        async for piece in text_stream:
+            for sentence in splitter.feed(piece):
+                yield sentence
+        for sentence in splitter.flush():
+            yield sentence
+    
+    try:
+        await synthesize_stream(
+            sentences(), base_audio, voice_id, edge_rate(speed), progress_callback=progress_callback,
+            sentence_cache=sentence_cache, word_boundaries=word_boundaries, live_audio=live_audio
+        )
+        return await asyncio.to_thread(
+            post_process, base_audio, speed, depth, output_audio or unique_temp_path('tts', temp_dir),
+            word_boundaries
+        )
+    finally:
+        base_audio.close()
@@ -0,0 +1,312 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+import unicodedata
+import uuid
+
+# Caches that outgrow max_bytes are trimmed down to this fraction of it, so a
+# full cache is not rescanned on every store
+EVICT_LOW_WATER = 0.9
+
+
+def normalize_text(text):
+    """Normalize script text so trivially different submissions share a key"""
+    text = unicodedata.normalize('NFC', text)
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [line.rstrip() for line in text.split('\n')]
+    return '\n'.join(lines).strip()
+
+
+def cache_key(text, voice_id, speed, depth, is_ssml=False):
+    """
+    Hash the normalized input together with every synthesis parameter.
+
+    Returns:
+        Hex SHA-256 digest identifying the rendered audio
+    """
+    payload = json.dumps({
+        'text': normalize_text(text),
+        'voice': voice_id,
+        'speed': round(float(speed), 3),
+        'depth': int(depth),
+        'ssml': bool(is_ssml),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def sentence_key(text, voice_id, rate=None):
+    """
+    Key for one synthesized sentence.
+
+    Only what Edge TTS receives matters here: speed beyond the edge-tts rate
+    and the depth effect are applied after the sentences are joined.
+    """
+    payload = json.dumps({
+        'text': normalize_text(text),
+        'voice': voice_id,
+        'rate': rate or '',
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def link_or_copy(source, destination):
+    """Hardlink ``source`` to ``destination``, copying if links are unsupported"""
+    if os.path.abspath(source) == os.path.abspath(destination):
+        return destination
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+    return destination
+
+
+def write_boundaries(path, boundaries):
+    """Save word boundaries as JSON next to a cached MP3, atomically"""
+    directory, name = os.path.split(path)
+    staging = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    with open(staging, 'w', encoding='utf-8') as f:
+        json.dump(boundaries, f, separators=(',', ':'))
+    os.replace(staging, path)
+
+
+def read_boundaries(path):
+    """Load word boundaries saved by write_boundaries, or None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class MP3Cache:
+    """
+    Directory of ``<key>.mp3`` entries kept within a size quota.
+
+    Entries are evicted least-recently-used first once the directory grows
+    past ``max_bytes``, down to EVICT_LOW_WATER of it; an entry's mtime is
+    bumped on every hit and serves as its last-access time. The directory's
+    size is tracked approximately between scans, so adding an entry only
+    rescans it when the quota may have been crossed. An entry may have a
+    ``<key><WORDS_SUFFIX>`` file of word boundaries beside it, evicted with it.
+
+    Subclasses define the entry format and how entries are read and added.
+    """
+
+    WORDS_SUFFIX = '.json'
+    ENTRY_NAME = 'cached entries'  # For log messages
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._approx_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _words_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.WORDS_SUFFIX}")
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _added(self, size):
+        """Account for ``size`` new bytes, evicting if the quota may have been crossed"""
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += size
+            needs_scan = self._approx_bytes is None or self._approx_bytes > self.max_bytes
+        if needs_scan:
+            self.evict()
+
+    def evict(self):
+        """Remove least-recently-used entries once the directory exceeds max_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.mp3'):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+        removed = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_LOW_WATER
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                remove_quietly(path[:-len('.mp3')] + self.WORDS_SUFFIX)
+                total -= size
+                removed += 1
+            print(f"Evicted {removed} {self.ENTRY_NAME}")
+
+        with self._lock:
+            self._approx_bytes = total
+            self.evictions += removed
+        return removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class TTSCache(MP3Cache):
+    """
+    Content-addressed store of finished MP3s.
+
+    Each rendered output is kept once as ``<cache_dir>/<key>.mp3``; the
+    per-job, title-named files in OUTPUT_FOLDER are hardlinks to that blob.
+    The word boundaries of a render, when known, are kept beside it as
+    ``<key>.words.json`` so a cache hit can still get subtitles.
+    """
+
+    WORDS_SUFFIX = '.words.json'
+    ENTRY_NAME = 'cached renders'
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    def lookup(self, key, output_path):
+        """
+        Materialize a cached render at ``output_path``.
+
+        Returns:
+            output_path on a hit, None on a miss
+        """
+        blob = self._path(key)
+        try:
+            os.utime(blob)
+            link_or_copy(blob, output_path)
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        print(f"Cache hit for {key[:12]}")
+        return output_path
+
+    def store(self, key, source_path, output_path, boundaries=None):
+        """
+        Add a freshly rendered file to the cache and link it to ``output_path``.
+
+        Args:
+            boundaries: Optional word boundaries of the render, kept for subtitles
+
+        Returns:
+            output_path
+        """
+        blob = self._path(key)
+        if boundaries:
+            # Written before the blob, so a blob that has boundaries never appears without them
+            write_boundaries(self._words_path(key), boundaries)
+        added = 0
+        if not os.path.exists(blob):
+            # Copy under a unique name first so readers never see a partial blob
+            staging = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+            shutil.copyfile(source_path, staging)
+            os.replace(staging, blob)
+            added = os.path.getsize(blob)
+
+        link_or_copy(blob, output_path)
+        self._added(added)
+        return output_path
+
+    def boundaries(self, key):
+        """Word boundaries stored with a render, or None"""
+        return read_boundaries(self._words_path(key))
+
+
+class SentenceCache(MP3Cache):
+    """
+    Raw Edge TTS audio for single sentences or small groups of them, so an
+    edited script only re-synthesizes the parts that changed.
+
+    Entries are ``<cache_dir>/<key>.mp3`` files holding exactly the bytes
+    Edge TTS returned, which can be concatenated with other sentences
+    unchanged, and a ``<key>.json`` beside them with the sentence's word
+    boundaries when they were captured.
+    """
+
+    ENTRY_NAME = 'cached sentences'
+
+    def __init__(self, cache_dir, max_bytes=1024 * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    def get(self, key):
+        """Return the cached audio for a sentence key, or None"""
+        return self.get_entry(key)[0]
+
+    def contains(self, key, with_boundaries=False):
+        """Whether a sentence is cached (with its word boundaries, if asked), without reading it"""
+        if not os.path.exists(self._path(key)):
+            return False
+        return not with_boundaries or os.path.exists(self._words_path(key))
+
+    def get_entry(self, key):
+        """
+        Look up a sentence with its word boundaries.
+
+        Returns:
+            (audio, boundaries); audio is None on a miss, boundaries is None
+            when they were not stored with it
+        """
+        path = self._path(key)
+        try:
+            os.utime(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = None
+
+        self._count(hit=bool(data))
+        if not data:
+            return None, None
+        return data, read_boundaries(self._words_path(key))
+
+    def put(self, key, data, boundaries=None):
+        """Store the audio for a sentence key, with its word boundaries if given"""
+        path = self._path(key)
+        if boundaries is not None:
+            write_boundaries(self._words_path(key), boundaries)
+        staging = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        with open(staging, 'wb') as f:
+            f.write(data)
+        os.replace(staging, path)
+        self._added(len(data))
@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import asyncio
+import threading
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'voice_catalog.json')
+CATALOG_TTL = 7 * 24 * 3600  # Edge TTS adds voices rarely; refresh weekly
+RETRY_AFTER_FAILURE = 300  # Seconds before a failed fetch is tried again
+
+# Shipped with the app so pages render before the first fetch, and offline
+SEED_VOICES = [
+    # English voices
+    {"id": "en-US-GuyNeural", "name": "Guy (Male, US)", "language": "English"},
+    {"id": "en-US-ChristopherNeural", "name": "Christopher (Male, US)", "language": "English"},
+    {"id": "en-US-EricNeural", "name": "Eric (Male, US)", "language": "English"},
+    {"id": "en-GB-RyanNeural", "name": "Ryan (Male, UK)", "language": "English"},
+    {"id": "en-GB-ThomasNeural", "name": "Thomas (Male, UK)", "language": "English"},
+    {"id": "en-AU-WilliamNeural", "name": "William (Male, Australian)", "language": "English"},
+    {"id": "en-CA-LiamNeural", "name": "Liam (Male, Canadian)", "language": "English"},
+    {"id": "en-US-JennyNeural", "name": "Jenny (Female, US)", "language": "English"},
+    {"id": "en-GB-SoniaNeural", "name": "Sonia (Female, UK)", "language": "English"},
+    {"id": "en-AU-NatashaNeural", "name": "Natasha (Female, Australian)", "language": "English"},
+
+    # Arabic voices
+    {"id": "ar-MA-JamalNeural", "name": "Jamal (Male, Moroccan)", "language": "Arabic"},
+    {"id": "ar-EG-ShakirNeural", "name": "Shakir (Male, Egyptian)", "language": "Arabic"},
+    {"id": "ar-SA-FahdNeural", "name": "Fahd (Male, Saudi)", "language": "Arabic"},
+
+    # French voices
+    {"id": "fr-FR-HenriNeural", "name": "Henri (Male)", "language": "French"},
+    {"id": "fr-FR-DeniseNeural", "name": "Denise (Female)", "language": "French"},
+
+    # German voices
+    {"id": "de-DE-ConradNeural", "name": "Conrad (Male)", "language": "German"},
+    {"id": "de-DE-KatjaNeural", "name": "Katja (Female)", "language": "German"},
+
+    # Spanish voices
+    {"id": "es-ES-AlvaroNeural", "name": "Álvaro (Male)", "language": "Spanish"},
+    {"id": "es-ES-ElviraNeural", "name": "Elvira (Female)", "language": "Spanish"},
+
+    # Italian voices
+    {"id": "it-IT-DiegoNeural", "name": "Diego (Male)", "language": "Italian"},
+    {"id": "it-IT-ElsaNeural", "name": "Elsa (Female)", "language": "Italian"},
+
+    # Portuguese voices
+    {"id": "pt-BR-AntonioNeural", "name": "Antonio (Male, Brazilian)", "language": "Portuguese"},
+    {"id": "pt-BR-FranciscaNeural", "name": "Francisca (Female, Brazilian)", "language": "Portuguese"}
+]
+
+
+def locale_of(voice_id):
+    """'en-US-JennyNeural' -> 'en-US'"""
+    return '-'.join(voice_id.split('-')[:2])
+
+
+def seed_entry(voice):
+    """Complete a SEED_VOICES entry with the fields derived from its id and name"""
+    gender = 'Female' if '(Female' in voice['name'] else 'Male'
+    return dict(voice, locale=locale_of(voice['id']), gender=gender)
+
+
+def normalize_edge_voice(record):
+    """
+    Convert an edge_tts.list_voices() record to a catalog entry.
+
+    "Microsoft Jenny Online (Natural) - English (United States)" gives
+    language "English" and the name "Jenny (Female, United States)".
+    """
+    voice_id = record['ShortName']
+    locale = record.get('Locale') or locale_of(voice_id)
+    gender = record.get('Gender', '')
+
+    friendly_name = record.get('FriendlyName', '')
+    language_full = friendly_name.rsplit(' - ', 1)[1] if ' - ' in friendly_name else locale
+    language = language_full.split(' (')[0]
+    region = language_full[len(language):].strip(' ()')
+
+    person = voice_id.split('-', 2)[-1].replace('Neural', '')
+    details = ', '.join(part for part in (gender, region) if part)
+    return {
+        'id': voice_id,
+        'name': f"{person} ({details})" if details else person,
+        'language': language,
+        'locale': locale,
+        'gender': gender,
+    }
+
+
+async def fetch_edge_voices():
+    """Download the full voice list from Edge TTS"""
+    import edge_tts
+    return await edge_tts.list_voices()
+
+
+class VoiceCatalog:
+    """
+    Edge TTS voice list, fetched at most once per TTL and kept on disk.
+
+    Reads never touch the network: they are answered from memory (loaded from
+    the disk cache, or SEED_VOICES before the first successful fetch). When the
+    data is older than the TTL a read starts a refresh in a background thread
+    and the new list is used once it arrives. Command-line tools that may
+    block call ``await refresh()`` instead.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CATALOG_PATH, ttl=CATALOG_TTL, fetch=fetch_edge_voices):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._retry_at = 0
+
+        self.fetched_at = 0
+        self.source = 'seed'
+        self._build_index([seed_entry(voice) for voice in SEED_VOICES])
+        self._load()
+
+    def _build_index(self, voices):
+        by_id = {}
+        by_locale = {}
+        by_language = {}
+        by_gender = {}
+        for voice in voices:
+            by_id[voice['id']] = voice
+            locale = voice['locale'].lower()
+            # Index both the full locale and the bare language code ("en")
+            for key in {locale, locale.split('-')[0]}:
+                by_locale.setdefault(key, []).append(voice)
+            by_language.setdefault(voice['language'].lower(), []).append(voice)
+            by_gender.setdefault(voice['gender'].lower(), []).append(voice)
+
+        # Swap in a complete index in one assignment so readers never see a partial one
+        self._index = {
+            'voices': voices,
+            'by_id': by_id,
+            'by_locale': by_locale,
+            'by_language': by_language,
+            'by_gender': by_gender,
+            'languages': sorted({voice['language'] for voice in voices}),
+            'locales': sorted({voice['locale'] for voice in voices}),
+        }
+
+    def _load(self):
+        """Load the disk cache, whatever its age (staleness only triggers a refresh)"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            voices = data['voices']
+            if voices:
+                self._build_index(voices)
+                self.fetched_at = data.get('fetched_at', 0)
+                self.source = 'disk'
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable voice catalog {self.cache_path}: {e}")
+
+    def _save(self, voices, fetched_at):
+        partial_path = f"{self.cache_path}.part"
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': fetched_at, 'voices': voices}, f, ensure_ascii=False)
+        os.replace(partial_path, self.cache_path)
+
+    def is_stale(self):
+        return time.time() - self.fetched_at > self.ttl
+
+    async def refresh(self, force=False):
+        """
+        Fetch the voice list if the cached one is stale (or always, with force).
+
+        A failed fetch keeps the current list.
+
+        Returns:
+            True if a new list was loaded
+        """
+        if not force and not self.is_stale():
+            return False
+
+        try:
+            records = await self._fetch()
+            voices = [normalize_edge_voice(record) for record in records]
+        except Exception as e:
+            print(f"Failed to refresh voice catalog: {e}")
+            self._retry_at = time.time() + RETRY_AFTER_FAILURE
+            return False
+        if not voices:
+            self._retry_at = time.time() + RETRY_AFTER_FAILURE
+            return False
+
+        fetched_at = time.time()
+        try:
+            self._save(voices, fetched_at)
+        except OSError as e:
+            print(f"Could not save voice catalog to {self.cache_path}: {e}")
+        self._build_index(voices)
+        self.fetched_at = fetched_at
+        self.source = 'edge-tts'
+        print(f"Voice catalog refreshed: {len(voices)} voices")
+        return True
+
+    def refresh_in_background(self):
+        """Start a refresh thread if the list is stale; never blocks"""
+        with self._lock:
+            if self._refreshing or not self.is_stale() or time.time() < self._retry_at:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                asyncio.run(self.refresh())
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='voice-catalog-refresh', daemon=True).start()
+
+    def voices(self, locale=None, language=None, gender=None):
+        """
+        Voices matching every given filter (case-insensitive).
+
+        Args:
+            locale: Full locale ("en-GB") or language code ("en")
+            language: Language name ("English")
+            gender: "Male" or "Female"
+
+        Returns:
+            List of dicts with id, name, language, locale and gender
+        """
+        self.refresh_in_background()
+        index = self._index
+
+        result = None
+        for key, value in (('by_locale', locale), ('by_language', language), ('by_gender', gender)):
+            if not value:
+                continue
+            matches = index[key].get(value.lower(), [])
+            if result is None:
+                result = matches
+            else:
+                matching_ids = {voice['id'] for voice in matches}
+                result = [voice for voice in result if voice['id'] in matching_ids]
+        return list(index['voices'] if result is None else result)
+
+    def get(self, voice_id):
+        """Return the catalog entry for a voice ID, or None"""
+        return self._index['by_id'].get(voice_id)
+
+    def languages(self):
+        self.refresh_in_background()
+        return list(self._index['languages'])
+
+    def locales(self):
+        self.refresh_in_background()
+        return list(self._index['locales'])
+
+    def records(self):
+        """Voices in the shape edge_tts.list_voices() uses, for the command-line tools"""
+        return [
+            {'ShortName': voice['id'], 'Gender': voice['gender'], 'Locale': voice['locale']}
+            for voice in self._index['voices']
+        ]
+
+    def stats(self):
+        return {
+            'voices': len(self._index['voices']),
+            'languages': len(self._index['languages']),
+            'source': self.source,
+            'fetched_at': self.fetched_at,
+            'stale': self.is_stale(),
+            'ttl': self.ttl,
+        }
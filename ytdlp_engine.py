@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+In-process yt-dlp engine.
+
+The default download path starts a new ``yt-dlp`` process for every
+download (two for a Pinterest video whose first attempt fails), paying the
+interpreter start-up and extractor import each time. This engine instead
+keeps a few long-lived worker processes that import ``yt_dlp`` once and drive
+``yt_dlp.YoutubeDL`` directly, reporting progress through its hooks rather
+than by scraping output.
+
+Workers run this file as a script and talk to the parent over their
+stdin/stdout, one JSON message per line. They are plain processes started
+with the current interpreter, so nothing from the web app is imported into
+them.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import importlib.util
+from collections import deque
+
+from media_downloaders import PHASE_PREFIXES, OUTPUT_TAIL_LINES, DownloadError
+
+HAVE_YT_DLP = importlib.util.find_spec('yt_dlp') is not None
+
+ENGINES = ('subprocess', 'inprocess')
+PROGRESS_INTERVAL = 0.25  # Seconds between progress messages from a worker
+MAX_TASKS_PER_WORKER = 100  # Workers are replaced after this many calls to bound memory growth
+MESSAGE_LIMIT = 16 * 1024 * 1024  # Largest line read from a worker (flat playlists can be big)
+
+
+def format_bytes(count):
+    """1536 -> '1.50KiB', like yt-dlp's progress lines"""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if count < 1024 or unit == 'GiB':
+            return f"{count:.2f}{unit}"
+        count /= 1024
+
+
+def format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def audio_download_options(output_file):
+    """YoutubeDL options matching media_downloaders.audio_download_command"""
+    base, _ = os.path.splitext(output_file)
+    return {
+        'format': 'bestaudio/best',
+        'outtmpl': f"{base}.%(ext)s",  # FFmpegExtractAudio renames it to .mp3
+        'noplaylist': True,
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '0',
+        }],
+    }
+
+
+def video_download_options(output_file):
+    """YoutubeDL options matching media_downloaders.video_download_commands: preferred, then fallback"""
+    return [
+        {'merge_output_format': 'mp4', 'outtmpl': output_file, 'no_warnings': True},
+        {'format': 'b', 'merge_output_format': 'mp4', 'outtmpl': output_file},
+    ]
+
+
+class _TailLogger:
+    """YoutubeDL logger that keeps the last lines instead of printing them"""
+
+    def __init__(self):
+        self.lines = deque(maxlen=OUTPUT_TAIL_LINES)
+
+    def debug(self, message):
+        # YoutubeDL sends info-level messages here too, prefixed with [info]/[download]...
+        self.lines.append(message)
+
+    def info(self, message):
+        self.lines.append(message)
+
+    def warning(self, message):
+        self.lines.append(f"WARNING: {message}")
+
+    def error(self, message):
+        self.lines.append(message)
+
+    def output(self):
+        return '\n'.join(self.lines)
+
+
+class _ProgressReporter:
+    """
+    Translate YoutubeDL progress and postprocessor hooks into the dicts
+    media_downloaders.parse_progress produces, throttled to PROGRESS_INTERVAL.
+    """
+
+    def __init__(self, callback=None, min_interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.filepath = None
+        self._last_phase = None
+        self._last_sent = 0
+
+    def _send(self, progress, force=False):
+        if not self.callback:
+            return
+        now = time.monotonic()
+        if not force and progress['phase'] == self._last_phase and now - self._last_sent < self.min_interval:
+            return
+        self._last_phase = progress['phase']
+        self._last_sent = now
+        self.callback(progress)
+
+    def download_hook(self, status):
+        if status['status'] == 'finished':
+            self.filepath = status.get('filename') or self.filepath
+            self._send({'phase': 'downloading', 'percent': 100.0}, force=True)
+            return
+        if status['status'] != 'downloading':
+            return
+
+        progress = {'phase': 'downloading', 'percent': 0.0}
+        downloaded = status.get('downloaded_bytes') or 0
+        total = status.get('total_bytes') or status.get('total_bytes_estimate')
+        if total:
+            progress['percent'] = round(min(downloaded * 100.0 / total, 100.0), 1)
+            progress['total'] = format_bytes(total)
+        if status.get('speed'):
+            progress['speed'] = f"{format_bytes(status['speed'])}/s"
+        if status.get('eta') is not None:
+            progress['eta'] = format_eta(status['eta'])
+        self._send(progress)
+
+    def postprocessor_hook(self, status):
+        if status['status'] == 'finished':
+            self.filepath = (status.get('info_dict') or {}).get('filepath') or self.filepath
+            return
+        phase = PHASE_PREFIXES.get(f"[{status.get('postprocessor')}]")
+        if status['status'] == 'started' and phase:
+            self._send({'phase': phase}, force=True)
+
+
+def run_download(url, options, progress_callback=None):
+    """
+    Download one URL with yt_dlp in the current process.
+
+    Used by the worker processes, and directly by the command-line tools.
+
+    Args:
+        url: Video URL
+        options: YoutubeDL options, e.g. from audio_download_options
+        progress_callback: Optional callable(progress_dict)
+
+    Returns:
+        (return_code, last lines of yt-dlp's log, path of the final file or None)
+    """
+    import yt_dlp
+
+    logger = _TailLogger()
+    reporter = _ProgressReporter(progress_callback)
+    params = dict(
+        options,
+        logger=logger,
+        quiet=True,
+        noprogress=True,
+        progress_hooks=[reporter.download_hook],
+        postprocessor_hooks=[reporter.postprocessor_hook],
+    )
+    try:
+        with yt_dlp.YoutubeDL(params) as ydl:
+            return_code = ydl.download([url])
+    except Exception as e:
+        # yt_dlp logs the error before raising it; keep one copy
+        message = str(e)
+        if not logger.lines or logger.lines[-1] != message:
+            logger.lines.append(message)
+        return_code = 1
+    return return_code, logger.output(), reporter.filepath
+
+
+def extract_flat(url, max_entries=None):
+    """
+    List a playlist without downloading it (``yt-dlp --flat-playlist -J``).
+
+    Returns:
+        The JSON-safe info dict
+
+    Raises:
+        DownloadError: If yt_dlp cannot read the URL
+    """
+    import yt_dlp
+
+    logger = _TailLogger()
+    params = {'extract_flat': 'in_playlist', 'quiet': True, 'no_warnings': True, 'logger': logger}
+    if max_entries:
+        params['playlistend'] = max_entries
+    try:
+        with yt_dlp.YoutubeDL(params) as ydl:
+            return ydl.sanitize_info(ydl.extract_info(url, download=False))
+    except Exception as e:
+        raise DownloadError(str(e)) from e
+
+
+def serve():
+    """Worker main loop: answer one request per stdin line until stdin closes"""
+    import yt_dlp
+
+    # Keep the real stdout for messages; stray prints (and child processes) go to stderr
+    channel = os.fdopen(os.dup(1), 'w', buffering=1, encoding='utf-8')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    def send(message):
+        channel.write(json.dumps(message, default=str) + '\n')
+
+    send({'ready': True, 'version': yt_dlp.version.__version__})
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            if request['op'] == 'download':
+                return_code, output, _ = run_download(
+                    request['url'], request['options'], lambda progress: send({'progress': progress})
+                )
+                send({'result': {'return_code': return_code, 'output': output}})
+            elif request['op'] == 'extract':
+                send({'result': {'info': extract_flat(request['url'], request.get('max_entries'))}})
+            else:
+                send({'error': f"Unknown operation {request['op']}"})
+        except Exception as e:
+            send({'error': str(e)})
+
+
+class WorkerExited(DownloadError):
+    """Raised when a worker process dies in the middle of a call"""
+
+
+class _Worker:
+    """Parent-side handle for one worker process"""
+
+    def __init__(self, process):
+        self.process = process
+        self.tasks = 0
+
+    @property
+    def alive(self):
+        return self.process.returncode is None
+
+    async def request(self, message, progress_callback=None):
+        self.tasks += 1
+        self.process.stdin.write((json.dumps(message) + '\n').encode('utf-8'))
+        await self.process.stdin.drain()
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                raise WorkerExited("yt-dlp worker exited unexpectedly")
+            reply = json.loads(line)
+            if 'progress' in reply:
+                if progress_callback:
+                    progress_callback(reply['progress'])
+            elif 'error' in reply:
+                raise DownloadError(reply['error'])
+            else:
+                return reply['result']
+
+    async def stop(self):
+        if self.alive:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+
+    async def kill(self):
+        if self.alive:
+            self.process.kill()
+            await self.process.wait()
+
+
+class InProcessEngine:
+    """
+    Pool of long-lived processes running yt_dlp.YoutubeDL.
+
+    Each call borrows an idle worker (starting one if fewer than
+    ``max_workers`` exist), so a download costs one message round trip
+    instead of a process start and a full yt-dlp import. Cancelling a call
+    kills its worker, aborting the download the same way the subprocess path
+    does; a replacement starts on the next call.
+
+    Workers are asyncio subprocesses, so one engine must always be used from
+    the same event loop.
+    """
+
+    def __init__(self, max_workers=2, max_tasks_per_worker=MAX_TASKS_PER_WORKER):
+        self.max_workers = max(1, max_workers)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._workers = []
+        self._idle = None
+
+        self.downloads = 0
+        self.extractions = 0
+        self.workers_started = 0
+
+    @staticmethod
+    def audio_options(output_file):
+        return audio_download_options(output_file)
+
+    @staticmethod
+    def video_options(output_file):
+        return video_download_options(output_file)
+
+    async def _start_worker(self):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=MESSAGE_LIMIT
+        )
+        worker = _Worker(process)
+        line = await process.stdout.readline()
+        if not line or not json.loads(line).get('ready'):
+            await worker.kill()
+            raise DownloadError("yt-dlp worker failed to start")
+        self._workers.append(worker)
+        self.workers_started += 1
+        return worker
+
+    def _discard(self, worker):
+        if worker in self._workers:
+            self._workers.remove(worker)
+
+    async def _acquire(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        while True:
+            while not self._idle.empty():
+                worker = self._idle.get_nowait()
+                if worker.alive:
+                    return worker
+                self._discard(worker)
+            if len(self._workers) < self.max_workers:
+                return await self._start_worker()
+            worker = await self._idle.get()
+            if worker.alive:
+                return worker
+            # A retired worker was handed over as a wake-up; start its replacement
+            self._discard(worker)
+
+    async def _release(self, worker, healthy):
+        if not healthy or not worker.alive or worker.tasks >= self.max_tasks_per_worker:
+            self._discard(worker)
+            await (worker.stop() if healthy else worker.kill())
+            # Wake a caller waiting for a worker so it can start a replacement
+            if self._idle is not None and self._idle.empty():
+                self._idle.put_nowait(worker)
+            return
+        self._idle.put_nowait(worker)
+
+    async def _call(self, message, progress_callback=None):
+        worker = await self._acquire()
+        healthy = False
+        try:
+            result = await worker.request(message, progress_callback)
+            healthy = True
+            return result
+        except WorkerExited:
+            raise
+        except DownloadError:
+            # An error reply leaves the worker usable
+            healthy = worker.alive
+            raise
+        finally:
+            await asyncio.shield(self._release(worker, healthy))
+
+    async def warm(self, count=None):
+        """Start workers ahead of the first download"""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        while len(self._workers) < min(count or self.max_workers, self.max_workers):
+            self._idle.put_nowait(await self._start_worker())
+
+    async def download(self, url, options, progress_callback=None):
+        """
+        Run one download in a worker.
+
+        Returns:
+            (return_code, last lines of yt-dlp's log), like media_downloaders.run_yt_dlp
+        """
+        self.downloads += 1
+        try:
+            result = await self._call({'op': 'download', 'url': url, 'options': options}, progress_callback)
+        except DownloadError as e:
+            return 1, str(e)
+        return result['return_code'], result['output']
+
+    async def extract_flat(self, url, max_entries=None):
+        """Flat playlist info for a URL; raises DownloadError"""
+        self.extractions += 1
+        result = await self._call({'op': 'extract', 'url': url, 'max_entries': max_entries})
+        return result['info']
+
+    async def close(self):
+        workers, self._workers = self._workers, []
+        await asyncio.gather(*(worker.stop() for worker in workers))
+
+    def stats(self):
+        return {
+            'engine': 'inprocess',
+            'workers': len(self._workers),
+            'max_workers': self.max_workers,
+            'workers_started': self.workers_started,
+            'downloads': self.downloads,
+            'extractions': self.extractions,
+        }
+
+
+def create_engine(name, max_workers=2):
+    """
+    Engine for media downloads: None for the default subprocess path.
+
+    'inprocess' falls back to the subprocess path when yt_dlp cannot be
+    imported.
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown media download engine {name!r}; expected one of {', '.join(ENGINES)}")
+    if name == 'subprocess':
+        return None
+    if not HAVE_YT_DLP:
+        print("yt_dlp is not importable; using the yt-dlp command instead of the in-process engine")
+        return None
+    return InProcessEngine(max_workers)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,70 @@
+import io
+import zipfile
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable write target that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer.extend(data)
+        return len(data)
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def unique_arcname(name, used):
+    """Return ``name``, suffixed with a counter if it is already in ``used``"""
+    base, dot, ext = name.rpartition('.')
+    if not dot:
+        base, ext = name, ''
+    candidate = name
+    counter = 1
+    while candidate in used:
+        candidate = f"{base}_{counter}.{ext}" if dot else f"{base}_{counter}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def stream_zip(files):
+    """
+    Yield a ZIP archive piece by piece while it is being built.
+
+    Nothing is written to disk: each member is read in blocks and the bytes
+    produced so far are yielded straight away. Members are stored without
+    compression since the archives hold already-compressed media.
+
+    Args:
+        files: Iterable of (archive_name, file_path) pairs
+
+    Yields:
+        Chunks of the ZIP archive
+    """
+    sink = _ZipSink()
+    used = set()
+    # An unseekable target makes zipfile write sizes in data descriptors
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for arcname, path in files:
+            arcname = unique_arcname(arcname, used)
+            with open(path, 'rb') as source, archive.open(arcname, 'w', force_zip64=True) as member:
+                while True:
+                    block = source.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    member.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()